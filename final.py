@@ -1,14 +1,47 @@
 import customtkinter as ctk
-from tkinter import messagebox, filedialog
+from tkinter import messagebox, filedialog, ttk
 import threading
 import os
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import time
 import tkinter as tk
 import calendar as cal
 import uuid
-import winsound # Added for sound functionality
+import re
+import hashlib
+import hmac
+import secrets
+import heapq
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import queue
+import shutil
+import subprocess
+import sys
+import csv
+import io
+import zipfile
+import asyncio
+import collections
+import signal
+import zlib
+import base64
+import struct
+import gzip
+import bisect
+import xml.etree.ElementTree as ET
+
+try:
+    import winsound # Only available on Windows
+except ImportError:
+    winsound = None
+
+try:
+    import numpy as np # Used by Progress Insights
+except ImportError:
+    np = None
 
 # Set appearance mode for light theme
 ctk.set_appearance_mode("light")
@@ -53,10 +86,286 @@ CONTAINER_MAX_WIDTH = 1200
 WINDOW_MIN_WIDTH = 600
 WINDOW_MIN_HEIGHT = 700
 
+# Mood options in the order the mood menu shows them; MOOD_SCORES ranks them
+MOOD_OPTIONS = ["Good 😊", "Okay 😐", "Stressed 😟", "Happy 😄", "Sad 😢"]
+MOOD_SCORES = {"Happy 😄": 5, "Good 😊": 4, "Okay 😐": 3, "Stressed 😟": 2, "Sad 😢": 1}
+TIME_OF_DAY_NAMES = ["Night", "Morning", "Afternoon", "Evening"]
+TIME_OF_DAY_BINS = [5, 12, 17, 21] # Hours where Morning, Afternoon, Evening and Night start
+
+# Trend chart settings
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal() # Chart x values are days since 1970-01-01
+CHART_FRAME_BUDGET_MS = 16 # One frame at 60 Hz
+CHART_MIN_SPAN_DAYS = 3
+
+# Heatmap settings
+HEATMAP_WEEKS = 53
+HEATMAP_CELL = 11 # Pixels per day cell
+HEATMAP_GAP = 2
+HEATMAP_EMPTY_COLOR = "#EBEDF0"
+FOCUS_HEAT_COLORS = ["#C6E48B", "#7BC96F", "#239A3B", "#196127"]
+FOCUS_HEAT_THRESHOLDS = [25, 50, 100] # Minutes where the next darker green starts
+MOOD_COLORS = {"Happy 😄": "#66BB6A", "Good 😊": "#9CCC65", "Okay 😐": "#FFD54F",
+               "Stressed 😟": "#FFA726", "Sad 😢": "#EF5350"}
+HEATMAP_MODES = ["Focus minutes", "Mood"]
+
+# Export settings
+EXPORT_FORMATS = {"NDJSON": ".ndjson", "CSV": ".csv", "Zip bundle": ".zip"}
+EXPORT_PROGRESS_EVERY = 500 # Records between progress updates
+# Known fields per collection, used for CSV headers (unknown extra fields are kept in NDJSON only)
+EXPORT_FIELDS = {
+    "profile": ["name", "email", "course", "section"],
+    "tasks": ["task", "due_date", "status", "created_at"],
+    "plans": ["subject", "topic", "due_date", "status"],
+    "doubts": ["title", "description", "status"],
+    "progress": ["topic", "progress"],
+    "moods": ["mood", "notes", "timestamp"],
+    "timer_history": ["type", "duration_minutes", "timestamp"],
+    "reminders": ["id", "message", "datetime", "status", "recurrence", "snoozed_until"],
+}
+EXPORT_PRIVATE_FIELDS = {"password", "password_hash", "selected_for_action"}
+
+# Bulk import settings
+IMPORT_ERROR_PREVIEW = 15 # Row errors listed in the confirmation dialog
+TASK_STATUSES = ["Pending", "Completed"]
+PLAN_STATUSES = ["Planned", "In Progress", "Completed"]
+DEFAULT_REMINDER_TIME = "09:00" # For all-day calendar events imported as reminders
+
+# Doubt archive settings
+DOUBT_STATUSES = ["Unresolved", "Resolved"]
+DOUBT_ARCHIVE_FORMATS = {"Zip of text files": ".zip", "JSONL": ".jsonl"}
+DOUBT_IMPORT_SUFFIXES = (".txt", ".jsonl", ".ndjson")
+DOUBT_IMPORT_BATCH = 250 # Files per process pool task
+
+# Doubt description storage
+DOUBT_BODY_FOLDER = "doubt_bodies"
+DOUBT_INLINE_CHARS = 280 # Shorter descriptions stay in doubts.json; longer ones move to DOUBT_BODY_FOLDER
+DOUBT_COMPRESS_MIN_BYTES = 1024 # Bodies at least this big are stored gzip-compressed
+DOUBT_BODY_MISSING_TEXT = "(description not available on this computer)" # Shown in data exports
+
+# Duplicate doubt detection (MinHash signatures, LSH banding)
+MINHASH_PERMUTATIONS = 32
+MINHASH_BANDS = 16 # 2 rows per band: pairs at 0.5 similarity share a bucket ~99% of the time
+DUPLICATE_SIMILARITY = 0.5 # Estimated Jaccard similarity of word shingles
+DOUBT_STOP_WORDS = frozenset("""a an the is are was were be been do does did i im me my we you your it its this that
+    what whats why how when where which who to of in on at for from by with about as and or but not no dont doesnt
+    can could would should will get got understand know mean meaning use used using""".split())
+
+# iCalendar feed settings
+ICS_PRODID = "-//EduMind//Digital Guardian//EN"
+ICS_LINE_LIMIT = 75 # Octets per line before folding (RFC 5545)
+ICS_REMINDER_MINUTES = 15 # Event length used for reminders
+
+# Cohort reporting settings
+COHORT_REPORT_FILE = "cohort_report.json"
+COHORT_REPORT_MAX_AGE_MINUTES = 30
+COHORT_SOURCE_FILES = ("users.json", "tasks.json", "timer_history.json", "moods.json")
+
+# Study scheduler settings
+SCHEDULER_BLOCKS_PER_TOPIC = 8 # Pomodoros a topic needs from 0% progress, unless the plan sets "estimated_blocks"
+SCHEDULER_DEFAULT_CAPACITY = 6 # Pomodoros per day
+SCHEDULER_CAPACITY_OPTIONS = [str(n) for n in range(2, 13)]
+SCHEDULER_HORIZON_DAYS = 200 # Roughly a semester
+SCHEDULER_DAY_START = "17:00"
+SCHEDULER_BLOCK_MINUTES = 30 # 25 minute Pomodoro plus a 5 minute break
+SCHEDULER_REMINDER_DAYS = 7 # Upcoming days that get a study reminder
+
+# Spaced repetition (SM-2) settings
+REVIEW_COLLECTIONS = ("doubts", "progress")
+REVIEW_GRADES = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5} # SM-2 quality (0-5); below 3 starts the item over
+REVIEW_DEFAULT_EASE = 2.5
+REVIEW_MIN_EASE = 1.3
+REVIEW_TOPIC_MIN_PROGRESS = 100 # Study Progress topics join the queue once completed
+REVIEW_REMINDER_TIME = "18:00"
+
+# Password hashing settings
+PASSWORD_HASH_SCHEME = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = 310000 # Raise as lab hardware gets faster; run with --benchmark-kdf to pick a value
+PASSWORD_SALT_BYTES = 16
+KDF_BENCHMARK_TARGET_MS = 250 # Login delay we are willing to pay
+
+# Warm-start cache settings
+WARM_CACHE_DIR = "warm_cache"
+WARM_CACHE_FORMAT = 2 # Bump when the cached payload changes shape
+
+# Store server settings
+SERVER_DEFAULT_HOST = "127.0.0.1"
+SERVER_DEFAULT_PORT = 8765
+SERVER_FLUSH_SECONDS = 0.5 # Writes are coalesced and flushed to disk at most this often
+SERVER_MAX_LINE = 64 * 1024 * 1024 # Largest single request or response line
+CLIENT_POOL_SIZE = 4
+CLIENT_TIMEOUT_SECONDS = 15
+CLIENT_LOGIN_TIMEOUT_SECONDS = 60 # Password hashing on a busy server queues behind other logins
+CREDENTIAL_FIELDS = ("password", "password_hash") # Never leave the store server
+SERVER_OWNED_USER_FIELDS = CREDENTIAL_FIELDS + ("role",) # Clients cannot set these through "set"
+# The collections StudentGuideApp.open_store keeps on a store server (every SYNC_COLLECTIONS entry
+# among them); requests naming anything else are refused, so clients cannot create files there
+SERVER_COLLECTIONS = frozenset(("users", "tasks", "reminders", "moods", "daily_checkins", "wellness_goals",
+                                "timer_history", "timer_rollups", "ics_feed_cache", "study_schedule",
+                                "progress", "plans", "doubts"))
+
+# Delta sync settings
+SYNC_JOURNAL_FILE = "sync_journal.json"
+SYNC_COLLECTIONS = ("tasks", "plans", "reminders", "doubts", "progress", "moods", "timer_history")
+SYNC_VOLATILE_FIELDS = {"modified_at", "modified_by", "selected_for_action"} # Not part of a record's content
+SYNC_BATCH_RECORDS = 500 # Changes per compressed frame
+SYNC_NODE_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Syllabus upload settings
+SYLLABUS_FOLDER = "syllabus_files"
+COPY_CHUNK_BYTES = 1024 * 1024 # Memory used by an upload, whatever the file size
+SHARED_SYLLABUS_OWNER = "__shared__" # Files shared with everyone on this machine
+LEGACY_SYLLABUS_OWNER = "__unclaimed__" # Old flat-layout files whose uploader can't be told; listed to nobody
+LEGACY_MIGRATED_MARKER = ".migrated" # In SYLLABUS_FOLDER once the old flat layout has been moved into blobs
+LEGACY_DEFAULT_USER = "default_user" # The demo account older versions created on first run
+INCOMING_MAX_AGE_HOURS = 24 # Abandoned upload temp files older than this are swept up
+SYLLABUS_CATALOG_FILE = "syllabus_catalog.json"
+CATALOG_RACY_SECONDS = 2 # A folder modified this close to a scan is rescanned next time (coarse mtimes)
+SYLLABUS_FILE_TYPES = {".pdf": "PDF", ".docx": "Word", ".doc": "Word", ".txt": "Text"}
+
+# Syllabus search settings
+SEARCH_INDEX_FILE = "syllabus_search_index.json"
+SEARCH_TEXT_FOLDER = os.path.join(SYLLABUS_FOLDER, "text") # Extracted text by content hash, for snippets
+SEARCH_INDEX_FORMAT = 1 # Bump when extraction changes so every file is extracted again
+SEARCH_TOKEN_PATTERN = re.compile(r"[^\W_]{2,}")
+SEARCH_MAX_RESULTS = 200
+SEARCH_SNIPPET_CHARS = 120
+
+# Study plans generated from syllabus text
+SYLLABUS_SUBJECTS = ["ENGINEERING WORKSHOP", "ENGINEERING CHEMISTRY", "ENGLISH", "MATHS",
+                     "ENVIRONMENTAL SCIENCE", "EITK", "PPS"]
+TERM_LENGTH_DAYS = 120 # Default span that generated due dates are spread over
+OUTLINE_MAX_TOPICS_PER_UNIT = 30
+OUTLINE_TOPIC_LENGTH = (3, 100) # Shorter or longer fragments are not topics
+
+# Sound settings
+ALERT_FREQUENCY = 2500       # Hz
+ALERT_DURATION_MS = 500
+SOUND_QUEUE_SIZE = 2         # Pending sounds beyond this are dropped
+
+# --- Sound Backends ---
+class SoundBackend:
+    """Base audio backend. Subclasses play a single tone and may block while doing so."""
+    name = "base"
+
+    def play(self, frequency, duration_ms):
+        raise NotImplementedError
+
+class WindowsSoundBackend(SoundBackend):
+    """Plays tones through winsound.Beep."""
+    name = "windows"
+
+    def play(self, frequency, duration_ms):
+        winsound.Beep(frequency, duration_ms)
+
+class LinuxSoundBackend(SoundBackend):
+    """Plays an alert through the first available command line player, or the terminal bell."""
+    name = "linux"
+    BELL_SOUNDS = ("/usr/share/sounds/freedesktop/stereo/bell.oga",
+                   "/usr/share/sounds/freedesktop/stereo/complete.oga")
+
+    def __init__(self):
+        self.command = None
+        sound_file = next((path for path in self.BELL_SOUNDS if os.path.exists(path)), None)
+        if shutil.which("beep"):
+            self.command = ["beep", "-f", "{frequency}", "-l", "{duration}"]
+        elif sound_file and shutil.which("paplay"):
+            self.command = ["paplay", sound_file]
+        elif sound_file and shutil.which("canberra-gtk-play"):
+            self.command = ["canberra-gtk-play", "-f", sound_file]
+
+    def play(self, frequency, duration_ms):
+        if self.command:
+            args = [arg.format(frequency=frequency, duration=duration_ms) for arg in self.command]
+            try:
+                subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               timeout=5, check=False)
+                return
+            except (OSError, subprocess.SubprocessError):
+                self.command = None # Player is broken, fall back to the bell from now on
+        # Terminal bell fallback
+        if sys.stdout:
+            sys.stdout.write("\a")
+            sys.stdout.flush()
+
+class NullSoundBackend(SoundBackend):
+    """Silent backend used when no audio is available."""
+    name = "null"
+
+    def play(self, frequency, duration_ms):
+        pass
+
+def get_sound_backend():
+    """Picks the best sound backend for the current platform."""
+    if winsound is not None:
+        return WindowsSoundBackend()
+    if sys.platform.startswith("linux"):
+        return LinuxSoundBackend()
+    return NullSoundBackend()
+
+class SoundPlayer:
+    """Plays sounds on a dedicated worker thread so the Tk main loop never waits on audio.
+
+    The queue is bounded: a sound that is already pending is merged with the new request,
+    and requests arriving while the queue is full are dropped.
+    """
+    def __init__(self, backend=None, max_pending=SOUND_QUEUE_SIZE):
+        self.backend = backend or get_sound_backend()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def play(self, frequency=ALERT_FREQUENCY, duration_ms=ALERT_DURATION_MS):
+        """Queues a sound. Returns False if it was merged with a pending one or dropped."""
+        sound = (frequency, duration_ms)
+        with self._lock:
+            if sound in self._pending:
+                return False # Same sound is already waiting, merge them
+            try:
+                self._queue.put_nowait(sound)
+            except queue.Full:
+                return False # Too many sounds stacked up, drop this one
+            self._pending.add(sound)
+        return True
+
+    def stop(self):
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass # Worker is a daemon thread, it exits with the app anyway
+
+    def _run(self):
+        while True:
+            sound = self._queue.get()
+            if sound is None:
+                break
+            with self._lock:
+                self._pending.discard(sound)
+            try:
+                self.backend.play(*sound)
+            except Exception as e:
+                print(f"Sound playback failed on {self.backend.name} backend: {e}")
+                self.backend = NullSoundBackend()
+
+def file_version_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 class PersistentData:
     """Class to handle JSON-based persistent storage for *all* users' data of a specific type."""
-    def __init__(self, filepath):
+    headless = False # Set by the store server, which has no Tk root to show dialogs on
+
+    def __init__(self, filepath, append_only=False):
         self.filepath = filepath
+        self.append_only = append_only # Records are only ever added or replaced, never edited in place
+        self.collection = os.path.splitext(os.path.basename(filepath))[0]
+        self.journal = None # SyncJournal that records changes to this store, if any
+        self.events = None # StoreEvents that open views subscribe to, if any
+        self.snapshots = {} # username -> records as of the last get/set (see diff_records)
         # data will be a dictionary where keys are usernames
         self.data = {}
         self.load()
@@ -69,10 +378,10 @@ class PersistentData:
             except FileNotFoundError:
                 self.data = {} # File not found, start with empty data
             except json.JSONDecodeError:
-                messagebox.showwarning("Data Corrupted", f"The data file {self.filepath} is corrupted and cannot be loaded. Starting with empty data.", icon="warning")
+                self.report("warning", "Data Corrupted", f"The data file {self.filepath} is corrupted and cannot be loaded. Starting with empty data.")
                 self.data = {} # JSON decode error, start with empty data
             except Exception as e:
-                messagebox.showerror("Error Loading Data", f"An unexpected error occurred while loading {self.filepath}: {e}", icon="error")
+                self.report("error", "Error Loading Data", f"An unexpected error occurred while loading {self.filepath}: {e}")
                 self.data = {}
         else:
             self.data = {}
@@ -85,17 +394,3261 @@ class PersistentData:
                 json.dump(self.data, f, indent=4)
         except Exception as e:
             print(f"Error saving {self.filepath}: {e}")
-            messagebox.showerror("Save Error", f"Failed to save data to {self.filepath}: {e}", icon="error")
+            self.report("error", "Save Error", f"Failed to save data to {self.filepath}: {e}")
+
+    def report(self, level, title, message):
+        if self.headless:
+            print(f"{title}: {message}")
+        elif level == "warning":
+            messagebox.showwarning(title, message, icon="warning")
+        else:
+            messagebox.showerror(title, message, icon="error")
 
     def get_user_data(self, username, default=None):
-        return self.data.get(username, default)
+        value = self.data.get(username, default)
+        if username in self.data and username not in self.snapshots:
+            self.snapshots[username] = record_snapshot(value, not self.append_only) # Before the caller edits it in place
+        return value
+
+    def version_stamp(self):
+        """(mtime_ns, size) of the backing file, or None if it was never saved."""
+        return file_version_stamp(self.filepath)
 
     def set_user_data(self, username, value):
+        changes = diff_records(self.snapshots, username, value, self.data.get(username), not self.append_only)
+        if self.journal is not None:
+            self.journal.record(self.collection, username, value, changes)
         self.data[username] = value
         self.save()
+        if self.events is not None:
+            self.events.publish(self.collection, username, changes)
+
+def stamp_record(record):
+    """Gives a record a stable id (if it has none) and marks it as modified now."""
+    record.setdefault("id", str(uuid.uuid4()))
+    record["modified_at"] = datetime.now().isoformat()
+    return record
+
+# --- Focus Time Rollups ---
+# Timer sessions are aggregated per day ("2025-06-20"), ISO week ("2025-W25") and
+# month ("2025-06"), then per timer type, so totals never need a scan of the raw history.
+ROLLUP_PERIODS = ("daily", "weekly", "monthly")
+FOCUS_TIMER_TYPES = ("Pomodoro", "My Timer") # "Break" sessions are not focus time
+
+def rollup_keys(timestamp):
+    """Returns the (day, week, month) bucket keys for a datetime."""
+    iso_year, iso_week, _ = timestamp.isocalendar()
+    return (timestamp.strftime("%Y-%m-%d"),
+            f"{iso_year}-W{iso_week:02d}",
+            timestamp.strftime("%Y-%m"))
+
+def empty_timer_rollups():
+    return {"entries": 0, "daily": {}, "weekly": {}, "monthly": {}}
+
+def add_session_to_rollups(rollups, entry):
+    """Adds one timer history entry to the rollups in O(1)."""
+    rollups["entries"] += 1
+    try:
+        timestamp = datetime.fromisoformat(entry["timestamp"])
+        minutes = float(entry.get("duration_minutes", 0))
+    except (KeyError, TypeError, ValueError):
+        return # Malformed entries are counted but not aggregated
+    timer_type = entry.get("type", "Unknown")
+    for period, key in zip(ROLLUP_PERIODS, rollup_keys(timestamp)):
+        bucket = rollups[period].setdefault(key, {}).setdefault(timer_type, {"minutes": 0, "sessions": 0})
+        bucket["minutes"] += minutes
+        bucket["sessions"] += 1
+
+def build_timer_rollups(history):
+    """Rebuilds the rollups from the raw timer history."""
+    rollups = empty_timer_rollups()
+    for entry in history:
+        add_session_to_rollups(rollups, entry)
+    return rollups
+
+def timer_rollups_valid(rollups, history):
+    """Cheap structural check that the stored rollups still match the raw history."""
+    if not isinstance(rollups, dict) or rollups.get("entries") != len(history):
+        return False
+    return all(isinstance(rollups.get(period), dict) for period in ROLLUP_PERIODS)
+
+# --- Recurring Reminders ---
+# A recurring reminder stores its rule next to the *next* occurrence in "datetime":
+#   "recurrence": {"freq": "daily" | "weekly", "days": [0, 2], "until": "YYYY-MM-DD"}
+# Only that one occurrence is materialized; later ones are computed on demand.
+REMINDER_REPEAT_OPTIONS = ["Once", "Daily", "Weekly"]
+SNOOZE_OPTIONS = ["5 min", "10 min", "15 min", "30 min", "60 min"]
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+def parse_weekdays(text):
+    """Parses "Mon, Wed" into [0, 2]. Raises ValueError on unknown day names."""
+    days = set()
+    for part in text.replace(";", ",").split(","):
+        name = part.strip()[:3].capitalize()
+        if not name:
+            continue
+        if name not in WEEKDAY_NAMES:
+            raise ValueError(f"Unknown weekday: {part.strip()}")
+        days.add(WEEKDAY_NAMES.index(name))
+    return sorted(days)
+
+def describe_recurrence(rule):
+    if not rule:
+        return ""
+    if rule.get("freq") == "weekly":
+        text = "weekly on " + ", ".join(WEEKDAY_NAMES[d] for d in rule.get("days", []))
+    else:
+        text = "daily"
+    if rule.get("until"):
+        text += f" until {rule['until']}"
+    return text
+
+def reminder_due_time(reminder):
+    """When the reminder should fire next, taking a snooze into account."""
+    return datetime.fromisoformat(reminder.get("snoozed_until") or reminder["datetime"])
+
+def next_occurrence(reminder, after):
+    """Returns the first occurrence strictly after `after`, or None when the series has ended."""
+    start = datetime.fromisoformat(reminder["datetime"])
+    rule = reminder.get("recurrence")
+    if not rule:
+        return start if start > after else None
+
+    until = None
+    if rule.get("until"):
+        until = datetime.strptime(rule["until"], "%Y-%m-%d") + timedelta(days=1) # Inclusive end date
+
+    candidate = None
+    if rule.get("freq") == "weekly":
+        after = max(after, start - timedelta(microseconds=1)) # Never before the series start
+        first_day = after.date()
+        for offset in range(8):
+            day = first_day + timedelta(days=offset)
+            if day.weekday() in rule.get("days", []):
+                possible = datetime.combine(day, start.time())
+                if possible > after:
+                    candidate = possible
+                    break
+    elif after < start:
+        candidate = start
+    else: # Daily
+        candidate = start + timedelta(days=(after - start) // timedelta(days=1) + 1)
+    if candidate is None or (until and candidate >= until):
+        return None
+    return candidate
+
+def expand_occurrences(reminder, range_start, range_end):
+    """Yields the occurrences of a reminder inside [range_start, range_end) lazily."""
+    occurrence = next_occurrence(reminder, range_start - timedelta(microseconds=1))
+    while occurrence is not None and occurrence < range_end:
+        yield occurrence
+        occurrence = next_occurrence(reminder, occurrence)
+
+# --- Progress Insights ---
+class ProgressInsights:
+    """Vectorized statistics over a user's timer and mood history (requires NumPy).
+
+    Results are cached per user and keyed on the history lengths and the current date,
+    so appending a timer session or mood entry invalidates them.
+    """
+    def __init__(self):
+        self._cache = {}
+
+    def get(self, username, timer_history, moods, today=None):
+        today = today or datetime.now().date()
+        key = (len(timer_history), len(moods), today)
+        cached = self._cache.get(username)
+        if cached and cached[0] == key:
+            return cached[1]
+        result = self.compute(timer_history, moods, today)
+        self._cache[username] = (key, result)
+        return result
+
+    def invalidate(self, username=None):
+        if username is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(username, None)
 
-class StudentGuideApp:
+    def snapshot(self, username):
+        """The cached (key, result) pair for a user, for the warm-start cache."""
+        return self._cache.get(username)
+
+    def seed(self, username, entry):
+        self._cache[username] = entry
+
+    @staticmethod
+    def parse_timestamps(entries):
+        """ISO timestamps to a datetime64[m] array; unparseable entries become NaT."""
+        raw = [entry.get("timestamp", "") if isinstance(entry, dict) else "" for entry in entries]
+        try:
+            return np.array(raw, dtype="datetime64[us]").astype("datetime64[m]")
+        except ValueError:
+            parsed = []
+            for value in raw:
+                try:
+                    parsed.append(np.datetime64(datetime.fromisoformat(value), "m"))
+                except (TypeError, ValueError):
+                    parsed.append(np.datetime64("NaT"))
+            return np.array(parsed, dtype="datetime64[m]")
+
+    @staticmethod
+    def load_timer_arrays(timer_history):
+        """Returns (timestamps, minutes) for focus sessions only."""
+        focus = [entry for entry in timer_history
+                 if isinstance(entry, dict) and entry.get("type") in FOCUS_TIMER_TYPES]
+        timestamps = ProgressInsights.parse_timestamps(focus)
+        minutes = np.array([entry.get("duration_minutes", 0) or 0 for entry in focus], dtype=float)
+        valid = ~np.isnat(timestamps)
+        return timestamps[valid], minutes[valid]
+
+    @staticmethod
+    def load_mood_arrays(moods):
+        """Returns (timestamps, mood codes) where codes index MOOD_OPTIONS."""
+        codes = np.array([MOOD_OPTIONS.index(m.get("mood")) if isinstance(m, dict) and m.get("mood") in MOOD_OPTIONS else -1
+                          for m in moods], dtype=np.int64)
+        timestamps = ProgressInsights.parse_timestamps(moods)
+        valid = (codes >= 0) & ~np.isnat(timestamps)
+        return timestamps[valid], codes[valid]
+
+    @staticmethod
+    def longest_run(active):
+        """Length of the longest run of True values in a boolean array."""
+        if not active.any():
+            return 0
+        edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+        return int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+
+    @staticmethod
+    def compute(timer_history, moods, today):
+        today_day = np.datetime64(today, "D")
+        timestamps, minutes = ProgressInsights.load_timer_arrays(timer_history)
+        result = {"current_streak": 0, "longest_streak": 0, "focus_last_7": 0.0, "focus_last_30": 0.0,
+                  "daily_days": np.array([], dtype="datetime64[D]"), "daily_minutes": np.array([]),
+                  "rolling_7": np.array([]), "rolling_30": np.array([]), "best_hours": []}
+
+        days = timestamps.astype("datetime64[D]")
+        if len(days):
+            first_day = min(days.min(), today_day)
+            day_index = (days - first_day).astype(np.int64)
+            n_days = int((today_day - first_day).astype(np.int64)) + 1
+            in_range = day_index < n_days # Ignore sessions logged with a future clock
+            daily = np.bincount(day_index[in_range], weights=minutes[in_range], minlength=n_days)
+
+            cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+            index = np.arange(1, n_days + 1)
+            result["rolling_7"] = cumulative[index] - cumulative[np.maximum(index - 7, 0)]
+            result["rolling_30"] = cumulative[index] - cumulative[np.maximum(index - 30, 0)]
+            result["focus_last_7"] = float(result["rolling_7"][-1])
+            result["focus_last_30"] = float(result["rolling_30"][-1])
+            result["daily_days"] = first_day + np.arange(n_days)
+            result["daily_minutes"] = daily
+
+            # Streaks: a streak is still alive if the student studied today or yesterday
+            active = daily > 0
+            result["longest_streak"] = ProgressInsights.longest_run(active)
+            inactive = np.flatnonzero(~active)
+            last_gap = inactive[-1] if len(inactive) else -1
+            trailing = n_days - 1 - last_gap
+            if trailing == 0 and n_days > 1 and active[-2]:
+                previous_gaps = inactive[:-1]
+                trailing = n_days - 2 - (previous_gaps[-1] if len(previous_gaps) else -1)
+            result["current_streak"] = int(trailing)
+
+            hours = (timestamps - timestamps.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.int64)
+            by_hour = np.bincount(hours, weights=minutes, minlength=24)
+            best = np.argsort(by_hour)[::-1][:3]
+            result["best_hours"] = [(int(hour), float(by_hour[hour])) for hour in best if by_hour[hour] > 0]
+
+        # Mood distributions by weekday and by time of day
+        mood_times, mood_codes = ProgressInsights.load_mood_arrays(moods)
+        n_moods = len(MOOD_OPTIONS)
+        mood_days = mood_times.astype("datetime64[D]")
+        weekdays = (mood_days.astype(np.int64) + 3) % 7 # 1970-01-01 was a Thursday
+        mood_hours = (mood_times - mood_days).astype("timedelta64[h]").astype(np.int64)
+        time_of_day = np.digitize(mood_hours, TIME_OF_DAY_BINS) % len(TIME_OF_DAY_NAMES)
+        result["mood_by_weekday"] = np.bincount(weekdays * n_moods + mood_codes,
+                                                minlength=7 * n_moods).reshape(7, n_moods)
+        result["mood_by_time_of_day"] = np.bincount(time_of_day * n_moods + mood_codes,
+                                                    minlength=len(TIME_OF_DAY_NAMES) * n_moods).reshape(len(TIME_OF_DAY_NAMES), n_moods)
+        result["mood_times"] = mood_times
+        result["mood_scores"] = np.array([MOOD_SCORES[mood] for mood in MOOD_OPTIONS])[mood_codes] if len(mood_codes) else np.array([])
+        return result
+
+# --- Trend Charts ---
+def lttb_downsample(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of sorted NumPy arrays to `threshold` points."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return xs, ys
+    every = (n - 2) / (threshold - 2)
+    # Bucket i covers [edges[i], edges[i + 1]); first and last points are always kept
+    edges = np.minimum((np.arange(threshold - 1) * every).astype(np.int64) + 1, n - 1)
+    edges[-1] = n - 1
+    sizes = np.diff(edges)
+    averages_x = np.add.reduceat(xs[:-1], edges[:-1]) / np.maximum(sizes, 1)
+    averages_y = np.add.reduceat(ys[:-1], edges[:-1]) / np.maximum(sizes, 1)
+    averages_x = np.append(averages_x, xs[-1])
+    averages_y = np.append(averages_y, ys[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if end <= start:
+            selected[i + 1] = a
+            continue
+        bx, by = xs[start:end], ys[start:end]
+        cx, cy = averages_x[i + 1], averages_y[i + 1]
+        areas = np.abs((xs[a] - cx) * (by - ys[a]) - (xs[a] - bx) * (cy - ys[a]))
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return xs[selected], ys[selected]
+
+class TrendChart:
+    """A line chart drawn on one tk.Canvas (requires NumPy).
+
+    Only the visible date range is rendered, downsampled to the canvas width with LTTB.
+    Scroll to zoom, drag to pan and double-click to show the full range.
+    """
+    def __init__(self, parent, width=400, height=180, line_color=ACCENT_COLOR_2, y_label=""):
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg=BG_COLOR,
+                                highlightthickness=1, highlightbackground=SHADOW_COLOR)
+        self.line_color = line_color
+        self.y_label = y_label
+        self.xs = np.array([], dtype=float)
+        self.ys = np.array([], dtype=float)
+        self.view = None # (start_x, end_x) in days since epoch
+        self.pixels_per_point = 1 # Grows when a redraw misses the frame budget
+        self.last_render_ms = 0.0
+        self._redraw_pending = False
+        self._drag_x = None
+
+        self.canvas.bind("<Configure>", lambda event: self.request_redraw())
+        self.canvas.bind("<MouseWheel>", self._on_wheel) # Windows and macOS
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(0.8, event.x)) # Linux scroll up
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(1.25, event.x)) # Linux scroll down
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<Double-Button-1>", lambda event: self.reset_view())
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def grid(self, **kwargs):
+        self.canvas.grid(**kwargs)
+
+    def set_data(self, xs, ys, keep_view=True):
+        """Replaces the series. xs must be sorted days since epoch."""
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        if not keep_view or self.view is None:
+            self.reset_view()
+        else:
+            self.request_redraw()
+
+    def reset_view(self):
+        if len(self.xs):
+            self.view = (self.xs[0], max(self.xs[-1], self.xs[0] + CHART_MIN_SPAN_DAYS))
+        else:
+            self.view = None
+        self.request_redraw()
+
+    def zoom(self, factor, pixel_x):
+        if self.view is None:
+            return
+        start, end = self.view
+        anchor = start + (end - start) * pixel_x / max(self.canvas.winfo_width(), 1)
+        span = max((end - start) * factor, CHART_MIN_SPAN_DAYS)
+        ratio = (anchor - start) / (end - start)
+        self.view = (anchor - span * ratio, anchor + span * (1 - ratio))
+        self.request_redraw()
+
+    def _on_wheel(self, event):
+        self.zoom(0.8 if event.delta > 0 else 1.25, event.x)
+
+    def _on_press(self, event):
+        self._drag_x = event.x
+
+    def _on_drag(self, event):
+        if self.view is None or self._drag_x is None:
+            return
+        start, end = self.view
+        shift = (self._drag_x - event.x) * (end - start) / max(self.canvas.winfo_width(), 1)
+        self.view = (start + shift, end + shift)
+        self._drag_x = event.x
+        self.request_redraw()
+
+    def request_redraw(self):
+        """Coalesces bursts of zoom/pan events into a single redraw."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.canvas.after_idle(self.render)
+
+    def render(self):
+        self._redraw_pending = False
+        if not self.canvas.winfo_exists():
+            return
+        started = time.perf_counter()
+        canvas = self.canvas
+        canvas.delete("all")
+        width, height = max(canvas.winfo_width(), 2), max(canvas.winfo_height(), 2)
+        pad_left, pad_right, pad_top, pad_bottom = 40, 10, 10, 22
+
+        if self.view is None:
+            canvas.create_text(width / 2, height / 2, text="No data yet", fill=TEXT_COLOR, font=FONT_SMALL)
+            return
+
+        # Slice the visible window, keeping one neighbour on each side so lines reach the edges
+        start, end = self.view
+        first = max(int(np.searchsorted(self.xs, start, side="left")) - 1, 0)
+        last = min(int(np.searchsorted(self.xs, end, side="right")) + 1, len(self.xs))
+        xs, ys = self.xs[first:last], self.ys[first:last]
+
+        plot_width = width - pad_left - pad_right
+        plot_height = height - pad_top - pad_bottom
+        xs, ys = lttb_downsample(xs, ys, max(plot_width // self.pixels_per_point, 3))
+
+        low, high = (float(ys.min()), float(ys.max())) if len(ys) else (0.0, 1.0)
+        if high == low:
+            high = low + 1
+        px = pad_left + (xs - start) * plot_width / (end - start)
+        py = pad_top + (high - ys) * plot_height / (high - low)
+
+        # Axes and labels
+        canvas.create_line(pad_left, pad_top, pad_left, height - pad_bottom, fill=SHADOW_COLOR)
+        canvas.create_line(pad_left, height - pad_bottom, width - pad_right, height - pad_bottom, fill=SHADOW_COLOR)
+        canvas.create_text(pad_left - 4, pad_top, text=f"{high:g}", anchor="ne", fill=TEXT_COLOR, font=FONT_SMALL)
+        canvas.create_text(pad_left - 4, height - pad_bottom, text=f"{low:g}", anchor="se", fill=TEXT_COLOR, font=FONT_SMALL)
+        for value, anchor in ((start, "nw"), (end, "ne")):
+            day = datetime.fromordinal(int(value) + EPOCH_ORDINAL).strftime("%Y-%m-%d")
+            x = pad_left if anchor == "nw" else width - pad_right
+            canvas.create_text(x, height - pad_bottom + 3, text=day, anchor=anchor, fill=TEXT_COLOR, font=FONT_SMALL)
+        if self.y_label:
+            canvas.create_text(pad_left + 4, pad_top, text=self.y_label, anchor="nw", fill=TEXT_COLOR, font=FONT_SMALL)
+
+        # The whole visible series is a single canvas item
+        if len(px) == 1:
+            canvas.create_oval(px[0] - 2, py[0] - 2, px[0] + 2, py[0] + 2, fill=self.line_color, outline="")
+        elif len(px) > 1:
+            points = np.empty(len(px) * 2)
+            points[0::2], points[1::2] = px, py
+            canvas.create_line(*points.tolist(), fill=self.line_color, width=2)
+
+        # Adapt detail so later redraws stay within the frame budget
+        self.last_render_ms = (time.perf_counter() - started) * 1000
+        if self.last_render_ms > CHART_FRAME_BUDGET_MS and self.pixels_per_point < 8:
+            self.pixels_per_point *= 2
+        elif self.last_render_ms < CHART_FRAME_BUDGET_MS / 4 and self.pixels_per_point > 1:
+            self.pixels_per_point //= 2
+
+# --- Study Heatmap ---
+class StudyHeatmap:
+    """GitHub-style year heatmap of daily focus minutes or moods.
+
+    The whole year is a single PhotoImage on a Canvas; hovering looks the day up by
+    its cell index instead of binding one widget per day.
+    """
+    def __init__(self, parent):
+        self.frame = ctk.CTkFrame(parent, fg_color="transparent")
+        step = HEATMAP_CELL + HEATMAP_GAP
+        self.width, self.height = HEATMAP_WEEKS * step, 7 * step
+        self.canvas = tk.Canvas(self.frame, width=self.width, height=self.height, bg=BG_COLOR,
+                                highlightthickness=0)
+        self.canvas.pack()
+        self.image = tk.PhotoImage(master=self.canvas, width=self.width, height=self.height)
+        self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+        self.info_label = ctk.CTkLabel(self.frame, text="Hover over a day to see details.",
+                                       font=FONT_SMALL, text_color=TEXT_COLOR)
+        self.info_label.pack(pady=(4, 0))
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda event: self.info_label.configure(text="Hover over a day to see details."))
+
+        self.mode = HEATMAP_MODES[0]
+        self.days = [] # Cell index -> "YYYY-MM-DD" (None for future days)
+        self.focus_by_day = {}
+        self.mood_by_day = {}
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def set_data(self, focus_by_day, mood_by_day, today=None):
+        """focus_by_day maps "YYYY-MM-DD" to minutes, mood_by_day maps it to a mood label."""
+        self.focus_by_day = focus_by_day
+        self.mood_by_day = mood_by_day
+        today = today or datetime.now().date()
+        # Columns are Monday-first weeks, the last column holds the current week
+        first_monday = today - timedelta(days=today.weekday(), weeks=HEATMAP_WEEKS - 1)
+        self.days = []
+        for index in range(HEATMAP_WEEKS * 7):
+            day = first_monday + timedelta(days=index)
+            self.days.append(day.isoformat() if day <= today else None)
+        self.render()
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.render()
+
+    def cell_color(self, day):
+        if day is None:
+            return BG_COLOR
+        if self.mode == "Mood":
+            return MOOD_COLORS.get(self.mood_by_day.get(day), HEATMAP_EMPTY_COLOR)
+        minutes = self.focus_by_day.get(day, 0)
+        if minutes <= 0:
+            return HEATMAP_EMPTY_COLOR
+        level = sum(minutes >= threshold for threshold in FOCUS_HEAT_THRESHOLDS)
+        return FOCUS_HEAT_COLORS[level]
+
+    def render(self):
+        """Paints each weekday as one pixel row tiled down the cell height (7 put calls per redraw)."""
+        gap_pixels = [BG_COLOR] * HEATMAP_GAP
+        for weekday in range(7):
+            row = []
+            for week in range(HEATMAP_WEEKS):
+                row.extend([self.cell_color(self.days[week * 7 + weekday])] * HEATMAP_CELL)
+                row.extend(gap_pixels)
+            top = weekday * (HEATMAP_CELL + HEATMAP_GAP)
+            self.image.put("{" + " ".join(row) + "}", to=(0, top, self.width, top + HEATMAP_CELL))
+
+    def _on_motion(self, event):
+        step = HEATMAP_CELL + HEATMAP_GAP
+        week, weekday = event.x // step, event.y // step
+        if not (0 <= week < HEATMAP_WEEKS and 0 <= weekday < 7):
+            return
+        day = self.days[week * 7 + weekday] if self.days else None
+        if day is None:
+            return
+        minutes = self.focus_by_day.get(day, 0)
+        mood = self.mood_by_day.get(day, "no mood logged")
+        self.info_label.configure(text=f"{day}: {minutes:g} min focus, {mood}")
+
+# --- Data Export ---
+class DataExporter:
+    """Streams one user's collections to NDJSON, CSV or a zip bundle.
+
+    `collections` yields (name, record count, records iterator) triples. Each iterator is
+    consumed once, on the worker, and records are written one at a time, so memory does
+    not grow with history size. The counts only drive progress.
+    """
+    def __init__(self, collections, progress_callback=None, cancel_event=None):
+        self.collections = list(collections)
+        self.total = sum(count for _, count, _ in self.collections)
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.written = 0
+
+    def iter_records(self, only=None):
+        """Yields (collection, cleaned record) pairs, optionally for a single collection."""
+        for name, _, records in self.collections:
+            if only is not None and name != only:
+                continue
+            for record in records:
+                if self.cancel_event.is_set():
+                    return
+                yield name, {key: value for key, value in record.items() if key not in EXPORT_PRIVATE_FIELDS}
+
+    def _tick(self):
+        self.written += 1
+        if self.progress_callback and (self.written % EXPORT_PROGRESS_EVERY == 0 or self.written == self.total):
+            self.progress_callback(self.written, self.total)
+
+    @staticmethod
+    def csv_value(value):
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+
+    def write_ndjson(self, f):
+        for name, record in self.iter_records():
+            f.write(json.dumps({"collection": name, "record": record}, ensure_ascii=False) + "\n")
+            self._tick()
+
+    def write_csv(self, f, only=None):
+        fields = EXPORT_FIELDS[only] if only else ["collection"] + list(dict.fromkeys(
+            field for names in EXPORT_FIELDS.values() for field in names))
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for name, record in self.iter_records(only):
+            row = {key: self.csv_value(value) for key, value in record.items()}
+            if not only:
+                row["collection"] = name
+            writer.writerow(row)
+            self._tick()
+
+    def write_zip(self, path):
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            counts = {}
+            for name, _, _ in self.collections:
+                # zipfile streams each member, nothing is buffered in memory as a whole
+                before = self.written
+                with bundle.open(f"{name}.csv", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                    self.write_csv(f, only=name)
+                counts[name] = self.written - before
+            manifest = {"exported_at": datetime.now().isoformat(), "counts": counts}
+            bundle.writestr("manifest.json", json.dumps(manifest, indent=4))
+
+    def export(self, path, fmt):
+        """Writes the export and returns the number of records written."""
+        if fmt == "Zip bundle":
+            self.write_zip(path)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                if fmt == "CSV":
+                    self.write_csv(f)
+                else:
+                    self.write_ndjson(f)
+        return self.written
+
+# --- Doubt Bodies ---
+# doubts.json only holds what lists need (title, status, ids, signature). A description
+# longer than DOUBT_INLINE_CHARS is moved into a content-addressed TextBlobStore and the
+# record keeps its "description_ref"; windows that show the text load it on demand.
+# Everything that leaves the machine (sync, exports) carries the description inline again.
+class TextBlobStore:
+    """Text bodies stored once under their SHA-256: <folder>/<2 hex>/<sha256>.txt, or .txt.gz when compressed."""
+    def __init__(self, folder=DOUBT_BODY_FOLDER, compress=True):
+        self.folder = folder
+        self.compress = compress
+
+    def paths(self, ref):
+        base = os.path.join(self.folder, ref[:2], ref)
+        return base + ".txt", base + ".txt.gz"
+
+    def put(self, text):
+        data = text.encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        plain_path, gzip_path = self.paths(ref)
+        if os.path.exists(plain_path) or os.path.exists(gzip_path):
+            return ref # Same text already stored
+        path = gzip_path if self.compress and len(data) >= DOUBT_COMPRESS_MIN_BYTES else plain_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(gzip.compress(data, mtime=0) if path == gzip_path else data)
+        os.replace(temp_path, path)
+        return ref
+
+    def get(self, ref):
+        """The stored text, or None if it is not on this machine."""
+        plain_path, gzip_path = self.paths(ref)
+        try:
+            with open(plain_path, "rb") as f:
+                return f.read().decode("utf-8")
+        except FileNotFoundError:
+            pass
+        try:
+            with open(gzip_path, "rb") as f:
+                return gzip.decompress(f.read()).decode("utf-8")
+        except (OSError, EOFError): # Missing, or damaged
+            return None
+
+    def collect_garbage(self, live_refs):
+        """Deletes bodies no record refers to. Returns how many were removed."""
+        removed = 0
+        for fanout in SyllabusStore.scandir(self.folder):
+            if not fanout.is_dir():
+                continue
+            for entry in SyllabusStore.scandir(fanout.path):
+                if entry.name.split(".", 1)[0] not in live_refs and not entry.name.endswith(".tmp"):
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+def doubt_description(doubt, bodies):
+    if "description" in doubt:
+        return doubt["description"]
+    text = bodies.get(doubt["description_ref"]) if bodies is not None and doubt.get("description_ref") else None
+    return text if text is not None else ""
+
+def externalize_doubt(doubt, bodies):
+    """Moves a long inline description into `bodies`, leaving a ref. Returns the doubt."""
+    text = doubt.get("description")
+    if bodies is not None and isinstance(text, str) and len(text) > DOUBT_INLINE_CHARS:
+        doubt["description_ref"] = bodies.put(text)
+        del doubt["description"]
+    return doubt
+
+def inline_doubt(doubt, bodies):
+    """A copy of the doubt with its description inline, for sync and exports.
+
+    A body missing from this machine keeps its ref rather than going out as an empty description.
+    """
+    text = bodies.get(doubt["description_ref"]) if bodies is not None and doubt.get("description_ref") else None
+    if text is None:
+        return doubt
+    copy = {key: value for key, value in doubt.items() if key != "description_ref"}
+    copy["description"] = text
+    return copy
+
+def readable_doubt(doubt, bodies):
+    """inline_doubt for files people read: a body missing from this machine becomes DOUBT_BODY_MISSING_TEXT."""
+    copy = inline_doubt(doubt, bodies)
+    if "description" in copy:
+        return copy
+    copy = {key: value for key, value in copy.items() if key != "description_ref"}
+    copy["description"] = DOUBT_BODY_MISSING_TEXT
+    return copy
+
+# --- Doubt Archives ---
+# A term's doubts move between machines as one file: a zip of "Title:/Description:/Status:"
+# text files (the layout load_doubt_from_file reads) or a JSONL file with one doubt per line,
+# which also keeps record ids so importing the same export twice adds nothing.
+def format_doubt_text(doubt):
+    return f"Title: {doubt['title']}\nDescription: {doubt['description']}\nStatus: {doubt['status']}\n"
+
+def parse_doubt_text(content):
+    """Reads the layout written by format_doubt_text. Returns a doubt, or None if title or description is missing."""
+    lines = content.strip().splitlines()
+    status = lines.pop()[len("Status:"):].strip() if len(lines) > 2 and lines[-1].startswith("Status:") else ""
+    title = lines[0].removeprefix("Title:").strip() if lines else ""
+    description = "\n".join(lines[1:]).removeprefix("Description:").strip()
+    if not title or not description:
+        return None
+    return {"title": title, "description": description, "status": status if status in DOUBT_STATUSES else "Unresolved"}
+
+def doubt_from_json(value):
+    if not isinstance(value, dict) or not all(isinstance(value.get(key), str) and value[key].strip()
+                                              for key in ("title", "description")):
+        return None
+    doubt = {key: item for key, item in value.items() if key not in EXPORT_PRIVATE_FIELDS}
+    if doubt.get("status") not in DOUBT_STATUSES:
+        doubt["status"] = "Unresolved"
+    return doubt
+
+def doubt_file_stem(title):
+    stem = "".join(c if c.isalnum() else "_" for c in title).strip("_")[:80]
+    return stem or f"doubt_{uuid.uuid4().hex[:8]}"
+
+def write_doubt_archive(path, doubts, fmt, progress_callback=None, cancel_event=None, total=None):
+    """Streams doubts into one zip of text files or one JSONL file. Returns the number written.
+
+    Each doubt is written as soon as it is formatted, so the archive is never held in memory.
+    `doubts` may be a generator; pass `total` for progress then.
+    """
+    total = len(doubts) if total is None else total
+    written = 0
+    def tick():
+        if progress_callback and (written % EXPORT_PROGRESS_EVERY == 0 or written == total):
+            progress_callback(written, total)
+
+    if fmt == "JSONL":
+        with open(path, "w", encoding="utf-8") as f:
+            for doubt in doubts:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                f.write(json.dumps(doubt, ensure_ascii=False) + "\n")
+                written += 1
+                tick()
+        return written
+
+    used_names = set()
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for doubt in doubts:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            stem = name = doubt_file_stem(doubt["title"])
+            copy = 1
+            while name.lower() in used_names: # Two doubts with the same title
+                copy += 1
+                name = f"{stem}_{copy}"
+            used_names.add(name.lower())
+            bundle.writestr(f"doubts/{name}.txt", format_doubt_text(doubt))
+            written += 1
+            tick()
+    return written
+
+def list_doubt_sources(path):
+    """(source, member names) for a folder or zip of doubt files, or for a single .txt/.jsonl file."""
+    if os.path.isdir(path):
+        names = [os.path.relpath(os.path.join(folder, name), path)
+                 for folder, _, files in os.walk(path) for name in files if name.lower().endswith(DOUBT_IMPORT_SUFFIXES)]
+        return path, sorted(names)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return path, [info.filename for info in archive.infolist()
+                          if not info.is_dir() and info.filename.lower().endswith(DOUBT_IMPORT_SUFFIXES)]
+    return os.path.dirname(path) or ".", [os.path.basename(path)]
+
+def parse_doubt_batch(source, names):
+    """Process pool worker: parses doubt files from a folder or zip archive. Returns (doubts, errors)."""
+    doubts, errors = [], []
+    archive = None if os.path.isdir(source) else zipfile.ZipFile(source)
+    try:
+        for name in names:
+            try:
+                if archive is not None:
+                    raw = archive.read(name)
+                else:
+                    with open(os.path.join(source, name), "rb") as f:
+                        raw = f.read()
+                content = raw.decode("utf-8-sig")
+            except (OSError, KeyError, zipfile.BadZipFile, UnicodeDecodeError) as e:
+                errors.append((name, str(e)))
+                continue
+            if name.lower().endswith(".txt"):
+                doubt = parse_doubt_text(content)
+                if doubt:
+                    doubts.append(doubt)
+                else:
+                    errors.append((name, "Needs a title and a description"))
+                continue
+            for number, line in enumerate(content.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    doubt = doubt_from_json(json.loads(line))
+                except ValueError:
+                    doubt = None
+                if doubt:
+                    doubts.append(doubt)
+                else:
+                    errors.append((f"{name}:{number}", "Not a doubt record"))
+    finally:
+        if archive is not None:
+            archive.close()
+    return doubts, errors
+
+def read_doubt_files(path, progress_callback=None, workers=None):
+    """Parses every doubt file under `path` in a process pool. Returns (doubts, errors, files read)."""
+    source, names = list_doubt_sources(path)
+    batches = [names[i:i + DOUBT_IMPORT_BATCH] for i in range(0, len(names), DOUBT_IMPORT_BATCH)]
+    doubts, errors = [], []
+    if len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(batches), workers or os.cpu_count() or 1)) as pool:
+            results = pool.map(parse_doubt_batch, [source] * len(batches), batches)
+            for done, (batch_doubts, batch_errors) in enumerate(results, start=1):
+                doubts.extend(batch_doubts)
+                errors.extend(batch_errors)
+                if progress_callback:
+                    progress_callback(min(done * DOUBT_IMPORT_BATCH, len(names)), len(names))
+    elif batches:
+        doubts, errors = parse_doubt_batch(source, batches[0]) # Not worth a pool
+    return doubts, errors, len(names)
+
+def doubt_content_key(doubt, bodies=None):
+    return tuple(" ".join(text.split()).casefold() for text in (doubt["title"], doubt_description(doubt, bodies)))
+
+def merge_doubts(existing, incoming, bodies=None):
+    """Appends incoming doubts not already present (same id, or same title and description).
+
+    Returns (added, duplicates). The caller saves `existing` once.
+    """
+    ids = {doubt["id"] for doubt in existing if "id" in doubt}
+    keys = {doubt_content_key(doubt, bodies) for doubt in existing}
+    added = duplicates = 0
+    for doubt in incoming:
+        key = doubt_content_key(doubt)
+        if doubt.get("id") in ids or key in keys:
+            duplicates += 1
+            continue
+        ensure_doubt_signature(doubt)
+        existing.append(stamp_record(externalize_doubt(doubt, bodies)))
+        ids.add(doubt["id"])
+        keys.add(key)
+        added += 1
+    return added, duplicates
+
+# --- Duplicate Doubts ---
+# A doubt's shingles are its stemmed content words plus adjacent word pairs, so rewordings
+# ("Why does entropy increase?" / "why is entropy always increasing") overlap heavily while
+# unrelated questions share almost nothing. Each shingle is hashed MINHASH_PERMUTATIONS ways
+# at once (one shake_128 digest cut into 32-bit words) and the signature keeps the minimum
+# per position; it is stored on the doubt, and matching positions estimate Jaccard
+# similarity. LSH splits signatures into bands and only doubts sharing a band are compared.
+MINHASH_FORMAT = f"<{MINHASH_PERMUTATIONS}I"
+
+def stem_word(word):
+    for suffix in ("ing", "ed", "es", "s", "e"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def doubt_shingles(doubt, description=None):
+    description = doubt.get("description", "") if description is None else description
+    words = re.findall(r"[^\W_]+", f"{doubt['title']} {description}".casefold().replace("'", ""))
+    content = [stem_word(word) for word in words if word not in DOUBT_STOP_WORDS] or words
+    return set(content) | {f"{first} {second}" for first, second in zip(content, content[1:])}
+
+def minhash_signature(shingles):
+    rows = [struct.unpack(MINHASH_FORMAT, hashlib.shake_128(shingle.encode("utf-8")).digest(4 * MINHASH_PERMUTATIONS))
+            for shingle in shingles]
+    return [min(column) for column in zip(*rows)] or None
+
+def ensure_doubt_signature(doubt, description=None):
+    """Returns the doubt's signature, computing and storing it (as base64) if missing. None for empty text.
+
+    Pass `description` for doubts whose description is stored out of line.
+    """
+    try:
+        return list(struct.unpack(MINHASH_FORMAT, base64.b64decode(doubt["minhash"])))
+    except (KeyError, TypeError, ValueError, struct.error):
+        signature = minhash_signature(doubt_shingles(doubt, description))
+        if signature is not None:
+            doubt["minhash"] = base64.b64encode(struct.pack(MINHASH_FORMAT, *signature)).decode("ascii")
+        return signature
+
+def signature_similarity(first, second):
+    return sum(1 for a, b in zip(first, second) if a == b) / MINHASH_PERMUTATIONS
+
+class MinHashIndex:
+    """LSH buckets over doubt signatures, one dict per band: band values -> ids. Kept per user by the app."""
     def __init__(self):
+        self.signatures = {} # id -> signature
+        self.bands = [{} for _ in range(MINHASH_BANDS)]
+
+    @staticmethod
+    def band_keys(signature):
+        rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+        return zip(*(signature[offset::rows] for offset in range(rows)))
+
+    def add(self, record_id, signature):
+        if record_id in self.signatures:
+            self.remove(record_id)
+        if signature is None:
+            return
+        self.signatures[record_id] = signature
+        for buckets, key in zip(self.bands, self.band_keys(signature)):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {record_id}
+            else:
+                bucket.add(record_id)
+
+    def remove(self, record_id):
+        signature = self.signatures.pop(record_id, None)
+        if signature is None:
+            return
+        for buckets, key in zip(self.bands, self.band_keys(signature)):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(record_id)
+                if not bucket:
+                    del buckets[key]
+
+    def query(self, signature, threshold=DUPLICATE_SIMILARITY):
+        """[(similarity, id)] of indexed doubts at least `threshold` similar, most similar first."""
+        if signature is None:
+            return []
+        candidates = set()
+        for buckets, key in zip(self.bands, self.band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+        matches = [(signature_similarity(signature, self.signatures[record_id]), record_id) for record_id in candidates]
+        return sorted((match for match in matches if match[0] >= threshold), reverse=True)
+
+    def duplicate_groups(self, threshold=DUPLICATE_SIMILARITY):
+        """Groups (lists of ids, two or more) of doubts linked by similarity, via union-find.
+
+        Each bucket member is only compared with the bucket's first member, so the work is
+        linear in the number of bucket entries rather than quadratic in bucket size; members
+        it misses still meet their duplicates in the other bands.
+        """
+        parent = {}
+        def find(record_id):
+            root = record_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while record_id != root: # Path compression
+                parent[record_id], record_id = root, parent[record_id]
+            return root
+
+        for bucket in (bucket for buckets in self.bands for bucket in buckets.values()):
+            if len(bucket) < 2:
+                continue
+            first, *others = bucket
+            for other in others:
+                if find(first) != find(other) and \
+                        signature_similarity(self.signatures[first], self.signatures[other]) >= threshold:
+                    parent[find(other)] = find(first)
+        groups = {}
+        for record_id in list(parent):
+            root = find(record_id)
+            groups.setdefault(root, {root}).add(record_id)
+        return [list(members) for members in groups.values()]
+
+# --- Bulk Import ---
+class BulkImporter:
+    """Parses CSV or iCalendar files into task, plan and reminder records.
+
+    Files are read row by row, dates are validated through a shared cache (schedules
+    repeat the same dates a lot) and bad rows are collected with their line numbers.
+    Nothing is saved here; the caller commits the lists in one write.
+
+    CSV columns: kind (task/plan/reminder), title, subject, topic, date, time, status.
+    """
+    def __init__(self):
+        self.tasks = []
+        self.plans = []
+        self.reminders = []
+        self.errors = [] # (line number, message)
+        self._date_cache = {}
+
+    @property
+    def count(self):
+        return len(self.tasks) + len(self.plans) + len(self.reminders)
+
+    def parse_datetime(self, text, fmt):
+        key = (text, fmt)
+        if key not in self._date_cache:
+            try:
+                self._date_cache[key] = datetime.strptime(text, fmt)
+            except ValueError:
+                self._date_cache[key] = None
+        return self._date_cache[key]
+
+    def add_row(self, line, kind, title="", subject="", topic="", date="", time_str="", status=""):
+        kind = kind.strip().lower()
+        title, subject, topic, date, time_str, status = (value.strip() for value in (title, subject, topic, date, time_str, status))
+        if date and self.parse_datetime(date, "%Y-%m-%d") is None:
+            self.errors.append((line, f"Invalid date '{date}', expected YYYY-MM-DD"))
+            return
+
+        if kind == "task":
+            if not title:
+                self.errors.append((line, "Task title is empty"))
+                return
+            status = status.capitalize() or "Pending"
+            if status not in TASK_STATUSES:
+                self.errors.append((line, f"Unknown task status '{status}'"))
+                return
+            self.tasks.append(stamp_record({"task": title, "due_date": date or "No Due Date", "status": status,
+                                            "created_at": datetime.now().isoformat()}))
+        elif kind == "plan":
+            topic = topic or title
+            if not subject or not topic:
+                self.errors.append((line, "Plan needs a subject and a topic"))
+                return
+            status = status.title() or "Planned"
+            if status not in PLAN_STATUSES:
+                self.errors.append((line, f"Unknown plan status '{status}'"))
+                return
+            self.plans.append(stamp_record({"subject": subject, "topic": topic, "due_date": date, "status": status}))
+        elif kind == "reminder":
+            if not title or not date or not time_str:
+                self.errors.append((line, "Reminder needs a title, date and time"))
+                return
+            when = self.parse_datetime(f"{date} {time_str}", "%Y-%m-%d %H:%M")
+            if when is None:
+                self.errors.append((line, f"Invalid time '{time_str}', expected HH:MM"))
+                return
+            self.reminders.append(stamp_record({"message": title, "datetime": when.isoformat(),
+                                                "status": "active", "recurrence": None}))
+        else:
+            self.errors.append((line, f"Unknown kind '{kind}', expected task, plan or reminder"))
+
+    def import_file(self, path):
+        if path.lower().endswith((".ics", ".ical", ".ifb")):
+            self.import_ics(path)
+        else:
+            self.import_csv(path)
+
+    def import_csv(self, path):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "kind" not in [name.strip().lower() for name in reader.fieldnames]:
+                self.errors.append((1, "CSV header must contain a 'kind' column"))
+                return
+            for row in reader:
+                row = {(key or "").strip().lower(): value or "" for key, value in row.items()}
+                self.add_row(reader.line_num, row.get("kind", ""), row.get("title", ""), row.get("subject", ""),
+                             row.get("topic", ""), row.get("date", ""), row.get("time", ""), row.get("status", ""))
+
+    @staticmethod
+    def iter_ics_lines(f):
+        """Yields (line number, unfolded content line) from an iCalendar file."""
+        pending, pending_line = None, 0
+        for number, raw in enumerate(f, start=1):
+            raw = raw.rstrip("\r\n")
+            if raw[:1] in (" ", "\t") and pending is not None:
+                pending += raw[1:] # Folded continuation line
+                continue
+            if pending is not None:
+                yield pending_line, pending
+            pending, pending_line = raw, number
+        if pending is not None:
+            yield pending_line, pending
+
+    @staticmethod
+    def ics_unescape(value):
+        return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+    def ics_datetime(self, value):
+        """Returns (datetime, has_time) for DATE or DATE-TIME values; UTC values become local time."""
+        value = value.strip()
+        if "T" not in value:
+            return self.parse_datetime(value[:8], "%Y%m%d"), False
+        parsed = self.parse_datetime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+        if parsed and value.endswith("Z"):
+            parsed = parsed.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        return parsed, True
+
+    def import_ics(self, path):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            component, props, start_line = None, {}, 0
+            for line, content in self.iter_ics_lines(f):
+                name, _, value = content.partition(":")
+                name, _, params = name.partition(";")
+                name = name.upper()
+                if name == "BEGIN" and value.upper() in ("VEVENT", "VTODO"):
+                    component, props, start_line = value.upper(), {}, line
+                elif name == "END" and component and value.upper() == component:
+                    self.add_ics_component(start_line, component, props)
+                    component = None
+                elif component:
+                    props[name] = (params.upper(), value)
+
+    def add_ics_component(self, line, component, props):
+        summary = self.ics_unescape(props.get("SUMMARY", ("", ""))[1])
+        when_value = props.get("DUE" if component == "VTODO" else "DTSTART", ("", ""))[1] or props.get("DTSTART", ("", ""))[1]
+        when, has_time = self.ics_datetime(when_value) if when_value else (None, False)
+        if when_value and when is None:
+            self.errors.append((line, f"Invalid date '{when_value}'"))
+            return
+        date = when.strftime("%Y-%m-%d") if when else ""
+
+        kind = props.get("X-EDUMIND-KIND", ("", ""))[1].lower()
+        categories = self.ics_unescape(props.get("CATEGORIES", ("", ""))[1]).split(",")[0].strip()
+        if not kind:
+            kind = "task" if component == "VTODO" else "plan" if categories else "reminder"
+        status = {"COMPLETED": "Completed"}.get(props.get("STATUS", ("", ""))[1].upper(), "")
+        if kind == "reminder":
+            time_str = when.strftime("%H:%M") if when and has_time else DEFAULT_REMINDER_TIME
+            self.add_row(line, kind, title=summary, date=date, time_str=time_str)
+        else:
+            self.add_row(line, kind, title=summary, subject=categories, date=date, status=status)
+
+# --- iCalendar Feed ---
+def ics_escape(text):
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def ics_fold(line):
+    """Folds a content line at 75 octets without splitting UTF-8 characters."""
+    if len(line.encode("utf-8")) <= ICS_LINE_LIMIT:
+        return line
+    parts, current, size = [], "", 0
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        limit = ICS_LINE_LIMIT if not parts else ICS_LINE_LIMIT - 1 # Continuations start with a space
+        if size + char_size > limit:
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+def record_version(record):
+    """The record's modification stamp, or a content digest for records saved before stamps existed."""
+    return record.get("modified_at") or hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+class IcsFeedExporter:
+    """Writes tasks with due dates, dated plans and active reminders to an .ics file.
+
+    Serialized components are cached per UID together with the record's version, so a
+    regeneration only re-serializes records that changed since the last export, and the
+    file is not touched at all when nothing changed.
+    """
+    def __init__(self, cache):
+        self.cache = cache # PersistentData: username -> {"path", "signature", "events"}
+
+    @staticmethod
+    def ics_date(date_str):
+        return date_str.replace("-", "")
+
+    @staticmethod
+    def ics_datetime(value):
+        return datetime.fromisoformat(value).strftime("%Y%m%dT%H%M%S")
+
+    def serialize(self, kind, record):
+        """Returns the VEVENT/VTODO lines for one record, or None if it does not belong in the feed."""
+        uid = f"{kind}-{record['id']}@edumind"
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        lines = []
+        if kind == "task":
+            if record.get("due_date", "No Due Date") == "No Due Date":
+                return None
+            lines = ["BEGIN:VTODO", f"UID:{uid}", f"DTSTAMP:{stamp}",
+                     f"SUMMARY:{ics_escape(record['task'])}",
+                     f"DUE;VALUE=DATE:{self.ics_date(record['due_date'])}",
+                     "STATUS:" + ("COMPLETED" if record.get("status") == "Completed" else "NEEDS-ACTION"),
+                     "X-EDUMIND-KIND:task", "END:VTODO"]
+        elif kind == "plan":
+            if not record.get("due_date"):
+                return None
+            due = datetime.strptime(record["due_date"], "%Y-%m-%d")
+            lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{stamp}",
+                     f"SUMMARY:{ics_escape(record['topic'])}",
+                     f"CATEGORIES:{ics_escape(record['subject'])}",
+                     f"DTSTART;VALUE=DATE:{due.strftime('%Y%m%d')}",
+                     f"DTEND;VALUE=DATE:{(due + timedelta(days=1)).strftime('%Y%m%d')}",
+                     f"DESCRIPTION:{ics_escape('Status: ' + record.get('status', 'Planned'))}",
+                     "X-EDUMIND-KIND:plan", "END:VEVENT"]
+        elif kind == "reminder":
+            if record.get("status") != "active":
+                return None
+            lines = ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{stamp}",
+                     f"SUMMARY:{ics_escape(record['message'])}",
+                     f"DTSTART:{self.ics_datetime(record['datetime'])}",
+                     f"DURATION:PT{ICS_REMINDER_MINUTES}M"]
+            rule = record.get("recurrence")
+            if rule:
+                rrule = "RRULE:FREQ=" + ("WEEKLY" if rule.get("freq") == "weekly" else "DAILY")
+                if rule.get("freq") == "weekly":
+                    rrule += ";BYDAY=" + ",".join(WEEKDAY_NAMES[d][:2].upper() for d in rule.get("days", []))
+                if rule.get("until"):
+                    rrule += f";UNTIL={self.ics_date(rule['until'])}T235959"
+                lines.append(rrule)
+            lines += ["BEGIN:VALARM", "ACTION:DISPLAY", f"DESCRIPTION:{ics_escape(record['message'])}",
+                      "TRIGGER:PT0M", "END:VALARM", "X-EDUMIND-KIND:reminder", "END:VEVENT"]
+        return "\r\n".join(ics_fold(line) for line in lines) + "\r\n"
+
+    def export(self, username, path, records):
+        """records is an iterable of (kind, record). Returns (re-serialized count, event count)."""
+        state = self.cache.get_user_data(username) or {}
+        if state.get("path") != path:
+            state = {"path": path, "events": {}} # New target, start from scratch
+        cached = state.get("events", {})
+        events, changed = {}, 0
+        for kind, record in records:
+            uid = f"{kind}-{record['id']}"
+            version = record_version(record)
+            entry = cached.get(uid)
+            if entry is None or entry[0] != version:
+                try:
+                    text = self.serialize(kind, record)
+                except (KeyError, ValueError):
+                    text = None # Malformed record, leave it out of the feed
+                entry = [version, text]
+                changed += 1
+            events[uid] = entry
+
+        signature = hashlib.sha1("|".join(f"{uid}:{entry[0]}" for uid, entry in events.items()).encode("utf-8")).hexdigest()
+        if signature != state.get("signature") or not os.path.exists(path):
+            temp_path = path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{ICS_PRODID}\r\nX-WR-CALNAME:EduMind - {username}\r\n")
+                for _, text in events.values():
+                    if text:
+                        f.write(text)
+                f.write("END:VCALENDAR\r\n")
+            os.replace(temp_path, path) # Subscribers never see a half-written feed
+        if changed or signature != state.get("signature"):
+            self.cache.set_user_data(username, {"path": path, "signature": signature, "events": events})
+        return changed, sum(1 for _, text in events.values() if text)
+
+# --- Cohort Reporting ---
+def empty_cohort_stats():
+    return {"students": 0, "tasks_total": 0, "tasks_completed": 0, "tasks_overdue": 0,
+            "focus_minutes": 0.0, "moods": {}}
+
+def compute_cohort_shard(shard, today):
+    """Process pool worker: aggregates one shard of students by "course/section".
+
+    `shard` is a list of (course, section, tasks, timer_history, moods) tuples.
+    """
+    partial = {}
+    for course, section, tasks, timer_history, moods in shard:
+        stats = partial.setdefault(f"{course}/{section}", empty_cohort_stats())
+        stats["students"] += 1
+        for task in tasks:
+            stats["tasks_total"] += 1
+            if task.get("status") == "Completed":
+                stats["tasks_completed"] += 1
+            elif task.get("due_date", "No Due Date") != "No Due Date" and task["due_date"] < today:
+                stats["tasks_overdue"] += 1 # ISO dates compare correctly as strings
+        for entry in timer_history:
+            if entry.get("type") in FOCUS_TIMER_TYPES:
+                stats["focus_minutes"] += float(entry.get("duration_minutes", 0) or 0)
+        for mood in moods:
+            label = mood.get("mood", "Unknown")
+            stats["moods"][label] = stats["moods"].get(label, 0) + 1
+    return partial
+
+def merge_cohort_stats(target, stats):
+    for key in ("students", "tasks_total", "tasks_completed", "tasks_overdue", "focus_minutes"):
+        target[key] += stats[key]
+    for label, count in stats["moods"].items():
+        target["moods"][label] = target["moods"].get(label, 0) + count
+
+def build_cohort_report(users, tasks, timer_history, moods, workers=None):
+    """Computes per-course and per-section aggregates across a process pool of user shards."""
+    workers = workers or os.cpu_count() or 1
+    today = datetime.now().strftime("%Y-%m-%d")
+    rows = [(details.get("course") or "Unknown", details.get("section") or "Unknown",
+             tasks.get(username, []), timer_history.get(username, []), moods.get(username, []))
+            for username, details in users.items() if isinstance(details, dict)]
+    shards = [rows[i::workers] for i in range(workers) if rows[i::workers]]
+
+    sections = {}
+    if len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            partials = list(pool.map(compute_cohort_shard, shards, [today] * len(shards)))
+    else:
+        partials = [compute_cohort_shard(shard, today) for shard in shards] # Not worth a pool
+    for partial in partials:
+        for key, stats in partial.items():
+            merge_cohort_stats(sections.setdefault(key, empty_cohort_stats()), stats)
+
+    courses = {}
+    for key, stats in sections.items():
+        merge_cohort_stats(courses.setdefault(key.split("/", 1)[0], empty_cohort_stats()), stats)
+    for stats in list(sections.values()) + list(courses.values()):
+        stats["completion_rate"] = round(100 * stats["tasks_completed"] / stats["tasks_total"], 1) if stats["tasks_total"] else 0.0
+    return {"generated_at": datetime.now().isoformat(), "courses": courses, "sections": sections}
+
+def cohort_source_stamps(stores):
+    """{collection: version stamp} of the report's source stores (local files or server collections).
+
+    Take the stamps *before* reading the data, so a write made while the report is being
+    built leaves the saved report stale instead of marking the write as included.
+    """
+    stamps = {}
+    for store in stores:
+        stamp = store.version_stamp()
+        stamps[store.collection] = list(stamp) if stamp is not None else None # As it reads back from JSON
+    return stamps
+
+def load_cached_cohort_report(sources, max_age_minutes=COHORT_REPORT_MAX_AGE_MINUTES, base_dir="."):
+    """Returns the cached report if it is younger than max_age and was built from `sources` (see cohort_source_stamps)."""
+    path = os.path.join(base_dir, COHORT_REPORT_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        age = datetime.now() - datetime.fromisoformat(report["generated_at"])
+    except (OSError, ValueError, KeyError):
+        return None
+    if age > timedelta(minutes=max_age_minutes) or report.get("sources") != sources:
+        return None
+    return report
+
+def save_cohort_report(report, sources, base_dir="."):
+    report["sources"] = sources
+    with open(os.path.join(base_dir, COHORT_REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+def read_json_file(path):
+    """Reads a data file without any UI, for command line tools."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def format_cohort_report(report):
+    lines = [f"Cohort report generated at {report['generated_at']}", ""]
+    header = f"{'Cohort':<16}{'Students':>10}{'Tasks':>10}{'Done %':>8}{'Overdue':>10}{'Focus min':>12}  Top mood"
+    for title, groups in (("Courses", report["courses"]), ("Sections", report["sections"])):
+        lines += [title, header, "-" * len(header)]
+        for name in sorted(groups):
+            stats = groups[name]
+            top_mood = max(stats["moods"], key=stats["moods"].get) if stats["moods"] else "-"
+            lines.append(f"{name:<16}{stats['students']:>10}{stats['tasks_total']:>10}{stats['completion_rate']:>8}"
+                         f"{stats['tasks_overdue']:>10}{stats['focus_minutes']:>12.0f}  {top_mood}")
+        lines.append("")
+    return "\n".join(lines)
+
+def run_cohort_report_cli(args):
+    sources = {os.path.splitext(name)[0]: file_version_stamp(name) for name in COHORT_SOURCE_FILES}
+    sources = {collection: list(stamp) if stamp is not None else None for collection, stamp in sources.items()}
+    report = None if args.refresh else load_cached_cohort_report(sources, args.max_age)
+    if report is None:
+        report = build_cohort_report(read_json_file("users.json"), read_json_file("tasks.json"),
+                                     read_json_file("timer_history.json"), read_json_file("moods.json"),
+                                     workers=args.workers)
+        save_cohort_report(report, sources)
+    print(json.dumps(report, indent=4) if args.json else format_cohort_report(report))
+
+# --- Study Scheduler ---
+class StudyScheduler:
+    """Allocates Pomodoro blocks to study plans, earliest deadline first.
+
+    Each day pops the most urgent plans off a heap keyed (due ordinal, -remaining blocks,
+    plan id) until the daily capacity is used, so plans sharing a deadline are interleaved
+    with the one furthest behind going first. Per day we keep the blocks and the largest
+    key that still got a block (None when capacity was left over). A changed plan with key
+    k cannot alter any day before the first one it used to appear on or whose cutoff is
+    above k, so re-planning restarts from that day instead of from today.
+    """
+    def __init__(self, store):
+        self.store = store # PersistentData: username -> {"start", "capacity", "inputs", "days"}
+
+    @staticmethod
+    def plan_key(pid, due, blocks):
+        return (due, -blocks, pid)
+
+    @staticmethod
+    def first_affected_day(days, pid, key):
+        """First day whose allocation changes if `pid` enters the schedule with `key` (None: leaves it)."""
+        for index, (blocks, cutoff) in enumerate(days):
+            if pid in blocks or (key is not None and (cutoff is None or key < tuple(cutoff))):
+                return index
+        return len(days)
+
+    @staticmethod
+    def allocate(inputs, capacity, days, horizon=SCHEDULER_HORIZON_DAYS):
+        """Extends `days` (the kept prefix of a previous schedule) until every block is placed."""
+        remaining = {pid: blocks for pid, (due, blocks) in inputs.items()}
+        for blocks, cutoff in days:
+            for pid in blocks:
+                remaining[pid] -= 1
+        heap = [StudyScheduler.plan_key(pid, inputs[pid][0], left) for pid, left in remaining.items() if left > 0]
+        heapq.heapify(heap)
+        while heap and len(days) < horizon:
+            picked, cutoff = [], None
+            while heap and len(picked) < capacity:
+                cutoff = heapq.heappop(heap)
+                due, negative_left, pid = cutoff
+                picked.append(pid)
+                if negative_left < -1:
+                    heapq.heappush(heap, (due, negative_left + 1, pid))
+            days.append([picked, list(cutoff) if len(picked) == capacity else None])
+        return days
+
+    def update(self, username, inputs, today, capacity=None):
+        """Re-plans for `inputs` ({plan_id: [due ordinal or None, blocks]}). Returns (state, first changed day)."""
+        state = self.store.get_user_data(username) or {}
+        capacity = capacity or state.get("capacity", SCHEDULER_DEFAULT_CAPACITY)
+        start = today.toordinal()
+        inputs = {pid: [due if due is not None else start + SCHEDULER_HORIZON_DAYS, blocks]
+                  for pid, (due, blocks) in inputs.items()} # Undated plans go last
+
+        old_inputs = state.get("inputs", {})
+        if state.get("start") != today.isoformat() or state.get("capacity") != capacity:
+            first_day, days = 0, []
+        else:
+            days = state.get("days", [])
+            first_day = len(days)
+            for pid in set(old_inputs) | set(inputs):
+                if old_inputs.get(pid) != inputs.get(pid):
+                    key = self.plan_key(pid, *inputs[pid]) if pid in inputs else None
+                    first_day = min(first_day, self.first_affected_day(days, pid, key))
+            if first_day == len(days) and old_inputs == inputs:
+                return state, None # Nothing changed
+            days = days[:first_day]
+
+        state = {"start": today.isoformat(), "capacity": capacity, "inputs": inputs,
+                 "days": self.allocate(inputs, capacity, days)}
+        self.store.set_user_data(username, state)
+        return state, first_day
+
+    @staticmethod
+    def block_times(count, day):
+        """Start times of `count` back-to-back Pomodoros (work plus short break) on `day`."""
+        start = datetime.combine(day, datetime.strptime(SCHEDULER_DAY_START, "%H:%M").time())
+        return [start + timedelta(minutes=i * SCHEDULER_BLOCK_MINUTES) for i in range(count)]
+
+    @staticmethod
+    def late_plans(state):
+        """Plan ids whose last block lands after their due date, or that did not fit in the horizon."""
+        start = datetime.strptime(state["start"], "%Y-%m-%d").toordinal()
+        last_day, placed = {}, {}
+        for index, (blocks, cutoff) in enumerate(state.get("days", [])):
+            for pid in blocks:
+                last_day[pid] = start + index
+                placed[pid] = placed.get(pid, 0) + 1
+        return {pid for pid, (due, blocks) in state.get("inputs", {}).items()
+                if placed.get(pid, 0) < blocks or last_day.get(pid, start) > due}
+
+# --- Spaced Repetition ---
+# Doubts and completed progress topics carry their SM-2 state in a "review" field:
+#   "review": {"ease": 2.5, "reps": 2, "interval": 6, "due": "...", "reviewed_at": "..."}
+# Items never reviewed are first due a day after they were last changed.
+def sm2_review(state, quality, now):
+    """The next SM-2 state after a review graded `quality` (0-5)."""
+    ease = state.get("ease", REVIEW_DEFAULT_EASE)
+    reps = state.get("reps", 0)
+    if quality < 3:
+        reps, interval = 0, 1 # Start over without touching the ease factor
+    else:
+        interval = 1 if reps == 0 else 6 if reps == 1 else max(1, round(state.get("interval", 1) * ease))
+        reps += 1
+        ease = max(REVIEW_MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return {"ease": round(ease, 2), "reps": reps, "interval": interval,
+            "due": (now + timedelta(days=interval)).isoformat(timespec="minutes"),
+            "reviewed_at": now.isoformat(timespec="minutes")}
+
+def review_due(collection, record):
+    """When the item is next due for review, or None if it is not in the review queue."""
+    if collection == "progress" and record.get("progress", 0) < REVIEW_TOPIC_MIN_PROGRESS:
+        return None
+    try:
+        if record.get("review"):
+            return datetime.fromisoformat(record["review"]["due"])
+        if record.get("modified_at"):
+            return datetime.fromisoformat(record["modified_at"]) + timedelta(days=1)
+    except (KeyError, TypeError, ValueError):
+        pass
+    return datetime.fromtimestamp(0) # Unknown age: due now
+
+class ReviewQueue:
+    """Review due times in a min-heap with lazy deletion.
+
+    `due` holds each item's live timestamp. Rescheduling pushes a new heap entry and
+    removing only forgets the key; entries that no longer match `due` are dropped when
+    they reach the top, and the heap is rebuilt once they outnumber the live ones. Picking
+    the next review is O(log n). `per_day` counts items by due date so the calendar and
+    reminders can total them without touching the items.
+    """
+    def __init__(self, items=()):
+        self.due = {} # "collection/record id" -> due timestamp
+        self.per_day = collections.Counter() # date ordinal -> items due that day
+        self.heap = []
+        for key, when in items:
+            self.schedule(key, when, push=False)
+        self.rebuild()
+
+    def rebuild(self):
+        self.heap = [(timestamp, key) for key, timestamp in self.due.items()]
+        heapq.heapify(self.heap)
+
+    def schedule(self, key, when, push=True):
+        timestamp = when.timestamp()
+        old = self.due.get(key)
+        if old == timestamp:
+            return
+        if old is not None:
+            self.uncount(old)
+        self.due[key] = timestamp
+        self.per_day[when.toordinal()] += 1
+        if push:
+            heapq.heappush(self.heap, (timestamp, key))
+            if len(self.heap) > 2 * len(self.due) + 64:
+                self.rebuild()
+
+    def remove(self, key):
+        timestamp = self.due.pop(key, None)
+        if timestamp is not None:
+            self.uncount(timestamp)
+
+    def uncount(self, timestamp):
+        day = datetime.fromtimestamp(timestamp).toordinal()
+        self.per_day[day] -= 1
+        if not self.per_day[day]:
+            del self.per_day[day]
+
+    def peek(self):
+        """(due timestamp, key) of the earliest item, or None when the queue is empty."""
+        while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap) # Stale: removed or rescheduled since it was pushed
+        return self.heap[0] if self.heap else None
+
+    def next_due(self, now):
+        """Key of the most overdue item, or None if nothing is due yet."""
+        top = self.peek()
+        return top[1] if top and top[0] <= now.timestamp() else None
+
+    def count_due(self, day):
+        """Items due on or before `day`."""
+        return sum(count for ordinal, count in self.per_day.items() if ordinal <= day.toordinal())
+
+    def count_on(self, day):
+        return self.per_day.get(day.toordinal(), 0)
+
+# --- Password Hashing ---
+def hash_password(password, iterations=PASSWORD_ITERATIONS, salt=None):
+    """Returns "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>". Slow on purpose; keep it off the UI thread."""
+    salt = salt or os.urandom(PASSWORD_SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{PASSWORD_HASH_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+def verify_password(password, user_details):
+    """Returns (matches, needs_rehash) for a users.json record.
+
+    Records from before hashing keep a plaintext "password" and always need a rehash,
+    as do hashes made with fewer iterations than PASSWORD_ITERATIONS.
+    """
+    stored = (user_details or {}).get("password_hash")
+    if not stored:
+        plaintext = (user_details or {}).get("password")
+        if plaintext is None:
+            hash_password(password) # Same delay as a real check, so unknown usernames are not revealed
+            return False, False
+        return hmac.compare_digest(plaintext.encode("utf-8"), password.encode("utf-8")), True
+    try:
+        scheme, iterations, salt, expected = stored.split("$")
+        iterations = int(iterations)
+        if scheme != PASSWORD_HASH_SCHEME:
+            return False, False
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), iterations)
+    except ValueError:
+        return False, False
+    return hmac.compare_digest(digest.hex(), expected), iterations < PASSWORD_ITERATIONS
+
+def benchmark_kdf(target_ms=KDF_BENCHMARK_TARGET_MS):
+    """Times PBKDF2 on this machine and prints the iteration count that takes about target_ms."""
+    iterations = 50000
+    while True:
+        start = time.perf_counter()
+        hash_password("benchmark", iterations)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"{iterations:>10} iterations: {elapsed_ms:8.1f} ms")
+        if elapsed_ms >= target_ms or iterations >= 10000000:
+            break
+        iterations *= 2
+    suggested = int(iterations * target_ms / elapsed_ms) // 10000 * 10000 or 10000
+    print(f"Suggested PASSWORD_ITERATIONS for ~{target_ms} ms: {suggested} (currently {PASSWORD_ITERATIONS})")
+
+def promote_admin(username, data_dir="."):
+    """Gives an existing account the "admin" role (Cohort Report). Admins are only ever made this way."""
+    PersistentData.headless = True
+    users = PersistentData(os.path.join(data_dir, "users.json"))
+    details = users.data.get(username)
+    if not isinstance(details, dict):
+        sys.exit(f"No account named {username!r} in {users.filepath}")
+    details["role"] = "admin"
+    write_file_atomically(users.filepath, json.dumps(users.data, indent=4))
+    print(f"{username} can now open the Cohort Report.")
+
+# --- Warm-Start Cache ---
+# Insights arrays that may appear in a snapshot, with their allowed dtype kinds and ndim.
+WARM_CACHE_ARRAYS = {"daily_days": ("M", 1), "daily_minutes": ("f", 1), "rolling_7": ("f", 1),
+                     "rolling_30": ("f", 1), "mood_by_weekday": ("i", 2), "mood_by_time_of_day": ("i", 2),
+                     "mood_times": ("M", 1), "mood_scores": ("if", 1)}
+
+class WarmCache:
+    """Per-user snapshots of derived data (insights arrays, heatmap values) written at logout.
+
+    Each snapshot is an .npz file: the NumPy arrays as plain arrays and everything else as
+    one JSON string. It is read with allow_pickle=False and checked field by field before
+    use, so a file planted in the shared cache folder can at worst cause a cold start.
+    Each snapshot also records the version stamps of the stores it was derived from and is
+    only used if they all still match, so any edit made since simply means a cold start.
+    Without NumPy there are no insights to keep and nothing is cached.
+    """
+    def __init__(self, folder=WARM_CACHE_DIR):
+        self.folder = folder
+
+    def path(self, username):
+        safe_name = hashlib.sha1(username.encode("utf-8")).hexdigest() # Usernames are not filename safe
+        return os.path.join(self.folder, f"{safe_name}.npz")
+
+    def save(self, username, stamps, payload):
+        if np is None:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.path(username)
+        meta = {"format": WARM_CACHE_FORMAT, "username": username, "stamps": stamps}
+        arrays = {}
+        if payload.get("insights"):
+            (timer_count, mood_count, today), result = payload["insights"]
+            meta["insights_key"] = [timer_count, mood_count, today.isoformat()]
+            meta["insights"] = {name: value for name, value in result.items() if name not in WARM_CACHE_ARRAYS}
+            arrays = {name: result[name] for name in WARM_CACHE_ARRAYS if name in result}
+        if payload.get("heatmap"):
+            key, (focus_by_day, mood_by_day) = payload["heatmap"]
+            meta["heatmap"] = {"key": list(key), "focus": focus_by_day, "moods": mood_by_day}
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not write warm cache for {username}: {e}")
+        try:
+            os.remove(os.path.join(self.folder, os.path.basename(path)[:-4] + ".pickle")) # Format 1 snapshots are never read
+        except OSError:
+            pass
+
+    def load(self, username, stamps):
+        """Returns the payload if the snapshot is current and well-formed, else None."""
+        if np is None:
+            return None
+        try:
+            with np.load(self.path(username), allow_pickle=False) as snapshot:
+                meta = json.loads(str(snapshot["meta"][()]))
+                arrays = {name: snapshot[name] for name in snapshot.files if name != "meta"}
+            if (meta.get("format"), meta.get("username"), meta.get("stamps")) != \
+                    (WARM_CACHE_FORMAT, username, json.loads(json.dumps(stamps))):
+                return None
+            return {"insights": self.check_insights(meta, arrays), "heatmap": self.check_heatmap(meta)}
+        except FileNotFoundError:
+            return None
+        except Exception as e: # A stale, damaged or foreign snapshot is never fatal
+            print(f"Ignoring warm cache for {username}: {e}")
+            return None
+
+    @staticmethod
+    def check_insights(meta, arrays):
+        """The (key, result) pair for ProgressInsights.seed. Raises ValueError if anything is off."""
+        if "insights" not in meta:
+            return None
+        timer_count, mood_count, today = meta["insights_key"]
+        scalars = meta["insights"]
+        if set(arrays) != set(WARM_CACHE_ARRAYS) or not isinstance(timer_count, int) or not isinstance(mood_count, int):
+            raise ValueError("unexpected insights fields")
+        for name, (kinds, ndim) in WARM_CACHE_ARRAYS.items():
+            if arrays[name].dtype.kind not in kinds or arrays[name].ndim != ndim:
+                raise ValueError(f"unexpected {name} array")
+        for name in ("mood_by_weekday", "mood_by_time_of_day"):
+            if arrays[name].shape[1] != len(MOOD_OPTIONS):
+                raise ValueError(f"unexpected {name} shape")
+        result = {"current_streak": int(scalars["current_streak"]), "longest_streak": int(scalars["longest_streak"]),
+                  "focus_last_7": float(scalars["focus_last_7"]), "focus_last_30": float(scalars["focus_last_30"]),
+                  "best_hours": [(int(hour), float(minutes)) for hour, minutes in scalars["best_hours"]]}
+        result.update(arrays)
+        return (timer_count, mood_count, datetime.strptime(today, "%Y-%m-%d").date()), result
+
+    @staticmethod
+    def check_heatmap(meta):
+        """The (key, (focus_by_day, mood_by_day)) pair for the heatmap cache. Raises ValueError if anything is off."""
+        if "heatmap" not in meta:
+            return None
+        heatmap = meta["heatmap"]
+        key, focus_by_day, mood_by_day = heatmap["key"], heatmap["focus"], heatmap["moods"]
+        if (not isinstance(key, list) or not all(isinstance(value, int) for value in key)
+                or not isinstance(focus_by_day, dict) or not isinstance(mood_by_day, dict)
+                or not all(isinstance(day, str) and isinstance(minutes, (int, float)) for day, minutes in focus_by_day.items())
+                or not all(isinstance(day, str) and (mood is None or isinstance(mood, str)) for day, mood in mood_by_day.items())):
+            raise ValueError("unexpected heatmap fields")
+        return tuple(key), (focus_by_day, mood_by_day)
+
+# --- Store Server ---
+def write_file_atomically(path, text):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def append_lines(path, lines):
+    with open(path, "a", encoding="ascii") as f:
+        f.writelines(line + "\n" for line in lines)
+
+class StoreError(Exception):
+    """An error reported by the store server for one request."""
+
+class StoreServer:
+    """Serves the JSON stores to many app instances over newline-delimited JSON on asyncio streams.
+
+    Each request is one line, e.g. {"id": 7, "op": "get", "collection": "tasks", "user": "alice"}:
+      register creates an account from "user", "password" and profile "details"
+      login    checks "user" and "password" and returns a session "token" and the profile
+      resume   joins another connection to the session of "token"
+      logout   ends the session on every connection using it
+      get      value for the session's user, or (admins only) the whole collection when "user"
+               is omitted; never the whole users collection
+      set      replaces the session user's value with "value"
+      profiles every account's profile without credentials (admins only, for the cohort report)
+      version  [server instance, change counter] for a collection
+      batch    runs the requests in "ops" in order and returns all "results" in one response
+      log_heads, log_read, log_append
+               the session user's per-node append-only sync logs (see ServerRemote)
+      ping
+    Everything but register, login, resume and ping needs a logged-in connection, and a user
+    can only reach their own values, in the collections listed in SERVER_COLLECTIONS.
+    Passwords are checked here and credentials are never sent out; "set" on users keeps
+    the stored password hash and role.
+    Every response line carries the request id plus "value"/"results" or "error". Clients may
+    pipeline requests on a connection; responses come back in request order. Collections are
+    loaded once and kept in memory, encoded values are cached until the next set, and dirty
+    collections are flushed to disk in the background at most every SERVER_FLUSH_SECONDS.
+    """
+    def __init__(self, data_dir=".", host=SERVER_DEFAULT_HOST, port=SERVER_DEFAULT_PORT):
+        self.data_dir = data_dir
+        self.host = host
+        self.port = port
+        self.instance = uuid.uuid4().hex # Lets clients tell a restarted server apart
+        self.collections = {} # name -> PersistentData
+        self.versions = {} # name -> number of sets since start
+        self.encoded = {} # (name, user or None) -> JSON text of the value
+        self.dirty = set()
+        self.logs = {} # (user, node) -> base64 frames, loaded on first use
+        self.log_locks = {} # (user, node) -> asyncio.Lock, so appends reach the file in order
+        self.tokens = {} # session token -> username
+        self.unknown_user_hash = None # Checked for unknown names so they take as long as real ones
+        self.connections = 0
+
+    def collection(self, name):
+        if not isinstance(name, str) or name not in SERVER_COLLECTIONS:
+            raise ValueError(f"Unknown collection {name!r}")
+        store = self.collections.get(name)
+        if store is None:
+            store = self.collections[name] = PersistentData(os.path.join(self.data_dir, f"{name}.json"))
+            self.versions[name] = 0
+        return store
+
+    def encoded_value(self, name, user):
+        key = (name, user)
+        text = self.encoded.get(key)
+        if text is None:
+            store = self.collection(name)
+            text = self.encoded[key] = json.dumps(store.data if user is None else store.get_user_data(user))
+        return text
+
+    def session_user(self, session, request=None):
+        """The logged-in user of a connection; with `request`, also checks that it names that user."""
+        user = self.tokens.get(session.get("token"))
+        if user is None:
+            raise PermissionError("Log in first")
+        if request is not None and request.get("user") != user:
+            raise PermissionError("Users can only reach their own data")
+        return user
+
+    def is_admin(self, user):
+        details = self.collection("users").data.get(user)
+        return isinstance(details, dict) and details.get("role") == "admin"
+
+    def store_value(self, name, user, value):
+        self.collection(name).data[user] = value
+        self.encoded.pop((name, user), None)
+        self.encoded.pop((name, None), None)
+        self.versions[name] += 1
+        self.dirty.add(name)
+
+    async def authenticate(self, request, session):
+        """register and login: password hashing is slow, so it runs on a worker thread."""
+        loop = asyncio.get_running_loop()
+        user, password = request["user"], request["password"]
+        if not isinstance(user, str) or not user or not isinstance(password, str) or not password:
+            raise ValueError("A user name and password are needed")
+        users = self.collection("users")
+        if request["op"] == "register":
+            details = request.get("details") or {}
+            if not isinstance(details, dict):
+                raise ValueError("details must be an object")
+            if user in users.data:
+                raise ValueError("Username already exists")
+            password_hash = await loop.run_in_executor(None, hash_password, password)
+            if user in users.data: # Taken while we were hashing
+                raise ValueError("Username already exists")
+            details = {key: value for key, value in details.items() if key not in SERVER_OWNED_USER_FIELDS}
+            self.store_value("users", user, dict(details, password_hash=password_hash))
+            return "true"
+
+        details = users.data.get(user)
+        if not isinstance(details, dict):
+            if self.unknown_user_hash is None:
+                self.unknown_user_hash = await loop.run_in_executor(None, hash_password, secrets.token_hex(16))
+            details = {"password_hash": self.unknown_user_hash}
+        matches, needs_rehash = await loop.run_in_executor(None, verify_password, password, details)
+        if not matches:
+            raise PermissionError("Invalid username or password")
+        if needs_rehash:
+            password_hash = await loop.run_in_executor(None, hash_password, password)
+            current = users.data.get(user)
+            if isinstance(current, dict):
+                updated = {key: value for key, value in current.items() if key != "password"}
+                self.store_value("users", user, dict(updated, password_hash=password_hash))
+        session["token"] = secrets.token_urlsafe(32)
+        self.tokens[session["token"]] = user
+        profile = {key: value for key, value in users.data[user].items() if key not in CREDENTIAL_FIELDS}
+        return json.dumps({"token": session["token"], "profile": profile})
+
+    def apply(self, request, session):
+        """Runs one op for a connection's `session` and returns the JSON text of its result."""
+        op = request.get("op")
+        if op == "ping":
+            return "true"
+        if op == "resume":
+            if request.get("token") not in self.tokens:
+                raise PermissionError("Session expired; log in again")
+            session["token"] = request["token"]
+            return "true"
+        if op == "logout":
+            self.tokens.pop(session.get("token"), None)
+            session["token"] = None
+            return "true"
+        user = self.session_user(session)
+        if op == "get":
+            name = request["collection"]
+            if request.get("user") is None:
+                if name == "users" or not self.is_admin(user):
+                    raise PermissionError(f"Reading every user's {name} is not allowed")
+                return self.encoded_value(name, None)
+            self.session_user(session, request)
+            if name == "users":
+                details = self.collection(name).data.get(user)
+                return json.dumps({key: value for key, value in details.items() if key not in CREDENTIAL_FIELDS}
+                                  if isinstance(details, dict) else details)
+            return self.encoded_value(name, user)
+        if op == "set":
+            self.session_user(session, request)
+            name, value = request["collection"], request["value"]
+            if name == "users":
+                stored = self.collection(name).data.get(user)
+                if not isinstance(value, dict) or not isinstance(stored, dict):
+                    raise ValueError("A profile must be an object")
+                value = {key: item for key, item in value.items() if key not in SERVER_OWNED_USER_FIELDS}
+                value.update((key, stored[key]) for key in SERVER_OWNED_USER_FIELDS if key in stored)
+            self.store_value(name, user, value)
+            return "true"
+        if op == "profiles":
+            if not self.is_admin(user):
+                raise PermissionError("Only admins can read every profile")
+            return json.dumps({name: {key: value for key, value in details.items() if key not in CREDENTIAL_FIELDS}
+                               for name, details in self.collection("users").data.items() if isinstance(details, dict)})
+        if op == "version":
+            self.collection(request["collection"])
+            return json.dumps([self.instance, self.versions[request["collection"]]])
+        if isinstance(op, str) and op.startswith("log_"):
+            self.session_user(session, request)
+        if op == "log_heads":
+            folder = self.sync_log_folder(request["user"])
+            nodes = [name[:-4] for name in (os.listdir(folder) if os.path.isdir(folder) else [])
+                     if name.endswith(".log") and SYNC_NODE_PATTERN.match(name[:-4])]
+            return json.dumps({node: len(self.sync_log(request["user"], node)) for node in nodes})
+        if op == "log_read":
+            return json.dumps(self.sync_log(request["user"], request["node"])[int(request["since"]):])
+        raise ValueError(f"Unknown op {op!r}")
+
+    async def append_log(self, request, session):
+        """log_append: the file write runs on a worker thread so other clients are not held up."""
+        self.session_user(session, request)
+        user, node = request["user"], request["node"]
+        frames = self.sync_log(user, node)
+        new_frames = [str(frame) for frame in request["frames"]]
+        path = os.path.join(self.sync_log_folder(user), f"{node}.log")
+        async with self.log_locks.setdefault((user, node), asyncio.Lock()):
+            await asyncio.get_running_loop().run_in_executor(None, append_lines, path, new_frames)
+            frames.extend(new_frames) # Only once the frames are on disk
+        return json.dumps(len(frames))
+
+    async def run(self, request, session):
+        """Runs one op; the ops that hash passwords or write files are awaited off the loop thread."""
+        op = request.get("op")
+        if op in ("register", "login"):
+            return await self.authenticate(request, session)
+        if op == "log_append":
+            return await self.append_log(request, session)
+        return self.apply(request, session)
+
+    def sync_log_folder(self, user):
+        if not isinstance(user, str):
+            raise ValueError("Sync logs need a user name")
+        return os.path.join(self.data_dir, "sync_logs", hashlib.sha1(user.encode("utf-8")).hexdigest())
+
+    def sync_log(self, user, node):
+        if not isinstance(node, str) or not SYNC_NODE_PATTERN.match(node):
+            raise ValueError(f"Invalid node id {node!r}")
+        frames = self.logs.get((user, node))
+        if frames is None:
+            folder = self.sync_log_folder(user)
+            os.makedirs(folder, exist_ok=True)
+            try:
+                with open(os.path.join(folder, f"{node}.log"), "r", encoding="ascii") as f:
+                    frames = [line.strip() for line in f if line.strip()]
+            except FileNotFoundError:
+                frames = []
+            self.logs[(user, node)] = frames
+        return frames
+
+    async def respond(self, line, session):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            if request.get("op") == "batch":
+                if any(op.get("op") in ("register", "login") for op in request["ops"]):
+                    raise ValueError("register and login cannot be batched")
+                body = '"results":[' + ",".join([await self.run(op, session) for op in request["ops"]]) + "]"
+            else:
+                body = '"value":' + await self.run(request, session)
+            return f'{{"id":{json.dumps(request_id)},"ok":true,{body}}}\n'
+        except (ValueError, KeyError, TypeError, AttributeError, OSError) as e:
+            return json.dumps({"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}) + "\n"
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        session = {"token": None} # Set by login or resume
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write((await self.respond(line, session)).encode("utf-8"))
+                await writer.drain() # Only waits when the client is not reading its responses
+        except (ConnectionError, ValueError, asyncio.CancelledError): # ValueError: line over SERVER_MAX_LINE
+            pass # Cancelled: the server is shutting down
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        for name in list(self.dirty):
+            self.dirty.discard(name)
+            store = self.collections[name]
+            text = json.dumps(store.data, indent=4) # Snapshot on the loop thread, write on a worker
+            try:
+                await loop.run_in_executor(None, write_file_atomically, store.filepath, text)
+            except OSError as e:
+                print(f"Error saving {store.filepath}: {e}")
+                self.dirty.add(name) # Retry on the next flush
+
+    async def flush_forever(self):
+        while True:
+            await asyncio.sleep(SERVER_FLUSH_SECONDS)
+            await self.flush()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle, self.host, self.port, limit=SERVER_MAX_LINE)
+        flusher = asyncio.create_task(self.flush_forever())
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass # Windows: only Ctrl+C stops the server cleanly
+        print(f"EduMind store server listening on {self.host}:{self.port}, data in {os.path.abspath(self.data_dir)}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            await self.flush()
+
+def run_store_server(args):
+    PersistentData.headless = True
+    os.makedirs(args.data_dir, exist_ok=True)
+    try:
+        asyncio.run(StoreServer(args.data_dir, args.host, args.port).serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("Store server stopped.")
+
+class StoreConnection:
+    """One pipelined connection: requests are written back to back, responses resolve futures in order."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = collections.deque()
+        self.closed = False
+        self.token = None # Session this connection has joined
+        self.reader_task = asyncio.get_running_loop().create_task(self.read_responses())
+
+    async def read_responses(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result(json.loads(line))
+        except (ConnectionError, ValueError, IndexError):
+            pass
+        finally:
+            self.closed = True
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionError("Lost connection to the store server"))
+
+class StoreClient:
+    """Thread-safe client for StoreServer with a pool of pipelined connections.
+
+    A private event loop runs on a daemon thread; callers on any thread block in request()
+    or batch() while many requests share the connections. Each request goes to the
+    connection with the fewest responses outstanding, and dropped connections are reopened.
+    After login() every connection, including reopened ones, joins the session before its
+    next request.
+    """
+    def __init__(self, host=SERVER_DEFAULT_HOST, port=SERVER_DEFAULT_PORT, pool_size=CLIENT_POOL_SIZE):
+        self.host = host
+        self.port = port
+        self.next_id = 0
+        self.token = None # Session token from login()
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        try:
+            self.connections = self.run(self.open_pool(pool_size)) # Raises OSError if the server is down
+        except BaseException:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            raise
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def run(self, coroutine, timeout=CLIENT_TIMEOUT_SECONDS):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    async def open_connection(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=SERVER_MAX_LINE)
+        return StoreConnection(reader, writer)
+
+    async def open_pool(self, pool_size):
+        return [await self.open_connection() for _ in range(pool_size)]
+
+    async def send(self, message):
+        index, connection = min(enumerate(self.connections), key=lambda item: len(item[1].pending))
+        if connection.closed:
+            connection = self.connections[index] = await self.open_connection()
+        if self.token and connection.token != self.token and message["op"] not in ("register", "login"):
+            connection.token = self.token
+            await self.exchange(connection, {"op": "resume", "token": self.token})
+        return await self.exchange(connection, message)
+
+    async def exchange(self, connection, message):
+        self.next_id += 1 # Only touched on the loop thread
+        message["id"] = self.next_id
+        future = self.loop.create_future()
+        connection.pending.append(future)
+        connection.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+        await connection.writer.drain()
+        response = await future
+        if not response.get("ok"):
+            raise StoreError(response.get("error", "Unknown error"))
+        return response
+
+    def request(self, op, **fields):
+        return self.run(self.send(dict(fields, op=op))).get("value")
+
+    def batch(self, ops):
+        """Sends several ops in one round trip and returns their results in order."""
+        return self.run(self.send({"op": "batch", "ops": list(ops)}))["results"]
+
+    def login(self, username, password):
+        """Starts a session for `username`. Returns the profile; raises StoreError on a wrong password."""
+        result = self.run(self.send({"op": "login", "user": username, "password": password}),
+                          timeout=CLIENT_LOGIN_TIMEOUT_SECONDS)["value"]
+        self.token = result["token"]
+        return result["profile"]
+
+    def register(self, username, password, details):
+        """Creates an account; raises StoreError if the name is taken."""
+        self.run(self.send({"op": "register", "user": username, "password": password, "details": details}),
+                 timeout=CLIENT_LOGIN_TIMEOUT_SECONDS)
+
+    def logout(self):
+        if self.token:
+            self.request("logout")
+            self.token = None
+
+    def close(self):
+        async def close_all():
+            for connection in self.connections:
+                connection.writer.close()
+        self.run(close_all())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+class RemotePersistentData:
+    """Drop-in replacement for PersistentData that keeps a collection on a StoreServer."""
+    def __init__(self, client, collection, append_only=False):
+        self.client = client
+        self.collection = collection
+        self.append_only = append_only
+        self.filepath = f"{client.address}/{collection}"
+        self.events = None
+        self.snapshots = {}
+
+    @property
+    def data(self):
+        return self.client.request("get", collection=self.collection) or {}
+
+    def load(self):
+        pass # Nothing is held locally
+
+    def save(self):
+        pass # Every set is sent to the server straight away
+
+    def get_user_data(self, username, default=None):
+        value = self.client.request("get", collection=self.collection, user=username)
+        if value is None:
+            return default
+        if username not in self.snapshots:
+            self.snapshots[username] = record_snapshot(value, not self.append_only)
+        return value
+
+    def set_user_data(self, username, value):
+        changes = diff_records(self.snapshots, username, value, copy_records=not self.append_only)
+        self.client.request("set", collection=self.collection, user=username, value=value)
+        if self.events is not None:
+            self.events.publish(self.collection, username, changes)
+
+    def version_stamp(self):
+        return tuple(self.client.request("version", collection=self.collection))
+
+# --- Delta Sync ---
+# Every synced record carries a version stamp: "modified_at" (local ISO time) plus
+# "modified_by" (the node id of the machine that made the change). Each set_user_data hands
+# the journal the store's per-record diff (see diff_records) and it logs changed record keys
+# with a sequence number, so a sync only looks at what changed since the last one. Deletes
+# leave tombstones. Conflicts resolve last-writer-wins on (modified_at, modified_by),
+# which every node evaluates the same way.
+def record_stamp(record):
+    return (record.get("modified_at", ""), record.get("modified_by", ""))
+
+class SyncJournal:
+    """Per-machine change journal: ordered change keys, tombstones and remote cursors."""
+    def __init__(self, filepath=SYNC_JOURNAL_FILE):
+        self.filepath = filepath
+        self.suspended = False # True while applying changes pulled from a remote
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+        self.state.setdefault("node", uuid.uuid4().hex)
+        # Journals written before stores diffed their own records kept per-record fingerprints here
+        self.state.setdefault("attached", list(self.state.pop("fingerprints", {})))
+        for key, default in (("seq", 0), ("changes", {}), ("tombstones", {}), ("remotes", {})):
+            self.state.setdefault(key, default)
+
+    @property
+    def node(self):
+        return self.state["node"]
+
+    def save(self):
+        try:
+            write_file_atomically(self.filepath, json.dumps(self.state))
+        except OSError as e:
+            print(f"Error saving {self.filepath}: {e}")
+
+    def attach(self, store):
+        """Starts journaling a store. The first time, everything in it counts as a change."""
+        store.journal = self
+        if store.collection in self.state["attached"]:
+            return
+        self.state["attached"].append(store.collection)
+        for username, records in store.data.items():
+            store.snapshots.pop(username, None) # No snapshot yet, so every record is "added"
+            changes = diff_records(store.snapshots, username, records, copy_records=not store.append_only)
+            self.record(store.collection, username, records, changes, save=False)
+        store.save() # Ids and version stamps were added in place
+        self.save()
+
+    def record(self, collection, username, records, changes, save=True):
+        """Stamps and logs the records a set_user_data changed. `changes` comes from diff_records."""
+        if self.suspended or not isinstance(records, list):
+            return # Pulled changes keep the stamps of the node that made them
+        kinds = {record_id: kind for record_id, kind in changes if kind != "selected"}
+        if not kinds:
+            return
+        now = datetime.now().isoformat()
+        for record in records:
+            kind = kinds.get(record.get("id")) if isinstance(record, dict) else None
+            if kind is None:
+                continue
+            if kind == "updated" or "modified_at" not in record:
+                record["modified_at"] = now # Edits always get a fresh stamp
+            record["modified_by"] = self.node
+            self.log_change(username, collection, record["id"])
+        for record_id, kind in kinds.items():
+            if kind == "removed":
+                self.state["tombstones"].setdefault(username, {})[f"{collection}/{record_id}"] = [now, self.node]
+                self.log_change(username, collection, record_id)
+        if save:
+            self.save()
+
+    def log_change(self, username, collection, record_id):
+        self.state["seq"] += 1
+        changes = self.state["changes"].setdefault(username, {})
+        key = f"{collection}/{record_id}"
+        changes.pop(key, None) # Re-insert so the dict stays ordered by sequence number
+        changes[key] = self.state["seq"]
+
+    def changes_since(self, username, seq):
+        """Change keys logged after `seq`, newest first. Stops at the first older entry: O(changes)."""
+        result = []
+        for key, change_seq in reversed(self.state["changes"].get(username, {}).items()):
+            if change_seq <= seq:
+                break
+            result.append(key)
+        return result
+
+    def remote_state(self, remote_key, username):
+        return self.state["remotes"].setdefault(remote_key, {}).setdefault(username, {"pushed": 0, "positions": {}})
+
+class DirectoryRemote:
+    """A shared folder (USB stick, network share): one append-only log file per user and node.
+
+    Frames are a 4-byte big-endian length followed by zlib-compressed JSON. Each node only
+    appends to its own file, so concurrent syncs never write the same file.
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        self.key = "dir:" + os.path.abspath(folder)
+
+    def user_folder(self, username):
+        return os.path.join(self.folder, hashlib.sha1(username.encode("utf-8")).hexdigest())
+
+    def heads(self, username):
+        """{node: end position} for every node that has pushed changes for this user."""
+        try:
+            entries = list(os.scandir(self.user_folder(username)))
+        except FileNotFoundError:
+            return {}
+        return {entry.name[:-4]: entry.stat().st_size for entry in entries
+                if entry.name.endswith(".log") and SYNC_NODE_PATTERN.match(entry.name[:-4])}
+
+    def read(self, username, node, position):
+        """Returns (complete frames after `position`, new position)."""
+        with open(os.path.join(self.user_folder(username), f"{node}.log"), "rb") as f:
+            f.seek(position)
+            data = f.read()
+        frames, offset = [], 0
+        while offset + 4 <= len(data):
+            (length,) = struct.unpack(">I", data[offset:offset + 4])
+            if offset + 4 + length > len(data):
+                break # Frame still being written by its node
+            frames.append(data[offset + 4:offset + 4 + length])
+            offset += 4 + length
+        return frames, position + offset
+
+    def close(self):
+        pass # Nothing held open between calls
+
+    def append(self, username, node, frames):
+        os.makedirs(self.user_folder(username), exist_ok=True)
+        with open(os.path.join(self.user_folder(username), f"{node}.log"), "ab") as f:
+            f.write(b"".join(struct.pack(">I", len(frame)) + frame for frame in frames))
+            f.flush()
+            os.fsync(f.fileno())
+
+class ServerRemote:
+    """The same log layout kept by a StoreServer (see the log_* ops)."""
+    def __init__(self, client):
+        self.client = client
+        self.key = "server:" + client.address
+
+    def heads(self, username):
+        return self.client.request("log_heads", user=username)
+
+    def read(self, username, node, position):
+        frames = self.client.request("log_read", user=username, node=node, since=position)
+        return [base64.b64decode(frame) for frame in frames], position + len(frames)
+
+    def append(self, username, node, frames):
+        self.client.request("log_append", user=username, node=node,
+                            frames=[base64.b64encode(frame).decode("ascii") for frame in frames])
+
+    def close(self):
+        self.client.close()
+
+class SyncEngine:
+    """Exchanges one user's changed records with a remote.
+
+    fetch() and push() only do I/O and can run on a worker thread; apply(), outgoing()
+    and commit() touch the stores and the journal and belong on the Tk thread.
+    """
+    def __init__(self, journal, stores, codecs=None):
+        self.journal = journal
+        self.stores = stores # collection -> PersistentData
+        # collection -> (to_wire, from_wire) record converters, e.g. to inline out-of-line text
+        self.codecs = codecs or {}
+
+    def fetch(self, remote, username, positions):
+        """Pulls frames other nodes appended since `positions`. Returns (changes, new positions)."""
+        positions = dict(positions)
+        changes = []
+        for node, end in remote.heads(username).items():
+            if node == self.journal.node or positions.get(node, 0) >= end:
+                continue
+            frames, positions[node] = remote.read(username, node, positions.get(node, 0))
+            for frame in frames:
+                changes.extend(json.loads(zlib.decompress(frame))["changes"])
+        return changes, positions
+
+    def apply(self, username, changes):
+        """Merges pulled changes last-writer-wins. Returns how many records changed locally."""
+        latest = {}
+        for change in changes: # Keep only the winning version of each record within the batch
+            key = (change["collection"], change["id"])
+            if key not in latest or tuple(change["stamp"]) > tuple(latest[key]["stamp"]):
+                latest[key] = change
+        by_collection = {}
+        for (collection, record_id), change in latest.items():
+            if collection in self.stores:
+                by_collection.setdefault(collection, {})[record_id] = change
+
+        tombstones = self.journal.state["tombstones"].setdefault(username, {})
+        total = 0
+        for collection, incoming in by_collection.items():
+            applied = 0
+            store = self.stores[collection]
+            records = store.get_user_data(username, [])
+            index = {record.get("id"): i for i, record in enumerate(records) if isinstance(record, dict)}
+            removed = set()
+            from_wire = self.codecs.get(collection, (None, None))[1]
+            for record_id, change in incoming.items():
+                stamp = tuple(change["stamp"])
+                local = records[index[record_id]] if record_id in index else None
+                local_stamp = record_stamp(local) if local else tuple(tombstones.get(f"{collection}/{record_id}", ("", "")))
+                if stamp <= local_stamp:
+                    continue # Ours is newer, or this is a change we already have
+                if change["record"] is None:
+                    if local:
+                        removed.add(record_id)
+                    tombstones[f"{collection}/{record_id}"] = list(stamp)
+                    applied += 1
+                    continue
+                if from_wire:
+                    change["record"] = from_wire(change["record"])
+                if local:
+                    records[index[record_id]] = change["record"]
+                else:
+                    records.append(change["record"])
+                    tombstones.pop(f"{collection}/{record_id}", None)
+                applied += 1
+            if applied:
+                records = [record for record in records if not (isinstance(record, dict) and record.get("id") in removed)]
+                self.journal.suspended = True
+                try:
+                    store.set_user_data(username, records)
+                finally:
+                    self.journal.suspended = False
+            total += applied
+        return total
+
+    def outgoing(self, remote_key, username):
+        """Compressed frames with every local change not yet pushed. Returns (frames, journal seq)."""
+        pushed = self.journal.remote_state(remote_key, username)["pushed"]
+        keys = self.journal.changes_since(username, pushed)
+        tombstones = self.journal.state["tombstones"].get(username, {})
+        wanted = {}
+        for key in reversed(keys): # Oldest first, so pulled records keep their creation order
+            collection, record_id = key.split("/", 1)
+            wanted.setdefault(collection, {})[record_id] = True
+        changes = []
+        for collection, record_ids in wanted.items():
+            if collection not in self.stores:
+                continue
+            found = {record.get("id"): record for record in self.stores[collection].get_user_data(username, [])
+                     if isinstance(record, dict) and record.get("id") in record_ids}
+            for record_id in record_ids:
+                record = found.get(record_id)
+                if record is not None:
+                    content = {k: v for k, v in record.items() if k != "selected_for_action"}
+                    if collection in self.codecs:
+                        content = self.codecs[collection][0](content)
+                    changes.append({"collection": collection, "id": record_id, "record": content,
+                                    "stamp": list(record_stamp(record))})
+                elif f"{collection}/{record_id}" in tombstones:
+                    changes.append({"collection": collection, "id": record_id, "record": None,
+                                    "stamp": tombstones[f"{collection}/{record_id}"]})
+        frames = [zlib.compress(json.dumps({"node": self.journal.node, "changes": changes[i:i + SYNC_BATCH_RECORDS]}).encode("utf-8"))
+                  for i in range(0, len(changes), SYNC_BATCH_RECORDS)]
+        return frames, self.journal.state["seq"]
+
+    def push(self, remote, username, frames):
+        if frames:
+            remote.append(username, self.journal.node, frames)
+
+    def commit(self, remote_key, username, positions=None, pushed=None):
+        state = self.journal.remote_state(remote_key, username)
+        updated = dict(state, **{key: value for key, value in (("positions", positions), ("pushed", pushed))
+                                 if value is not None})
+        if updated != state: # A sync with nothing to transfer does not rewrite the journal
+            state.update(updated)
+            self.journal.save()
+
+# --- Change Notifications ---
+# Stores diff every set_user_data against a snapshot of what the caller last read and
+# publish one (record id, kind) pair per changed record. Open views subscribe to the
+# collections they show and patch just those rows instead of re-rendering everything.
+StoreChange = collections.namedtuple("StoreChange", "collection user record_id kind")
+
+def record_snapshot(value, copy_records=True):
+    """The records of a user as they are now, or None for values that are not record lists.
+
+    Records are shallow-copied, which is enough because callers replace fields rather than
+    edit nested values. Append-only stores pass copy_records=False and keep references:
+    their records are never edited in place, and a long history is not copied on first read.
+    """
+    if not isinstance(value, list):
+        return None
+    if not copy_records:
+        return list(value)
+    return [dict(record) if isinstance(record, dict) else record for record in value]
+
+def diff_records(snapshots, username, value, previous=None, copy_records=True):
+    """Returns [(record id, kind)] for what changed since `snapshots[username]` and updates it.
+
+    Kinds are "added", "updated", "removed", "selected" (only the selection checkbox changed)
+    and "replaced" (record id None) for values that are not record lists. Version stamps
+    alone do not count as a change. `previous` stands in for users whose data was never
+    read. Records without an id are given one.
+    """
+    old = snapshots[username] if username in snapshots else record_snapshot(previous, copy_records)
+    if not isinstance(value, list):
+        snapshots[username] = None
+        return [(None, "replaced")]
+    records = [record for record in value if isinstance(record, dict)]
+    for record in records:
+        if "id" not in record:
+            record["id"] = str(uuid.uuid4())
+    snapshots[username] = record_snapshot(value, copy_records)
+    before_by_id = {record["id"]: record for record in old or () if isinstance(record, dict) and "id" in record}
+    changes = []
+    for record in records:
+        before = before_by_id.pop(record["id"], None)
+        if before is None:
+            changes.append((record["id"], "added"))
+        elif before is not record and before != record:
+            if any(before.get(key) != record.get(key) for key in before.keys() | record.keys()
+                   if key not in SYNC_VOLATILE_FIELDS):
+                changes.append((record["id"], "updated"))
+            elif bool(before.get("selected_for_action")) != bool(record.get("selected_for_action")):
+                changes.append((record["id"], "selected"))
+    changes.extend((record_id, "removed") for record_id in before_by_id)
+    return changes
+
+def fold_change(previous, kind):
+    """Combines two changes to the same record within one notification cycle (None: no net change)."""
+    if previous == "added":
+        return None if kind == "removed" else "added"
+    if previous == "removed" and kind == "added":
+        return "updated"
+    if previous == "updated" and kind == "selected":
+        return "updated"
+    return kind
+
+class StoreEvents:
+    """Collects store changes and delivers them to subscribers once per Tk idle cycle.
+
+    publish() may be called from worker threads (the timer logs sessions from one); delivery
+    always happens on the Tk thread through `schedule`. Subscriptions belong to a widget
+    and are dropped once it is destroyed.
+    """
+    def __init__(self, schedule):
+        self.schedule = schedule # e.g. Tk.after_idle
+        self.lock = threading.Lock()
+        self.pending = {} # (collection, user, record id) -> kind, in first-change order
+        self.scheduled = False
+        self.subscriptions = []
+
+    def publish(self, collection, username, changes):
+        with self.lock:
+            for record_id, kind in changes:
+                key = (collection, username, record_id)
+                self.pending[key] = fold_change(self.pending.get(key), kind)
+            if self.scheduled or not self.pending:
+                return
+            self.scheduled = True
+        self.schedule(self.flush)
+
+    def subscribe(self, widget, collections, callback, selection=False):
+        """Calls callback([StoreChange]) with changes to `collections`; "selected" ones only if asked."""
+        self.subscriptions.append((widget, frozenset(collections), selection, callback))
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.scheduled = False # Changes made by subscribers go out in the next cycle
+        events = [StoreChange(*key, kind) for key, kind in pending.items() if kind is not None]
+        for subscription in list(self.subscriptions):
+            widget, collections, selection, callback = subscription
+            try:
+                alive = widget.winfo_exists()
+            except tk.TclError:
+                alive = False
+            if not alive:
+                self.subscriptions.remove(subscription)
+                continue
+            relevant = [event for event in events
+                        if event.collection in collections and (selection or event.kind != "selected")]
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    print(f"Error updating a view after a store change: {e}")
+
+class RecordListView:
+    """One row widget per record in a list frame; apply() rebuilds only the rows that changed.
+
+    build_row(parent, record) returns an unpacked widget. With `limit`, only the newest
+    `limit` records are shown, newest first. Records keep their relative order in a store,
+    so unchanged rows never need to move.
+    """
+    def __init__(self, parent, build_row, empty_text, limit=None, **pack_options):
+        self.parent = parent
+        self.build_row = build_row
+        self.empty_text = empty_text
+        self.limit = limit
+        self.pack_options = pack_options or {"fill": "x", "pady": 5, "padx": 5}
+        self.rows = {} # record id -> row widget
+        self.empty_label = None
+
+    def render(self, records):
+        for widget in self.parent.winfo_children():
+            widget.destroy()
+        self.rows, self.empty_label = {}, None
+        self.apply([], records)
+
+    def apply(self, events, records):
+        if any(event.kind == "replaced" for event in events):
+            self.render(records)
+            return
+        changed = {event.record_id for event in events}
+        shown = [record for record in records if isinstance(record, dict) and "id" in record]
+        if self.limit:
+            shown = shown[-self.limit:][::-1]
+        wanted = {record["id"] for record in shown}
+        for record_id in [record_id for record_id in self.rows if record_id not in wanted]:
+            self.rows.pop(record_id).destroy()
+
+        if shown and self.empty_label is not None:
+            self.empty_label.destroy()
+            self.empty_label = None
+        elif not shown and self.empty_label is None:
+            self.empty_label = ctk.CTkLabel(self.parent, text=self.empty_text, text_color=TEXT_COLOR, font=FONT_BODY)
+            self.empty_label.pack(pady=20)
+
+        previous = None
+        for position, record in enumerate(shown):
+            row = self.rows.get(record["id"])
+            if row is None or record["id"] in changed:
+                new_row = self.build_row(self.parent, record)
+                if row is not None:
+                    new_row.pack(before=row, **self.pack_options)
+                    row.destroy()
+                elif previous is not None:
+                    new_row.pack(after=previous, **self.pack_options)
+                else:
+                    following = next((self.rows[later["id"]] for later in shown[position + 1:] if later["id"] in self.rows), None)
+                    if following is not None:
+                        new_row.pack(before=following, **self.pack_options)
+                    else:
+                        new_row.pack(**self.pack_options)
+                self.rows[record["id"]] = row = new_row
+            previous = row
+
+# --- Syllabus Uploads ---
+class CopyCancelled(Exception):
+    pass
+
+def copy_file_hashed(src_path, dest_path, progress_callback=None, cancel_event=None, chunk_size=COPY_CHUNK_BYTES):
+    """Streams src to dest in fixed-size chunks and returns the SHA-256 hex digest of the content.
+
+    The copy goes to a temp file next to dest and is renamed into place only once complete
+    and flushed, so dest is never left half-written. Raises CopyCancelled when
+    `cancel_event` is set; the temp file is removed either way.
+    """
+    total = os.path.getsize(src_path)
+    digest = hashlib.sha256()
+    temp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp" # Unique, so two uploads never share a temp file
+    try:
+        with open(src_path, "rb") as src, open(temp_path, "wb") as dst:
+            copied = 0
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise CopyCancelled()
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                dst.write(chunk)
+                copied += len(chunk)
+                if progress_callback:
+                    progress_callback(copied, total)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(temp_path, dest_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return digest.hexdigest()
+
+def hash_file(path, chunk_size=COPY_CHUNK_BYTES):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def section_owner(course, section):
+    """Manifest owner for files shared with a whole course section."""
+    return f"section:{course}:{section}"
+
+class SyllabusStore:
+    """Content-addressed syllabus files: each distinct file is stored once under its SHA-256.
+
+    Blobs live in <root>/blobs/<first two hex digits>/<sha256><ext>; the extension only
+    lets the system viewer pick an app. `manifests` (a PersistentData) maps an owner - a
+    username, a section_owner() key, SHARED_SYLLABUS_OWNER or LEGACY_SYLLABUS_OWNER - to the
+    files it uploaded. collect_garbage() deletes blobs that no manifest refers to any more.
+    """
+    def __init__(self, manifests, root=SYLLABUS_FOLDER):
+        self.manifests = manifests
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.incoming_dir = os.path.join(root, "incoming")
+
+    @staticmethod
+    def blob_name(digest, ext):
+        return digest + ext.lower()
+
+    def blob_path(self, digest, ext):
+        return os.path.join(self.blob_dir, digest[:2], self.blob_name(digest, ext))
+
+    def incoming_path(self, ext):
+        """A fresh path to upload into before the content hash is known."""
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        return os.path.join(self.incoming_dir, uuid.uuid4().hex + ext.lower())
+
+    def ingest(self, path, digest, ext):
+        """Moves a finished upload into the blob area. Returns True if the content was new."""
+        blob_path = self.blob_path(digest, ext)
+        if os.path.exists(blob_path):
+            os.remove(path) # Already stored for someone else
+            return False
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.replace(path, blob_path)
+        return True
+
+    def add_entry(self, owner, entry):
+        """Records an upload for `owner`, replacing its earlier file of the same subject and type.
+
+        Returns the replaced entries (their blobs may now be garbage).
+        """
+        entries = self.manifests.get_user_data(owner, [])
+        replaced = [old for old in entries if (old["subject"], old["ext"]) == (entry["subject"], entry["ext"])]
+        entries = [old for old in entries if old not in replaced]
+        entries.append(stamp_record(entry))
+        self.manifests.set_user_data(owner, entries)
+        return replaced
+
+    def entries_for(self, owners):
+        """(owner, entry) pairs for everything the given owners can see, in upload order."""
+        return [(owner, entry) for owner in owners for entry in self.manifests.get_user_data(owner, [])]
+
+    def referenced(self):
+        return {self.blob_name(entry["sha256"], entry["ext"])
+                for entries in self.manifests.data.values() if isinstance(entries, list) for entry in entries}
+
+    def collect_garbage(self):
+        """Deletes unreferenced blobs and stale upload temp files. Returns (files removed, bytes freed)."""
+        referenced = self.referenced()
+        cutoff = time.time() - INCOMING_MAX_AGE_HOURS * 3600
+        stale = [entry for entry in self.scandir(self.incoming_dir)
+                 if entry.is_file() and entry.stat().st_mtime < cutoff]
+        for fanout in self.scandir(self.blob_dir):
+            if fanout.is_dir():
+                stale.extend(entry for entry in self.scandir(fanout.path)
+                             if entry.is_file() and entry.name not in referenced)
+        removed = freed = 0
+        for entry in stale:
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+    @staticmethod
+    def scandir(folder):
+        try:
+            return list(os.scandir(folder))
+        except FileNotFoundError:
+            return []
+
+    def legacy_migrated(self):
+        return os.path.exists(os.path.join(self.root, LEGACY_MIGRATED_MARKER))
+
+    def scan_legacy(self):
+        """Hashes the files left in the old flat "<subject><ext>" layout. Returns [(path, entry)].
+
+        Only reads, so it can run on a worker thread; migrate_legacy() moves the files.
+        """
+        files = []
+        for entry in self.scandir(self.root):
+            if not entry.is_file() or entry.name.endswith(".tmp") or entry.name == LEGACY_MIGRATED_MARKER:
+                continue
+            subject, ext = os.path.splitext(entry.name)
+            stat = entry.stat()
+            files.append((entry.path, {
+                "subject": subject, "name": entry.name, "ext": ext.lower(), "size": stat.st_size,
+                "sha256": hash_file(entry.path), "uploaded_at": datetime.fromtimestamp(stat.st_mtime).isoformat()}))
+        return files
+
+    def migrate_legacy(self, files, owner):
+        """Moves scanned legacy files into the blob area under `owner` and marks the migration done."""
+        for path, entry in files:
+            if not os.path.exists(path):
+                continue # Already moved by another instance
+            self.ingest(path, entry["sha256"], entry["ext"])
+            entry["uploaded_by"] = "" if owner == LEGACY_SYLLABUS_OWNER else owner
+            self.add_entry(owner, entry)
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, LEGACY_MIGRATED_MARKER), "w", encoding="utf-8"):
+            pass
+
+class SyllabusCatalog:
+    """Persistent index of the blob area, kept current by incremental os.scandir passes.
+
+    For each fanout folder the catalog remembers its mtime and only rescans folders whose
+    mtime moved (adding or removing a file changes it); within a rescanned folder a blob
+    is re-stat'ed into the index only if its size or mtime changed. A folder modified
+    within CATALOG_RACY_SECONDS of a scan is not trusted and is looked at again next time.
+    Blobs are named by their content and never rewritten in place, so a folder whose mtime
+    has not moved needs no per-file stat at all.
+    rows() joins the index with the manifests into one flat, sortable row per upload.
+    """
+    def __init__(self, store, filepath=SYLLABUS_CATALOG_FILE):
+        self.store = store
+        self.filepath = filepath
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        self.folders = state.get("folders", {}) # fanout name -> mtime_ns at the last trusted scan
+        self.blobs = state.get("blobs", {}) # blob name -> {"folder", "size", "mtime_ns"}
+
+    def save(self):
+        try:
+            write_file_atomically(self.filepath, json.dumps({"folders": self.folders, "blobs": self.blobs}))
+        except OSError as e:
+            print(f"Error saving {self.filepath}: {e}")
+
+    def refresh(self):
+        """Brings the index up to date with the blob area. Returns the number of blobs that changed."""
+        racy_after = time.time_ns() - CATALOG_RACY_SECONDS * 1_000_000_000
+        changed = 0
+        present = set()
+        folders = dict(self.folders)
+        for fanout in self.store.scandir(self.store.blob_dir):
+            if not fanout.is_dir():
+                continue
+            present.add(fanout.name)
+            mtime_ns = fanout.stat().st_mtime_ns
+            if self.folders.get(fanout.name) == mtime_ns:
+                continue
+            changed += self.rescan(fanout.name, fanout.path)
+            self.folders[fanout.name] = mtime_ns if mtime_ns < racy_after else None
+        for name in [name for name in self.folders if name not in present]:
+            del self.folders[name]
+            changed += self.forget(name, set())
+        if changed or self.folders != folders:
+            self.save()
+        return changed
+
+    def rescan(self, folder, path):
+        changed = 0
+        seen = set()
+        for entry in self.store.scandir(path):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            seen.add(entry.name)
+            stat = entry.stat()
+            known = self.blobs.get(entry.name)
+            if known and (known["size"], known["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            self.blobs[entry.name] = {"folder": folder, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            changed += 1
+        return changed + self.forget(folder, seen)
+
+    def forget(self, folder, keep):
+        gone = [name for name, blob in self.blobs.items() if blob["folder"] == folder and name not in keep]
+        for name in gone:
+            del self.blobs[name]
+        return len(gone)
+
+    def rows(self, owners):
+        """One row per upload the owners can see. "size" is None when the blob is missing on disk."""
+        rows = []
+        for owner, entry in self.store.entries_for(owners):
+            blob_name = self.store.blob_name(entry["sha256"], entry["ext"])
+            blob = self.blobs.get(blob_name)
+            rows.append({
+                "subject": entry["subject"], "name": entry["name"], "ext": entry["ext"],
+                "type": SYLLABUS_FILE_TYPES.get(entry["ext"], entry["ext"].lstrip(".").upper() or "File"),
+                "size": blob["size"] if blob else None, "uploaded_at": entry.get("uploaded_at", ""),
+                "owner": owner, "uploaded_by": entry.get("uploaded_by", ""), "sha256": entry["sha256"],
+                "path": self.store.blob_path(entry["sha256"], entry["ext"])})
+        return rows
+
+# --- Syllabus Search ---
+# Text is pulled out of uploads with the standard library only: plain text, the XML inside
+# a .docx, and the Tj/TJ string operators of (optionally Flate-compressed) PDF content
+# streams. PDFs whose fonts use custom glyph encodings come out as gibberish and simply
+# won't match; scanned PDFs have no text at all.
+DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PDF_STREAM_PATTERN = re.compile(rb"(?<!end)stream\r?\n")
+PDF_TOKEN_PATTERN = re.compile(rb"""
+    (?P<string>\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\))
+   |(?P<hex><[0-9A-Fa-f\s]*>)
+   |(?P<open>\[)|(?P<close>\])
+   |(?P<comment>%[^\r\n]*)
+   |(?P<dict><<|>>)
+   |(?P<name>/[^\s/\[\]()<>{}%]*)
+   |(?P<number>[+-]?(?:\d+\.?\d*|\.\d+))
+   |(?P<op>[A-Za-z'"*][^\s/\[\]()<>{}%]*)
+""", re.S | re.X)
+PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+PDF_LINE_OPERATORS = {b"Td", b"TD", b"T*", b"Tm", b"ET", b"'", b'"'}
+PDF_WORD_GAP = -200 # TJ adjustments wider than this (thousandths of an em) separate words
+
+def extract_txt_text(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("latin-1")
+
+def extract_docx_text(path):
+    """Paragraph text from word/document.xml, streamed so large documents stay cheap."""
+    lines, current = [], []
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as document:
+        for _, element in ET.iterparse(document):
+            if element.tag == DOCX_NAMESPACE + "t" and element.text:
+                current.append(element.text)
+            elif element.tag == DOCX_NAMESPACE + "tab":
+                current.append("\t")
+            elif element.tag == DOCX_NAMESPACE + "p":
+                lines.append("".join(current))
+                current = []
+                element.clear()
+    lines.append("".join(current))
+    return "\n".join(lines)
+
+def pdf_literal(token):
+    """Decodes a (...) string token: escapes, octal codes and line continuations."""
+    body, out, i = token[1:-1], bytearray(), 0
+    while i < len(body):
+        c = body[i:i + 1]
+        if c != b"\\":
+            out += c
+            i += 1
+            continue
+        nxt = body[i + 1:i + 2]
+        if nxt in PDF_ESCAPES:
+            out += PDF_ESCAPES[nxt]
+            i += 2
+        elif nxt.isdigit():
+            digits = re.match(rb"[0-7]{1,3}", body[i + 1:i + 4])
+            out.append(int(digits.group(), 8) & 0xFF if digits else 0)
+            i += 1 + (len(digits.group()) if digits else 1)
+        elif nxt in (b"\r", b"\n"):
+            i += 3 if body[i + 1:i + 3] == b"\r\n" else 2
+        else:
+            out += nxt
+            i += 2
+    return bytes(out)
+
+def pdf_decode(raw):
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "replace")
+    return raw.decode("latin-1")
+
+def pdf_content_text(content):
+    """Text shown by the Tj, TJ, ' and " operators of one content stream."""
+    parts, operands, position = [], [], 0
+    while True:
+        match = PDF_TOKEN_PATTERN.search(content, position)
+        if not match:
+            break
+        position = match.end()
+        kind, token = match.lastgroup, match.group()
+        if kind == "string":
+            operands.append(pdf_literal(token))
+        elif kind == "hex":
+            digits = re.sub(rb"\s", b"", token[1:-1])
+            operands.append(bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii")))
+        elif kind == "open":
+            operands.append("[")
+        elif kind == "close":
+            start = max((i for i, item in enumerate(operands) if item == "["), default=None)
+            if start is not None:
+                operands[start:] = [operands[start + 1:]]
+        elif kind == "number":
+            operands.append(float(token))
+        elif kind == "op":
+            if token in (b"Tj", b"'", b'"') and operands and isinstance(operands[-1], bytes):
+                if token != b"Tj":
+                    parts.append("\n")
+                parts.append(pdf_decode(operands[-1]))
+            elif token == b"TJ" and operands and isinstance(operands[-1], list):
+                for item in operands[-1]:
+                    if isinstance(item, bytes):
+                        parts.append(pdf_decode(item))
+                    elif isinstance(item, float) and item < PDF_WORD_GAP:
+                        parts.append(" ")
+            elif token in PDF_LINE_OPERATORS:
+                parts.append("\n")
+            elif token == b"ID": # Inline image data is binary; skip to its end marker
+                end = content.find(b"EI", position)
+                position = len(content) if end < 0 else end + 2
+            operands = []
+    return "".join(parts)
+
+def extract_pdf_text(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    pages = []
+    for match in PDF_STREAM_PATTERN.finditer(data):
+        start = data.rfind(b"obj", 0, match.start())
+        if start < 0 or data[start - 3:start] == b"end":
+            continue # Not preceded by an object header, e.g. the word "stream" inside text
+        header = data[start:match.start()]
+        if any(key in header for key in (b"/Image", b"/ObjStm", b"/XRef", b"/Length1", b"/Metadata")):
+            continue # Images, object streams, embedded fonts: not page content
+        filters = re.findall(rb"/(\w+Decode)", header)
+        if any(name != b"FlateDecode" for name in filters):
+            continue # DCT, LZW, ASCII85, ... are images or rare enough to skip
+        end = data.find(b"endstream", match.end())
+        raw = data[match.end():end if end >= 0 else len(data)]
+        if filters:
+            try:
+                raw = zlib.decompressobj().decompress(raw)
+            except zlib.error:
+                continue
+        text = pdf_content_text(raw)
+        if text.strip():
+            pages.append(text)
+    return "\n".join(pages)
+
+SYLLABUS_TEXT_EXTRACTORS = {".txt": extract_txt_text, ".docx": extract_docx_text, ".pdf": extract_pdf_text}
+
+def search_terms(text):
+    return SEARCH_TOKEN_PATTERN.findall(text.casefold())
+
+def extract_syllabus_file(path, ext, text_path):
+    """Process pool worker: extracts one upload, saves its text and returns (term counts, error)."""
+    extractor = SYLLABUS_TEXT_EXTRACTORS.get(ext)
+    if extractor is None:
+        return {}, f"no text extractor for {ext or 'this file type'}"
+    try:
+        text = extractor(path)
+        os.makedirs(os.path.dirname(text_path), exist_ok=True)
+        write_file_atomically(text_path, text)
+    except Exception as e: # A damaged upload must not take the whole batch down
+        return {}, f"{type(e).__name__}: {e}"
+    return dict(collections.Counter(search_terms(text))), None
+
+class SyllabusSearchIndex:
+    """Persistent inverted index over uploaded syllabi, keyed by content hash.
+
+    `docs` maps a blob's SHA-256 to what extraction found (term total or an error) and
+    `postings` maps each term to {sha256: occurrences}. Blobs never change, so a hash
+    that is already in `docs` is never extracted again; update() only extracts new
+    content, in a process pool, and drops hashes no manifest refers to any more.
+    Updates run on a worker thread while the UI searches, hence the lock.
+    """
+    def __init__(self, filepath=SEARCH_INDEX_FILE, text_folder=SEARCH_TEXT_FOLDER):
+        self.filepath = filepath
+        self.text_folder = text_folder
+        self.lock = threading.Lock()
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get("format") != SEARCH_INDEX_FORMAT:
+            state = {}
+        self.docs = state.get("docs", {})
+        self.postings = state.get("postings", {})
+        self.sorted_terms = None # Built on demand for prefix lookups
+
+    def save(self):
+        with self.lock:
+            text = json.dumps({"format": SEARCH_INDEX_FORMAT, "docs": self.docs, "postings": self.postings})
+        try:
+            write_file_atomically(self.filepath, text)
+        except OSError as e:
+            print(f"Error saving {self.filepath}: {e}")
+
+    def text_path(self, digest):
+        return os.path.join(self.text_folder, digest[:2], digest + ".txt")
+
+    def pending(self, rows):
+        """Catalog rows whose content has not been extracted yet, one per hash."""
+        jobs = {}
+        for row in rows:
+            if row["sha256"] not in self.docs and row["size"] is not None:
+                jobs.setdefault(row["sha256"], row)
+        return list(jobs.values())
+
+    def add(self, digest, counts, error=None):
+        with self.lock:
+            self.docs[digest] = {"terms": sum(counts.values()), "error": error}
+            for term, count in counts.items():
+                self.postings.setdefault(term, {})[digest] = count
+            self.sorted_terms = None
+
+    def prune(self, live_digests):
+        """Forgets content that is no longer referenced. Returns how many documents were dropped."""
+        with self.lock:
+            dead = set(self.docs) - set(live_digests)
+            if not dead:
+                return 0
+            for digest in dead:
+                del self.docs[digest]
+                try:
+                    os.remove(self.text_path(digest))
+                except OSError:
+                    pass
+            for term in list(self.postings):
+                hits = self.postings[term]
+                for digest in dead.intersection(hits):
+                    del hits[digest]
+                if not hits:
+                    del self.postings[term]
+            self.sorted_terms = None
+        return len(dead)
+
+    def update(self, rows, live_digests, progress_callback=None, workers=None):
+        """Extracts every pending row in a process pool. Returns the number of files extracted."""
+        jobs = self.pending(rows)
+        pruned = self.prune(live_digests)
+        if not jobs:
+            if pruned:
+                self.save()
+            return 0
+        args = ([row["path"] for row in jobs], [row["ext"] for row in jobs],
+                [self.text_path(row["sha256"]) for row in jobs])
+        workers = min(len(jobs), workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(extract_syllabus_file, *args)
+                for done, (row, (counts, error)) in enumerate(zip(jobs, results), 1):
+                    self.add(row["sha256"], counts, error)
+                    if progress_callback:
+                        progress_callback(done, len(jobs))
+        else:
+            for done, row in enumerate(jobs, 1):
+                self.add(row["sha256"], *extract_syllabus_file(row["path"], row["ext"], self.text_path(row["sha256"])))
+                if progress_callback:
+                    progress_callback(done, len(jobs))
+        self.save()
+        return len(jobs)
+
+    def matching_terms(self, word):
+        """Indexed terms starting with `word`, so "thermo" finds "thermodynamics"."""
+        if self.sorted_terms is None:
+            self.sorted_terms = sorted(self.postings)
+        start = bisect.bisect_left(self.sorted_terms, word)
+        end = bisect.bisect_left(self.sorted_terms, word + "\U0010ffff")
+        return self.sorted_terms[start:end]
+
+    def search(self, query, digests=None):
+        """Hashes containing every query word (as a prefix), best first, as (sha256, score) pairs."""
+        words = search_terms(query)
+        if not words:
+            return []
+        with self.lock:
+            scores = None
+            for word in words:
+                hits = {}
+                for term in self.matching_terms(word):
+                    for digest, count in self.postings[term].items():
+                        hits[digest] = hits.get(digest, 0) + count
+                scores = hits if scores is None else {digest: scores[digest] + count
+                                                      for digest, count in hits.items() if digest in scores}
+                if not scores:
+                    return []
+        if digests is not None:
+            scores = {digest: score for digest, score in scores.items() if digest in digests}
+        return heapq.nlargest(SEARCH_MAX_RESULTS, scores.items(), key=lambda item: item[1])
+
+    def snippet(self, digest, query):
+        """The first line of a document's text that mentions a query word."""
+        words = search_terms(query)
+        try:
+            with open(self.text_path(digest), "r", encoding="utf-8") as f:
+                for line in f:
+                    folded = line.casefold()
+                    positions = [folded.find(word) for word in words if word in folded]
+                    if positions:
+                        start = max(min(positions) - SEARCH_SNIPPET_CHARS // 3, 0)
+                        return " ".join(line[start:start + SEARCH_SNIPPET_CHARS].split())
+        except OSError:
+            pass
+        return ""
+
+# --- Syllabus Plans ---
+# Syllabi mostly follow one shape: "Unit I: Title" (or Module/Chapter/Week/Part) headings,
+# each followed by either bullet/numbered topic lines or a paragraph of comma separated
+# topics, and then text book and outcome sections that are not topics at all.
+OUTLINE_UNIT_PATTERN = re.compile(r"^(unit|module|chapter|week|part)\s*[-–:.#]?\s*(\d{1,2}|[ivxlc]{1,6})\b\s*[-–:.)]?\s*(.*)$", re.I)
+OUTLINE_ITEM_PATTERN = re.compile(r"^(?:[-*•·◦▪▸►–]|\(?\d{1,2}(?:\.\d{1,2})+\.?|\(?\d{1,2}[.)]|\(?[a-h][.)])\s+(.+)$", re.I)
+OUTLINE_STOP_PATTERN = re.compile(r"^(text\s*books?|references?|reference books?|suggested readings?|course outcomes?|"
+                                  r"outcomes|assessment|evaluation|grading|prerequisites?)\b", re.I)
+OUTLINE_NOISE_PATTERN = re.compile(r"\(?\b\d+\s*(?:hours?|hrs?|lectures?|periods?|credits?|marks?)\b\)?", re.I)
+OUTLINE_SPLIT_PATTERN = re.compile(r"[;,]|\.\s+(?=[A-Z])|\s[–-]\s")
+
+def clean_outline_text(text):
+    text = " ".join(OUTLINE_NOISE_PATTERN.sub("", text).split()).strip(" :-–.,;")
+    if text.startswith("and "):
+        text = text[4:]
+    return text.title() if text.isupper() and len(text) > 4 else text
+
+def outline_topics(unit):
+    """A unit's topics: its bullet/numbered lines, or else its paragraph split at commas."""
+    candidates = unit["items"] or OUTLINE_SPLIT_PATTERN.split(" ".join(unit["text"]))
+    shortest, longest = OUTLINE_TOPIC_LENGTH
+    topics = []
+    for candidate in candidates:
+        topic = clean_outline_text(candidate)
+        if shortest <= len(topic) <= longest and any(c.isalpha() for c in topic) and topic not in topics:
+            topics.append(topic)
+    return topics[:OUTLINE_MAX_TOPICS_PER_UNIT]
+
+def parse_syllabus_outline(text):
+    """Units of a syllabus as [{"unit": "Unit II", "title": ..., "topics": [...]}], in order.
+
+    A syllabus without unit headings comes back as a single untitled unit holding its
+    bullet and numbered lines.
+    """
+    units, current, stopped = [], None, False
+    loose = {"unit": "", "title": "", "items": [], "text": []} # Items outside any unit
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            continue
+        if OUTLINE_STOP_PATTERN.match(line):
+            current, stopped = None, True # Book lists and outcomes follow; nothing after is a topic
+            continue
+        heading = OUTLINE_UNIT_PATTERN.match(line)
+        if heading:
+            number = heading.group(2)
+            title, _, rest = heading.group(3).partition(":")
+            current = {"unit": f"{heading.group(1).title()} {number if number.isdigit() else number.upper()}",
+                       "title": clean_outline_text(title), "items": [], "text": [rest] if rest.strip() else []}
+            units.append(current)
+            continue
+        item = OUTLINE_ITEM_PATTERN.match(line)
+        if current is None:
+            if item and not stopped and not units:
+                loose["items"].append(item.group(1))
+        elif item:
+            current["items"].append(item.group(1))
+        elif not current["title"] and not current["text"]:
+            title, _, rest = line.partition(":") # Title on the line after "UNIT - II"
+            current["title"] = clean_outline_text(title)
+            current["text"].extend([rest] if rest.strip() else [])
+        else:
+            current["text"].append(line)
+    if not units and loose["items"]:
+        units = [loose]
+    return [{"unit": unit["unit"], "title": unit["title"], "topics": outline_topics(unit)} for unit in units]
+
+def propose_study_plans(outlines, existing_plans):
+    """Plan proposals ({"subject", "unit", "topic"}) for every subject's outline, in syllabus order.
+
+    Each topic becomes "Unit I: Title - Topic" (a unit without topics becomes one plan);
+    anything matching an existing plan's subject and topic is left out.
+    """
+    seen = {(plan.get("subject", "").casefold(), plan.get("topic", "").casefold()) for plan in existing_plans}
+    proposals = []
+    for subject, units in outlines.items():
+        for unit in units:
+            unit_name = ": ".join(part for part in (unit["unit"], unit["title"]) if part)
+            topics = [f"{unit_name} - {topic}" if unit_name else topic for topic in unit["topics"]] or [unit_name]
+            for topic in topics:
+                key = (subject.casefold(), topic.casefold())
+                if topic and key not in seen:
+                    seen.add(key)
+                    proposals.append({"subject": subject, "unit": unit_name, "topic": topic})
+    return proposals
+
+def spread_due_dates(count, start, end):
+    """`count` ISO dates spaced evenly after `start`, the last one on `end`."""
+    span = max((end - start).days, 0)
+    return [(start + timedelta(days=round(span * (i + 1) / count))).strftime("%Y-%m-%d") for i in range(count)]
+
+class StudentGuideApp:
+    def __init__(self, store_client=None):
+        self.store_client = store_client # Set when running against a store server (--connect)
         self.app = ctk.CTk()
         self.app.title("Student Guide - Default Theme") # Reverted title
         self.app.geometry("1920x1080") # Adjusted to 1920x1080
@@ -160,37 +3713,73 @@ class StudentGuideApp:
         self.plans_file = "plans.json"
         self.doubts_file = "doubts.json"
         self.timer_history_file = "timer_history.json" # *** ADDED for timer history
+        self.timer_rollups_file = "timer_rollups.json" # Daily/weekly/monthly focus totals
+        self.ics_feed_file = "ics_feed_cache.json" # Serialized calendar events per UID
+        self.study_schedule_file = "study_schedule.json" # Pomodoro blocks allocated by the scheduler
+        self.syllabus_file = "syllabus.json" # Per-owner manifests of content-addressed syllabus files
 
         self.doubt_folder = "saved_doubts"
         os.makedirs(self.doubt_folder, exist_ok=True)
 
+        # Store changes reach open views through one batched notification per idle cycle
+        self.store_events = StoreEvents(self.app.after_idle)
+
         # Each PersistentData instance now holds data for *all* users for its specific type
-        self.users_data = PersistentData(self.users_file)
-        # Initialize users_data if it's empty on first run
-        if not self.users_data.data:
-            # Example default user with new data structure
-            default_user_details = {
-                "password": "password123",
-                "name": "Default User",
-                "email": "default@example.com",
-                "course": "CSE",
-                "section": "A"
-            }
-            self.users_data.set_user_data("default_user", default_user_details)
-            self.users_data.save()
-
-        self.tasks_data = PersistentData(self.tasks_file)
-        self.reminders_data = PersistentData(self.reminders_file)
-        self.moods_data = PersistentData(self.moods_file) 
-        self.daily_checkins_data = PersistentData(self.daily_checkins_file) # Will not be explicitly used in Wellness Panel
-        self.wellness_goals_data = PersistentData(self.wellness_goals_file) # Will not be explicitly used in Wellness Panel
-        self.timer_history_data = PersistentData(self.timer_history_file) # *** ADDED for timer history
-
-        self.progress_data = PersistentData(self.progress_file)
-        self.plans_data = PersistentData(self.plans_file)
-        self.doubts_data = PersistentData(self.doubts_file)
+        self.users_data = self.open_store(self.users_file)
+        # A fresh install has no accounts; the first one is made in the register window (a store server manages its own)
+        if store_client is None and not self.users_data.data:
+            subheader.configure(text="No accounts yet - register to create the first one")
+            self.app.after(0, self.open_register_window)
+
+        self.tasks_data = self.open_store(self.tasks_file)
+        self.reminders_data = self.open_store(self.reminders_file)
+        self.moods_data = self.open_store(self.moods_file, append_only=True)
+        self.daily_checkins_data = self.open_store(self.daily_checkins_file) # Will not be explicitly used in Wellness Panel
+        self.wellness_goals_data = self.open_store(self.wellness_goals_file) # Will not be explicitly used in Wellness Panel
+        self.timer_history_data = self.open_store(self.timer_history_file, append_only=True) # *** ADDED for timer history
+        self.timer_rollups_data = self.open_store(self.timer_rollups_file)
+        self.ics_feed_data = self.open_store(self.ics_feed_file)
+        self.ics_feed = IcsFeedExporter(self.ics_feed_data)
+        self.study_schedule_data = self.open_store(self.study_schedule_file)
+        self.scheduler = StudyScheduler(self.study_schedule_data)
+        # Manifests describe blobs on this disk, so they stay local even with a store server
+        self.syllabus_data = self.open_store(self.syllabus_file, local=True)
+        self.syllabus_store = SyllabusStore(self.syllabus_data)
+        self.migrate_legacy_syllabi() # Files left in the old flat layout, once per install
+        self.syllabus_catalog = SyllabusCatalog(self.syllabus_store)
+        self.syllabus_search = SyllabusSearchIndex()
+        self.syllabus_indexer = None # Worker thread while new uploads are being extracted
+
+        self.progress_data = self.open_store(self.progress_file)
+        self.plans_data = self.open_store(self.plans_file)
+        self.doubts_data = self.open_store(self.doubts_file)
+        # Long doubt descriptions live out of line; with a store server they stay inline on the server
+        self.doubt_bodies = TextBlobStore() if store_client is None else None
+
+        # Offline-first sync of local stores with a shared folder or a store server
+        self.sync_journal = self.sync_engine = None
+        if store_client is None: # Already shared when every store lives on a server
+            self.sync_journal = SyncJournal()
+            stores = {store.collection: store for store in (self.tasks_data, self.plans_data, self.reminders_data,
+                      self.doubts_data, self.progress_data, self.moods_data, self.timer_history_data)}
+            for store in stores.values():
+                self.sync_journal.attach(store)
+            codecs = {"doubts": (lambda doubt: inline_doubt(doubt, self.doubt_bodies),
+                                 lambda doubt: externalize_doubt(doubt, self.doubt_bodies))}
+            self.sync_engine = SyncEngine(self.sync_journal, stores, codecs)
 
         self.current_user = None
+        # Plans and progress feed the study schedule, whichever window or sync changed them
+        self.watch(self.app, ("plans", "progress"), lambda events: self.update_study_schedule())
+        # Near-duplicate index of the current user's doubts, built on first use and kept in step
+        self.doubt_index = None
+        self.doubt_index_user = None
+        self.watch(self.app, ("doubts",), self.update_doubt_index)
+        # Spaced-repetition queue over doubts and completed topics, same lifecycle
+        self.review_queue = None
+        self.review_queue_user = None
+        self.review_positions = {} # collection -> {record id: index in the user's records}, kept with review_queue
+        self.watch(self.app, REVIEW_COLLECTIONS, self.update_review_queue)
 
         # Pomodoro Timer variables
         self._pomodoro_timer_window = None
@@ -203,6 +3792,8 @@ class StudentGuideApp:
         self._pomodoro_timer_id = None
         self.pomodoro_time_label = None
         self.timer_history_scroll_frame = None # *** ADDED
+        self.focus_summary_label = None
+        self.dash_focus_label = None
         self._current_timer_duration_minutes = 0 # *** ADDED
 
         # Reminder System variables
@@ -211,6 +3802,14 @@ class StudentGuideApp:
         self._reminder_check_interval = 1000
         self.active_reminders = {}
 
+        # Cached, vectorized statistics for the Progress Insights window
+        self.insights = ProgressInsights()
+        self._heatmap_values = {} # username -> (key, (focus_by_day, mood_by_day))
+        self.warm_cache = WarmCache()
+
+        # Sounds play on their own worker thread so alerts never freeze the UI
+        self.sound_player = SoundPlayer()
+
         self.app.mainloop()
 
     def open_register_window(self):
@@ -278,9 +3877,10 @@ class StudentGuideApp:
 
 
         # Create Account Button
-        ctk.CTkButton(frame, text="Create Account", command=self.register_user,
+        self.create_account_button = ctk.CTkButton(frame, text="Create Account", command=self.register_user,
                                  width=200, height=45, fg_color=ACCENT_COLOR_1, hover_color="#5cb85c",
-                                 text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).grid(row=11, column=0, columnspan=2, pady=10)
+                                 text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10)
+        self.create_account_button.grid(row=11, column=0, columnspan=2, pady=10)
         
         self.register_win = register_win # Store reference to the registration window
 
@@ -309,23 +3909,48 @@ class StudentGuideApp:
             messagebox.showerror("Registration Error", "Please fill in all required fields (Name, Username, Password, Email).", icon="error")
             return
         
-        # Check if username already exists
-        if new_user in self.users_data.data:
+        # Check if username already exists (the store server checks when the account is created)
+        if self.store_client is None and self.users_data.get_user_data(new_user) is not None:
             messagebox.showerror("Registration Error", "Username already exists. Please choose a different one.", icon="error")
             return
 
         # Store all user details in a dictionary
         user_details = {
-            "password": new_pwd, # Storing plaintext passwords. In a real app, use hashing!
             "name": new_name,
             "email": new_email,
             "course": course,
             "section": section
         }
-        self.users_data.set_user_data(new_user, user_details)
+        self.create_account_button.configure(state="disabled", text="Creating...")
+
+        def derive():
+            error = None
+            if self.store_client is not None:
+                try:
+                    self.store_client.register(new_user, new_pwd, user_details) # Hashed on the server
+                except (StoreError, OSError, TimeoutError) as e:
+                    error = e
+            else:
+                user_details["password_hash"] = hash_password(new_pwd) # Slow key derivation, off the Tk thread
+            self.app.after(0, lambda: self.finish_registration(new_user, user_details, error))
+
+        threading.Thread(target=derive, daemon=True).start()
+
+    def finish_registration(self, new_user, user_details, error=None):
+        window_open = self.register_win.winfo_exists() # The user may close it while we hash
+        taken = self.store_client is None and self.users_data.get_user_data(new_user) is not None # Taken while we were hashing
+        if error or taken:
+            if window_open:
+                self.create_account_button.configure(state="normal", text="Create Account")
+            message = f"Could not create the account: {error}" if error else "Username already exists. Please choose a different one."
+            messagebox.showerror("Registration Error", message, icon="error")
+            return
+        if self.store_client is None:
+            self.users_data.set_user_data(new_user, user_details)
         
         messagebox.showinfo("Registration Success", f"Account '{new_user}' created successfully! You can now log in.", icon="info")
-        self.register_win.destroy() # Close registration window
+        if window_open:
+            self.register_win.destroy() # Close registration window
         
         # Optionally pre-fill login fields
         self.username_entry.delete(0, "end")
@@ -336,15 +3961,84 @@ class StudentGuideApp:
         user = self.username_entry.get().strip()
         pwd = self.password_entry.get().strip()
 
-        # UPDATED LOGIN LOGIC for new data structure
-        user_data = self.users_data.data.get(user)
-        if user_data and user_data.get("password") == pwd:
-            self.current_user = user
-            self.open_dashboard()
-            if not self._reminder_thread_running:
-                self.start_reminder_checker() # Start reminder checker on login
+        # Password hashing is deliberately slow, so verify on a worker and keep the Tk loop responsive
+        self.login_button.configure(state="disabled", text="Signing in...")
+        if self.store_client is not None:
+            def verify(): # The server checks the password and upgrades old hashes itself
+                try:
+                    self.store_client.login(user, pwd)
+                    matches = True
+                except StoreError:
+                    matches = False
+                except (OSError, TimeoutError) as e:
+                    self.app.after(0, lambda e=e: self.login_failed(e))
+                    return
+                self.app.after(0, lambda: self.finish_login(user, matches, None))
         else:
+            user_data = dict(self.users_data.get_user_data(user) or {})
+
+            def verify():
+                matches, needs_rehash = verify_password(pwd, user_data)
+                new_hash = hash_password(pwd) if matches and needs_rehash else None
+                self.app.after(0, lambda: self.finish_login(user, matches, new_hash))
+
+        threading.Thread(target=verify, daemon=True).start()
+
+    def login_failed(self, error):
+        self.login_button.configure(state="normal", text="Login")
+        messagebox.showerror("Login Failed", f"Could not reach the store server: {error}", icon="error")
+
+    def finish_login(self, user, matches, new_hash):
+        self.login_button.configure(state="normal", text="Login")
+        if not matches:
             messagebox.showerror("Login Failed", "Invalid username or password!", icon="error")
+            return
+        if new_hash:
+            # Transparently upgrade plaintext or weaker hashes after a successful login
+            user_details = self.users_data.get_user_data(user, {})
+            user_details.pop("password", None)
+            user_details["password_hash"] = new_hash
+            self.users_data.set_user_data(user, user_details)
+        self.current_user = user
+        self.restore_warm_cache()
+        self.open_dashboard()
+        self.update_study_schedule() # Roll the schedule forward to today
+        self.sync_review_reminders()
+        if not self._reminder_thread_running:
+            self.start_reminder_checker() # Start reminder checker on login
+
+    def open_store(self, filepath, append_only=False, local=False):
+        """A local JSON store, or its collection on the store server when connected to one (unless `local`)."""
+        if self.store_client is None or local:
+            store = PersistentData(filepath, append_only)
+        else:
+            store = RemotePersistentData(self.store_client, os.path.splitext(os.path.basename(filepath))[0], append_only)
+        store.events = self.store_events
+        return store
+
+    def watch(self, widget, collections, callback, selection=False):
+        """Calls callback(events) after the current user's records in `collections` change, while `widget` exists."""
+        def deliver(events):
+            events = [event for event in events if event.user == self.current_user]
+            if events:
+                callback(events)
+        self.store_events.subscribe(widget, collections, deliver, selection)
+
+    def bind_record_list(self, parent, store, build_row, empty_text, **options):
+        """Renders the current user's records into `parent` and keeps the rows in step with the store."""
+        view = RecordListView(parent, build_row, empty_text, **options)
+        view.render(self.ensure_record_ids(store))
+        self.watch(parent, (store.collection,),
+                   lambda events: view.apply(events, store.get_user_data(self.current_user, [])), selection=True)
+        return view
+
+    def toggle_record_selection(self, store, record_id):
+        records = store.get_user_data(self.current_user, [])
+        for record in records:
+            if record.get("id") == record_id:
+                record['selected_for_action'] = not record.get('selected_for_action', False)
+                store.set_user_data(self.current_user, records)
+                return
 
     def open_dashboard(self):
         self.app.withdraw()
@@ -367,6 +4061,12 @@ class StudentGuideApp:
         # File Menu
         file_menu = tk.Menu(self.menubar, tearoff=0)
         self.menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Import Tasks/Plans/Reminders...", command=self.bulk_import)
+        file_menu.add_command(label="Export My Data...", command=self.export_data_window)
+        file_menu.add_command(label="Export iCalendar Feed...", command=self.export_ics_feed)
+        if self.sync_engine:
+            file_menu.add_command(label="Sync with Folder...", command=self.sync_with_folder)
+            file_menu.add_command(label="Sync with Server...", command=self.sync_with_server)
         file_menu.add_command(label="Logout", command=self.logout)
         file_menu.add_command(label="Exit", command=self.exit_app)
 
@@ -381,8 +4081,13 @@ class StudentGuideApp:
         features_menu.add_command(label="Wellness Panel", command=self.wellness_panel)
         features_menu.add_command(label="Syllabus_manager", command=self.syllabus_manager)
         features_menu.add_command(label="View Uploaded Syllabus", command=self.view_uploaded_syllabus)
+        features_menu.add_command(label="Search Syllabi", command=self.search_syllabi)
         features_menu.add_command(label="Calendar View", command=self.calendar_view)
         features_menu.add_command(label="Reminder System", command=self.reminder_system)
+        features_menu.add_command(label="Progress Insights", command=self.progress_insights)
+        features_menu.add_command(label="Review Now", command=self.review_now)
+        if self.users_data.get_user_data(self.current_user, {}).get("role") == "admin":
+            features_menu.add_command(label="Cohort Report", command=self.cohort_report)
         
         # Help Menu
         help_menu = tk.Menu(self.menubar, tearoff=0)
@@ -397,6 +4102,10 @@ class StudentGuideApp:
         ctk.CTkLabel(header_frame, text="EduMind Dashboard",
                                  font=FONT_LARGE, text_color=HEADER_TEXT_COLOR).pack(side="left", padx=40, pady=10)
 
+        self.dash_focus_label = ctk.CTkLabel(header_frame, text="", font=FONT_SMALL_BOLD, text_color=TEXT_COLOR)
+        self.dash_focus_label.pack(side="left", padx=20, pady=10)
+        self.watch_focus_summary(self.dash_focus_label)
+
         logout_button = ctk.CTkButton(header_frame, text="Logout", width=100, height=40,
                                          fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
                                          text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON,
@@ -421,8 +4130,11 @@ class StudentGuideApp:
             ("Wellness Panel", self.wellness_panel, "🧘", ACCENT_COLOR_6), # Soft Gold/Yellow
             ("Syllabus Manager", self.syllabus_manager, "📘", ACCENT_COLOR_5), # Muted Teal
             ("View Uploaded Syllabus", self.view_uploaded_syllabus, "📗", ACCENT_COLOR_3), # Aqua Blue
+            ("Search Syllabi", self.search_syllabi, "🔎", ACCENT_COLOR_6),
             ("Calendar View", self.calendar_view, "📅", ACCENT_COLOR_2), # Muted Sky Blue (reused for balance)
             ("Reminder System", self.reminder_system, "🔔", ACCENT_COLOR_4), # Muted Red (reused for balance)
+            ("Progress Insights", self.progress_insights, "📊", ACCENT_COLOR_1), # Soft Green
+            ("Review Now", self.review_now, "🔁", ACCENT_COLOR_2),
             ("Help & About", self.help_about, "ℹ️", CARD_BG_COLOR) # Use the general card background for "Help"
         ]
 
@@ -453,20 +4165,53 @@ class StudentGuideApp:
         self.dash.protocol("WM_DELETE_WINDOW", self.exit_app)
 
     def logout(self):
+        self.update_ics_feed() # Keep a subscribed calendar current
+        self.save_warm_cache()
         if hasattr(self, 'dash') and self.dash.winfo_exists():
             self.dash.destroy()
         self.app.deiconify() # Show the login window again
         self.stop_reminder_checker() # Stop reminder checker on logout
         self.stop_pomodoro_timer(stop_thread=True) # Ensure pomodoro thread is stopped
         self.current_user = None # Clear current user on logout
+        if self.store_client is not None:
+            try:
+                self.store_client.logout() # Ends the server session on every pooled connection
+            except (StoreError, OSError, TimeoutError) as e:
+                print(f"Error ending the store server session: {e}")
 
     def exit_app(self):
+        self.update_ics_feed()
+        self.save_warm_cache()
         if hasattr(self, 'dash') and self.dash.winfo_exists():
             self.dash.destroy()
         self.stop_reminder_checker() # Ensure reminder thread is stopped
         self.stop_pomodoro_timer(stop_thread=True) # Ensure pomodoro thread is stopped
+        self.sound_player.stop()
         self.app.destroy()
 
+    # --- Warm-Start Cache ---
+    def warm_cache_stamps(self):
+        return [store.version_stamp() for store in (self.timer_history_data, self.timer_rollups_data, self.moods_data)]
+
+    def save_warm_cache(self):
+        """Snapshots the derived data for the current user so the next login starts warm."""
+        if not self.current_user:
+            return
+        self.heatmap_day_values() # Fill the caches now rather than on the next login
+        self.get_progress_insights()
+        payload = {"insights": self.insights.snapshot(self.current_user),
+                   "heatmap": self._heatmap_values.get(self.current_user)}
+        self.warm_cache.save(self.current_user, self.warm_cache_stamps(), payload)
+
+    def restore_warm_cache(self):
+        payload = self.warm_cache.load(self.current_user, self.warm_cache_stamps())
+        if not payload:
+            return
+        if payload.get("insights") and np is not None:
+            self.insights.seed(self.current_user, payload["insights"])
+        if payload.get("heatmap"):
+            self._heatmap_values[self.current_user] = payload["heatmap"]
+
     def help_about(self):
         messagebox.showinfo("Help & About",
                              "Student  app following Default design guidelines.\n"
@@ -545,8 +4290,327 @@ class StudentGuideApp:
         messagebox.showinfo("Success", "Your profile information has been updated!", icon="info")
         win.destroy()
 
+    # --- Data Export ---
+    def user_collections(self, username=None):
+        """Yields (name, record count, records iterator) for each of a user's collections, profile first.
+
+        Only the lists of references are copied here, so later edits on the Tk thread don't reach
+        the export; records (and long doubt bodies) are produced one by one as they are written.
+        """
+        username = username or self.current_user
+        profile = self.users_data.get_user_data(username, {})
+        yield "profile", int(bool(profile)), iter([profile] if profile else [])
+        for name, store in (("tasks", self.tasks_data), ("plans", self.plans_data), ("doubts", self.doubts_data),
+                            ("progress", self.progress_data), ("moods", self.moods_data),
+                            ("timer_history", self.timer_history_data), ("reminders", self.reminders_data)):
+            records = list(store.get_user_data(username, []))
+            if name == "doubts":
+                yield name, len(records), (readable_doubt(doubt, self.doubt_bodies) for doubt in records)
+            else:
+                yield name, len(records), iter(records)
+
+    def export_data_window(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Export My Data")
+        win.geometry("450x320")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="📤 Export My Data", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
+        ctk.CTkLabel(frame, text="Tasks, plans, doubts, progress, moods, timer history,\nreminders and profile.",
+                     font=FONT_SMALL, text_color=TEXT_COLOR).pack(pady=(0, 10))
+
+        format_menu = ctk.CTkOptionMenu(frame, values=list(EXPORT_FORMATS),
+                                        fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                        text_color=BUTTON_TEXT_COLOR, dropdown_fg_color=BUTTON_HOVER_COLOR)
+        format_menu.set("Zip bundle")
+        format_menu.pack(pady=(0, 10))
+
+        progress_bar = ctk.CTkProgressBar(frame, width=300, progress_color=ACCENT_COLOR_1)
+        progress_bar.set(0)
+        progress_bar.pack(pady=(0, 5))
+        status_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        status_label.pack()
+
+        cancel_event = threading.Event()
+        export_button = ctk.CTkButton(frame, text="Export", fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                                      command=lambda: self.start_data_export(win, format_menu.get(), progress_bar,
+                                                                             status_label, export_button, cancel_event))
+        export_button.pack(pady=10)
+
+        def close():
+            cancel_event.set() # Stops a running export at the next record
+            win.destroy()
+        win.protocol("WM_DELETE_WINDOW", close)
+
+    def start_data_export(self, win, fmt, progress_bar, status_label, export_button, cancel_event):
+        extension = EXPORT_FORMATS[fmt]
+        path = filedialog.asksaveasfilename(parent=win, title="Export My Data",
+                                            initialfile=f"{self.current_user}_export{extension}",
+                                            defaultextension=extension,
+                                            filetypes=((fmt, f"*{extension}"), ("All files", "*.*")))
+        if not path:
+            return
+
+        def show_progress(done, total):
+            if win.winfo_exists():
+                progress_bar.set(done / max(total, 1))
+                status_label.configure(text=f"{done} / {total} records")
+
+        def on_progress(done, total):
+            self.app.after(0, show_progress, done, total) # Called on the worker thread
+
+        exporter = DataExporter(self.user_collections(), progress_callback=on_progress, cancel_event=cancel_event)
+        export_button.configure(state="disabled")
+        status_label.configure(text="Exporting...")
+
+        def run():
+            try:
+                count = exporter.export(path, fmt)
+                error = None
+            except Exception as e:
+                count, error = 0, e
+            if cancel_event.is_set() and os.path.exists(path):
+                os.remove(path) # Don't leave a half-written export behind
+            self.app.after(0, finish, count, error)
+
+        def finish(count, error):
+            if win.winfo_exists():
+                export_button.configure(state="normal")
+                progress_bar.set(1 if error is None else 0)
+            if cancel_event.is_set():
+                return
+            if error:
+                messagebox.showerror("Export Error", f"Failed to export data: {error}", icon="error")
+            else:
+                if win.winfo_exists():
+                    status_label.configure(text=f"Exported {count} records.")
+                messagebox.showinfo("Export Complete", f"Exported {count} records to {path}", icon="info")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    # --- iCalendar Feed ---
+    def ensure_record_ids(self, store, username=None):
+        """Assigns stable ids to records saved before ids existed. Saves only if something changed."""
+        username = username or self.current_user
+        records = store.get_user_data(username, [])
+        missing = [record for record in records if "id" not in record]
+        for record in missing:
+            record["id"] = str(uuid.uuid4())
+        if missing:
+            store.set_user_data(username, records)
+        return records
+
+    def calendar_feed_records(self):
+        """(kind, record) pairs for everything that can appear in the calendar feed."""
+        for kind, store in (("task", self.tasks_data), ("plan", self.plans_data), ("reminder", self.reminders_data)):
+            for record in self.ensure_record_ids(store):
+                yield kind, record
+
+    def export_ics_feed(self):
+        state = self.ics_feed_data.get_user_data(self.current_user) or {}
+        previous = state.get("path", "")
+        path = filedialog.asksaveasfilename(parent=self.dash, title="Export iCalendar Feed",
+                                            initialdir=os.path.dirname(previous) or None,
+                                            initialfile=os.path.basename(previous) or f"{self.current_user}_edumind.ics",
+                                            defaultextension=".ics",
+                                            filetypes=(("iCalendar files", "*.ics"), ("All files", "*.*")))
+        if not path:
+            return
+        try:
+            changed, total = self.ics_feed.export(self.current_user, path, self.calendar_feed_records())
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Failed to write calendar feed: {e}", icon="error")
+            return
+        messagebox.showinfo("Calendar Feed",
+                            f"{total} event(s) in {path} ({changed} updated).\n\n"
+                            "Subscribe to this file in your calendar app. It is refreshed automatically when you log out.",
+                            icon="info")
+
+    def update_ics_feed(self):
+        """Regenerates the user's feed at its last location, re-serializing only changed records."""
+        state = self.ics_feed_data.get_user_data(self.current_user) if self.current_user else None
+        if not state or not state.get("path"):
+            return
+        try:
+            self.ics_feed.export(self.current_user, state["path"], self.calendar_feed_records())
+        except Exception as e:
+            print(f"Error updating calendar feed {state['path']}: {e}")
+
+    # --- Bulk Import ---
+    def bulk_import(self):
+        file_path = filedialog.askopenfilename(
+            parent=self.dash,
+            title="Import Tasks, Plans and Reminders",
+            filetypes=(("CSV or iCalendar", "*.csv *.ics"), ("CSV files", "*.csv"),
+                       ("iCalendar files", "*.ics"), ("All files", "*.*"))
+        )
+        if not file_path:
+            return
+
+        importer = BulkImporter()
+
+        def run():
+            try:
+                importer.import_file(file_path)
+                error = None
+            except Exception as e:
+                error = e
+            self.app.after(0, self.finish_bulk_import, importer, error)
+
+        # Parsing happens off the Tk thread; only the confirmation and commit run on it
+        threading.Thread(target=run, daemon=True).start()
+
+    def finish_bulk_import(self, importer, error):
+        if error:
+            messagebox.showerror("Import Error", f"Failed to read file: {error}", icon="error")
+            return
+
+        summary = (f"Ready to import {len(importer.tasks)} task(s), {len(importer.plans)} plan(s) "
+                   f"and {len(importer.reminders)} reminder(s).")
+        if importer.errors:
+            preview = "\n".join(f"Line {line}: {message}" for line, message in importer.errors[:IMPORT_ERROR_PREVIEW])
+            more = len(importer.errors) - IMPORT_ERROR_PREVIEW
+            if more > 0:
+                preview += f"\n...and {more} more"
+            summary += f"\n\n{len(importer.errors)} row(s) will be skipped:\n{preview}"
+        if importer.count == 0:
+            messagebox.showwarning("Nothing to Import", summary, icon="warning")
+            return
+        if not messagebox.askyesno("Confirm Import", summary + "\n\nImport the valid rows?", icon="question"):
+            return
+
+        self.commit_bulk_records(tasks=importer.tasks, plans=importer.plans, reminders=importer.reminders)
+        messagebox.showinfo("Import Complete", f"Imported {importer.count} item(s).", icon="info")
+
+    def commit_bulk_records(self, tasks=(), plans=(), reminders=()):
+        """Appends records with a single save per collection; open views pick them up in one batch."""
+        for store, records in ((self.tasks_data, tasks), (self.plans_data, plans), (self.reminders_data, reminders)):
+            if records:
+                existing = store.get_user_data(self.current_user, [])
+                existing.extend(records)
+                store.set_user_data(self.current_user, existing)
+
     # --- Feature Implementations ---
 
+    # --- Delta Sync ---
+    def sync_with_folder(self):
+        previous = self.sync_journal.state.get("last_folder", "")
+        folder = filedialog.askdirectory(parent=self.dash, title="Choose a Shared Sync Folder",
+                                         initialdir=previous or None)
+        if folder:
+            self.sync_journal.state["last_folder"] = folder
+            self.run_sync(lambda: DirectoryRemote(folder))
+
+    def sync_with_server(self):
+        previous = self.sync_journal.state.get("last_server", f"{SERVER_DEFAULT_HOST}:{SERVER_DEFAULT_PORT}")
+        answer = self.ask_server_login(previous)
+        if answer is None:
+            return # Cancelled
+        address, password = answer
+        address = address or previous
+        host, _, port = address.rpartition(":")
+        try:
+            port = int(port)
+        except ValueError:
+            messagebox.showerror("Sync Error", "Server address must look like HOST:PORT.", icon="error")
+            return
+        self.sync_journal.state["last_server"] = address
+        username = self.current_user
+
+        def connect():
+            client = StoreClient(host or SERVER_DEFAULT_HOST, port, pool_size=1)
+            try:
+                client.login(username, password) # The server only hands out this user's sync logs
+            except BaseException:
+                client.close()
+                raise
+            return ServerRemote(client)
+        self.run_sync(connect)
+
+    def ask_server_login(self, previous):
+        """Asks for a store server address and the current user's password there. Returns (address, password) or None."""
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Sync with Server")
+        win.geometry("420x300")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+        ctk.CTkLabel(win, text=f"Store server address (HOST:PORT), last used {previous}:", font=FONT_SMALL,
+                     text_color=TEXT_COLOR).pack(pady=(20, 5))
+        address_entry = ctk.CTkEntry(win, placeholder_text=previous, width=300, fg_color="#f3f4f6",
+                                     text_color=TEXT_COLOR, font=FONT_BODY, corner_radius=8)
+        address_entry.pack(pady=5)
+        ctk.CTkLabel(win, text=f"Password of '{self.current_user}' on the server:", font=FONT_SMALL,
+                     text_color=TEXT_COLOR).pack(pady=(10, 5))
+        password_entry = ctk.CTkEntry(win, show="*", width=300, fg_color="#f3f4f6",
+                                      text_color=TEXT_COLOR, font=FONT_BODY, corner_radius=8)
+        password_entry.pack(pady=5)
+        answer = []
+
+        def submit():
+            answer.append((address_entry.get().strip(), password_entry.get()))
+            win.destroy()
+        ctk.CTkButton(win, text="Sync", command=submit, fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).pack(pady=15)
+        password_entry.bind("<Return>", lambda event: submit())
+        win.wait_window()
+        return answer[0] if answer else None
+
+    def run_sync(self, make_remote):
+        """Pull and push for the current user: network and disk I/O on a worker, merging on the Tk thread."""
+        username = self.current_user
+        engine = self.sync_engine
+
+        def fail(error):
+            messagebox.showerror("Sync Error", f"Sync failed: {error}", icon="error")
+
+        def pull():
+            remote = None
+            try:
+                remote = make_remote()
+                positions = engine.journal.remote_state(remote.key, username)["positions"]
+                changes, positions = engine.fetch(remote, username, positions)
+            except Exception as e:
+                if remote is not None:
+                    remote.close() # Its connections and client thread would outlive the failed sync
+                self.app.after(0, lambda e=e: fail(e))
+                return
+            self.app.after(0, lambda: merge(remote, changes, positions))
+
+        def merge(remote, changes, positions):
+            try:
+                received = engine.apply(username, changes)
+                engine.commit(remote.key, username, positions=positions)
+                frames, seq = engine.outgoing(remote.key, username)
+            except Exception:
+                remote.close()
+                raise
+            threading.Thread(target=push, args=(remote, frames, seq, received), daemon=True).start()
+
+        def push(remote, frames, seq, received):
+            try:
+                engine.push(remote, username, frames)
+            except Exception as e:
+                self.app.after(0, lambda e=e: fail(e))
+                return
+            finally:
+                remote.close() # Nothing else is sent to the remote after the push
+            self.app.after(0, lambda: finish(remote, frames, seq, received))
+
+        def finish(remote, frames, seq, received):
+            engine.commit(remote.key, username, pushed=seq)
+            messagebox.showinfo("Sync Complete", f"Received {received} change(s), sent {len(frames)} batch(es).", icon="info")
+
+        threading.Thread(target=pull, daemon=True).start()
+
     # --- Smart Task Tracker ---
     def task_tracker(self):
         win = ctk.CTkToplevel(self.dash)
@@ -615,7 +4679,8 @@ class StudentGuideApp:
                                  command=self.delete_selected_tasks).grid(row=0, column=2, padx=5, sticky="ew")
         # ----------------------------------------------------------------------
 
-        self.refresh_task_list()
+        self.bind_record_list(self.task_scroll_frame, self.tasks_data, self.build_task_row,
+                              "No tasks added yet! Start by adding a new task.")
 
     def add_task(self):
         task = self.task_entry.get().strip()
@@ -631,61 +4696,44 @@ class StudentGuideApp:
                 return
 
         tasks = self.tasks_data.get_user_data(self.current_user, [])
-        tasks.append({"task": task, "due_date": due if due else "No Due Date", "status": "Pending", "created_at": datetime.now().isoformat()})
+        tasks.append(stamp_record({"task": task, "due_date": due if due else "No Due Date", "status": "Pending", "created_at": datetime.now().isoformat()}))
         self.tasks_data.set_user_data(self.current_user, tasks)
         self.task_entry.delete(0, "end")
         self.due_entry.delete(0, "end")
-        self.refresh_task_list()
         messagebox.showinfo("Success", "Task added successfully!", icon="info")
 
-    def refresh_task_list(self):
-        for widget in self.task_scroll_frame.winfo_children():
-            widget.destroy()
-
-        tasks = self.tasks_data.get_user_data(self.current_user, [])
-        if not tasks:
-            ctk.CTkLabel(self.task_scroll_frame, text="No tasks added yet! Start by adding a new task.", text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
-            return
-
-        for i, task_data in enumerate(tasks):
-            task_frame = ctk.CTkFrame(self.task_scroll_frame, fg_color=BG_COLOR, corner_radius=8,
-                                      border_width=1, border_color=SHADOW_COLOR)
-            task_frame.pack(fill="x", pady=5, padx=5)
-            task_frame.grid_columnconfigure(1, weight=1)
-
-            status_color = ACCENT_COLOR_1 if task_data['status'] == "Completed" else ACCENT_COLOR_3 if task_data['status'] == "Pending" else TEXT_COLOR
-
-            checkbox = ctk.CTkCheckBox(task_frame, text="", fg_color=BUTTON_BG_COLOR,
-                                         hover_color=BUTTON_HOVER_COLOR,
-                                         checkmark_color=BUTTON_TEXT_COLOR,
-                                         border_color=BUTTON_BG_COLOR, border_width=2,
-                                         command=lambda idx=i: self.toggle_task_selection(idx))
-            checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
-            if task_data.get('selected_for_action', False):
-                checkbox.select()
-            else:
-                checkbox.deselect()
-
-            task_text = ctk.CTkLabel(task_frame, text=f"{task_data['task']} (Due: {task_data['due_date']})",
-                                     font=FONT_BODY, text_color=TEXT_COLOR)
-            if task_data['status'] == "Completed":
-                # Apply strikethrough and gray out text for completed tasks
-                task_text.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
-            else:
-                # Ensure normal text color and font for pending tasks
-                task_text.configure(text_color=TEXT_COLOR, font=FONT_BODY)
-            task_text.grid(row=0, column=1, sticky="w", padx=(0, 10))
+    def build_task_row(self, parent, task_data):
+        task_frame = ctk.CTkFrame(parent, fg_color=BG_COLOR, corner_radius=8,
+                                  border_width=1, border_color=SHADOW_COLOR)
+        task_frame.grid_columnconfigure(1, weight=1)
+
+        status_color = ACCENT_COLOR_1 if task_data['status'] == "Completed" else ACCENT_COLOR_3 if task_data['status'] == "Pending" else TEXT_COLOR
+
+        checkbox = ctk.CTkCheckBox(task_frame, text="", fg_color=BUTTON_BG_COLOR,
+                                     hover_color=BUTTON_HOVER_COLOR,
+                                     checkmark_color=BUTTON_TEXT_COLOR,
+                                     border_color=BUTTON_BG_COLOR, border_width=2,
+                                     command=lambda record_id=task_data['id']: self.toggle_record_selection(self.tasks_data, record_id))
+        checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
+        if task_data.get('selected_for_action', False):
+            checkbox.select()
+        else:
+            checkbox.deselect()
 
-            status_label = ctk.CTkLabel(task_frame, text=task_data['status'],
-                                         font=FONT_SMALL_BOLD, text_color=status_color)
-            status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+        task_text = ctk.CTkLabel(task_frame, text=f"{task_data['task']} (Due: {task_data['due_date']})",
+                                 font=FONT_BODY, text_color=TEXT_COLOR)
+        if task_data['status'] == "Completed":
+            # Apply strikethrough and gray out text for completed tasks
+            task_text.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
+        else:
+            # Ensure normal text color and font for pending tasks
+            task_text.configure(text_color=TEXT_COLOR, font=FONT_BODY)
+        task_text.grid(row=0, column=1, sticky="w", padx=(0, 10))
 
-    def toggle_task_selection(self, index):
-        tasks = self.tasks_data.get_user_data(self.current_user, [])
-        if 0 <= index < len(tasks):
-            tasks[index]['selected_for_action'] = not tasks[index].get('selected_for_action', False)
-            self.tasks_data.set_user_data(self.current_user, tasks)
-            self.refresh_task_list() # Re-render to update checkbox state
+        status_label = ctk.CTkLabel(task_frame, text=task_data['status'],
+                                     font=FONT_SMALL_BOLD, text_color=status_color)
+        status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+        return task_frame
 
     def delete_selected_tasks(self):
         tasks = self.tasks_data.get_user_data(self.current_user, [])
@@ -702,7 +4750,6 @@ class StudentGuideApp:
             return
 
         self.tasks_data.set_user_data(self.current_user, tasks_to_keep)
-        self.refresh_task_list()
         messagebox.showinfo("Success", f"{deleted_count} task(s) deleted successfully!", icon="info")
 
     def mark_task_complete(self):
@@ -711,6 +4758,7 @@ class StudentGuideApp:
         for task in tasks:
             if task.get('selected_for_action', False) and task['status'] == "Pending":
                 task['status'] = "Completed"
+                stamp_record(task)
                 task['selected_for_action'] = False # Deselect after action
                 marked_count += 1
             elif task.get('selected_for_action', False) and task['status'] == "Completed":
@@ -722,7 +4770,6 @@ class StudentGuideApp:
             return
 
         self.tasks_data.set_user_data(self.current_user, tasks)
-        self.refresh_task_list()
         messagebox.showinfo("Success", f"{marked_count} task(s) marked as complete!", icon="info")
 
     def revert_task_to_pending(self):
@@ -732,6 +4779,7 @@ class StudentGuideApp:
         for task in tasks:
             if task.get('selected_for_action', False) and task['status'] == "Completed":
                 task['status'] = "Pending"
+                stamp_record(task)
                 task['selected_for_action'] = False # Deselect after action
                 reverted_count += 1
             elif task.get('selected_for_action', False) and task['status'] == "Pending":
@@ -743,7 +4791,6 @@ class StudentGuideApp:
             return
 
         self.tasks_data.set_user_data(self.current_user, tasks)
-        self.refresh_task_list()
         messagebox.showinfo("Success", f"{reverted_count} task(s) reverted to pending!", icon="info")
 
 
@@ -796,7 +4843,10 @@ class StudentGuideApp:
 
         ctk.CTkButton(input_frame, text="Add Study Plan", fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
-                                 command=self.add_study_plan).grid(row=6, column=0, columnspan=2, pady=5, sticky="w")
+                                 command=self.add_study_plan).grid(row=6, column=0, pady=5, sticky="w")
+        ctk.CTkButton(input_frame, text="📆 Study Schedule", fg_color=ACCENT_COLOR_5, hover_color=BUTTON_HOVER_COLOR,
+                                 text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                                 command=self.study_schedule).grid(row=6, column=1, padx=(10, 0), pady=5, sticky="e")
 
         ctk.CTkLabel(frame, text="Your Study Plans:", font=("Inter", 18, "bold"), text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
 
@@ -820,7 +4870,8 @@ class StudentGuideApp:
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
                                  command=self.delete_selected_plans).grid(row=0, column=1, padx=5, sticky="ew")
 
-        self.refresh_study_plan_list()
+        self.bind_record_list(self.plan_scroll_frame, self.plans_data, self.build_plan_row,
+                              "No study plans added yet! Start planning your subjects.")
 
     def add_study_plan(self):
         subject = self.subject_entry.get().strip()
@@ -839,63 +4890,46 @@ class StudentGuideApp:
                 return
 
         plans = self.plans_data.get_user_data(self.current_user, [])
-        plans.append({"subject": subject, "topic": topic, "due_date": due_date, "status": status})
+        plans.append(stamp_record({"subject": subject, "topic": topic, "due_date": due_date, "status": status}))
         self.plans_data.set_user_data(self.current_user, plans)
         self.subject_entry.delete(0, "end")
         self.topic_entry.delete(0, "end")
         self.plan_due_entry.delete(0, "end")
         self.plan_status_optionmenu.set("Planned") # Reset status
-        self.refresh_study_plan_list()
         messagebox.showinfo("Success", "Study plan added successfully!", icon="info")
 
-    def refresh_study_plan_list(self):
-        for widget in self.plan_scroll_frame.winfo_children():
-            widget.destroy()
-
-        plans = self.plans_data.get_user_data(self.current_user, [])
-        if not plans:
-            ctk.CTkLabel(self.plan_scroll_frame, text="No study plans added yet! Start planning your subjects.", text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
-            return
-
-        for i, plan_data in enumerate(plans):
-            plan_frame = ctk.CTkFrame(self.plan_scroll_frame, fg_color=BG_COLOR, corner_radius=8,
-                                      border_width=1, border_color=SHADOW_COLOR)
-            plan_frame.pack(fill="x", pady=5, padx=5)
-            plan_frame.grid_columnconfigure(1, weight=1)
-
-            status_color = ACCENT_COLOR_1 if plan_data['status'] == "Completed" else \
-                           ACCENT_COLOR_3 if plan_data['status'] == "In Progress" else \
-                           ACCENT_COLOR_2 # Planned
-
-            checkbox = ctk.CTkCheckBox(plan_frame, text="", fg_color=BUTTON_BG_COLOR,
-                                         hover_color=BUTTON_HOVER_COLOR,
-                                         checkmark_color=BUTTON_TEXT_COLOR,
-                                         border_color=BUTTON_BG_COLOR, border_width=2,
-                                         command=lambda idx=i: self.toggle_plan_selection(idx))
-            checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
-            if plan_data.get('selected_for_action', False):
-                checkbox.select()
-            else:
-                checkbox.deselect()
-
-            plan_text = ctk.CTkLabel(plan_frame, text=f"{plan_data['subject']}: {plan_data['topic']} (Due: {plan_data['due_date']})",
-                                     font=FONT_BODY, text_color=TEXT_COLOR)
-            if plan_data['status'] == "Completed":
-                plan_text.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
-            else:
-                plan_text.configure(text_color=TEXT_COLOR, font=FONT_BODY)
-            plan_text.grid(row=0, column=1, sticky="w", padx=(0, 10))
+    def build_plan_row(self, parent, plan_data):
+        plan_frame = ctk.CTkFrame(parent, fg_color=BG_COLOR, corner_radius=8,
+                                  border_width=1, border_color=SHADOW_COLOR)
+        plan_frame.grid_columnconfigure(1, weight=1)
+
+        status_color = ACCENT_COLOR_1 if plan_data['status'] == "Completed" else \
+                       ACCENT_COLOR_3 if plan_data['status'] == "In Progress" else \
+                       ACCENT_COLOR_2 # Planned
+
+        checkbox = ctk.CTkCheckBox(plan_frame, text="", fg_color=BUTTON_BG_COLOR,
+                                     hover_color=BUTTON_HOVER_COLOR,
+                                     checkmark_color=BUTTON_TEXT_COLOR,
+                                     border_color=BUTTON_BG_COLOR, border_width=2,
+                                     command=lambda record_id=plan_data['id']: self.toggle_record_selection(self.plans_data, record_id))
+        checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
+        if plan_data.get('selected_for_action', False):
+            checkbox.select()
+        else:
+            checkbox.deselect()
 
-            status_label = ctk.CTkLabel(plan_frame, text=plan_data['status'],
-                                         font=FONT_SMALL_BOLD, text_color=status_color)
-            status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+        plan_text = ctk.CTkLabel(plan_frame, text=f"{plan_data['subject']}: {plan_data['topic']} (Due: {plan_data['due_date']})",
+                                 font=FONT_BODY, text_color=TEXT_COLOR)
+        if plan_data['status'] == "Completed":
+            plan_text.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
+        else:
+            plan_text.configure(text_color=TEXT_COLOR, font=FONT_BODY)
+        plan_text.grid(row=0, column=1, sticky="w", padx=(0, 10))
 
-    def toggle_plan_selection(self, index):
-        plans = self.plans_data.get_user_data(self.current_user, [])
-        if 0 <= index < len(plans):
-            plans[index]['selected_for_action'] = not plans[index].get('selected_for_action', False)
-            self.plans_data.set_user_data(self.current_user, plans)
-            self.refresh_study_plan_list()
+        status_label = ctk.CTkLabel(plan_frame, text=plan_data['status'],
+                                     font=FONT_SMALL_BOLD, text_color=status_color)
+        status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+        return plan_frame
 
     def update_selected_plan_status(self):
         plans = self.plans_data.get_user_data(self.current_user, [])
@@ -907,6 +4941,7 @@ class StudentGuideApp:
                 elif plan['status'] == "In Progress":
                     plan['status'] = "Completed"
                 # If already completed, keep it completed.
+                stamp_record(plan)
                 plan['selected_for_action'] = False # Deselect after action
                 selected_plans_count += 1
         
@@ -915,7 +4950,6 @@ class StudentGuideApp:
             return
 
         self.plans_data.set_user_data(self.current_user, plans)
-        self.refresh_study_plan_list()
         messagebox.showinfo("Success", f"{selected_plans_count} plan(s) status updated!", icon="info")
 
     def delete_selected_plans(self):
@@ -928,13 +4962,161 @@ class StudentGuideApp:
             else:
                 deleted_count += 1
 
-        if deleted_count == 0:
-            messagebox.showwarning("No Selection", "Please select plans to delete.", icon="warning")
-            return
+        if deleted_count == 0:
+            messagebox.showwarning("No Selection", "Please select plans to delete.", icon="warning")
+            return
+
+        self.plans_data.set_user_data(self.current_user, plans_to_keep)
+        messagebox.showinfo("Success", f"{deleted_count} plan(s) deleted successfully!", icon="info")
+
+    # --- Study Scheduler ---
+    def study_plan_inputs(self):
+        """{plan_id: [due ordinal or None, Pomodoros still needed]} for every unfinished plan.
+
+        A plan's progress comes from the Study Progress entry named after its topic
+        (or "Subject - Topic") and scales down its estimated number of blocks.
+        """
+        progress = {item["topic"].strip().lower(): item.get("progress", 0)
+                    for item in self.progress_data.get_user_data(self.current_user, [])}
+        inputs = {}
+        for plan in self.ensure_record_ids(self.plans_data):
+            if plan.get("status") == "Completed":
+                continue
+            topic = plan.get("topic", "").strip().lower()
+            percent = progress.get(f"{plan.get('subject', '').strip().lower()} - {topic}", progress.get(topic, 0))
+            blocks = math.ceil(plan.get("estimated_blocks", SCHEDULER_BLOCKS_PER_TOPIC) * (100 - percent) / 100)
+            if blocks <= 0:
+                continue
+            try:
+                due = datetime.strptime(plan["due_date"], "%Y-%m-%d").toordinal() if plan.get("due_date") else None
+            except ValueError:
+                due = None # Malformed dates are scheduled like undated plans
+            inputs[plan["id"]] = [due, blocks]
+        return inputs
+
+    def update_study_schedule(self, capacity=None):
+        """Re-plans incrementally from the first day a plan or progress change affects.
+
+        Runs after every plans/progress change (see __init__); views showing the schedule
+        follow the study_schedule store.
+        """
+        if not self.current_user:
+            return
+        state, _ = self.scheduler.update(self.current_user, self.study_plan_inputs(),
+                                         datetime.now().date(), capacity)
+        self.sync_scheduler_reminders(state)
+
+    def scheduled_blocks(self, start_date, end_date, state=None):
+        """{date: [(start datetime, plan)]} for scheduled Pomodoros in [start_date, end_date)."""
+        state = state or self.study_schedule_data.get_user_data(self.current_user) or {}
+        if not state.get("days"):
+            return {}
+        plans = {plan.get("id"): plan for plan in self.plans_data.get_user_data(self.current_user, [])}
+        first = datetime.strptime(state["start"], "%Y-%m-%d").date()
+        result = {}
+        for index in range(max(0, (start_date - first).days), min(len(state["days"]), (end_date - first).days)):
+            day = first + timedelta(days=index)
+            blocks = [plans[pid] for pid in state["days"][index][0] if pid in plans]
+            if blocks:
+                result[day] = list(zip(StudyScheduler.block_times(len(blocks), day), blocks))
+        return result
+
+    def sync_scheduler_reminders(self, state):
+        """Keeps one "scheduler" reminder per upcoming study day. Saves only if something changed."""
+        today = datetime.now().date()
+        upcoming = self.scheduled_blocks(today, today + timedelta(days=SCHEDULER_REMINDER_DAYS), state)
+        reminders = self.reminders_data.get_user_data(self.current_user, [])
+        existing = {r["datetime"][:10]: r for r in reminders if r.get("source") == "scheduler"}
+        kept, changed = [], False
+        for reminder in reminders:
+            if reminder.get("source") != "scheduler":
+                kept.append(reminder)
+                continue
+            day = datetime.fromisoformat(reminder["datetime"]).date()
+            if day in upcoming or (day == today and reminder["status"] == "dismissed"):
+                kept.append(reminder) # Keep today's dismissed reminder so it does not fire again
+            else:
+                changed = True
+        for day, blocks in sorted(upcoming.items()):
+            topics = ", ".join(dict.fromkeys(f"{plan['subject']}: {plan['topic']}" for _, plan in blocks))
+            message = f"Study time: {len(blocks)} Pomodoro(s) - {topics}"
+            start = blocks[0][0].isoformat()
+            reminder = existing.get(day.isoformat())
+            if reminder is None:
+                if blocks[0][0] > datetime.now():
+                    kept.append(stamp_record({"message": message, "datetime": start, "status": "active",
+                                              "recurrence": None, "source": "scheduler"}))
+                    changed = True
+            elif reminder["status"] == "active" and (reminder["message"], reminder["datetime"]) != (message, start):
+                reminder.update(message=message, datetime=start)
+                stamp_record(reminder)
+                changed = True
+        if changed:
+            self.reminders_data.set_user_data(self.current_user, kept)
+
+    def study_schedule(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Study Schedule")
+        win.geometry("700x700")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="📆 Study Schedule", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 5))
+        ctk.CTkLabel(frame, text="Pomodoros are assigned to the nearest deadlines first, most remaining work first.",
+                     font=FONT_SMALL, text_color=TEXT_COLOR).pack(pady=(0, 10))
+
+        capacity_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        capacity_frame.pack(pady=5)
+        ctk.CTkLabel(capacity_frame, text="Pomodoros per day:", font=FONT_BODY,
+                     text_color=TEXT_COLOR).pack(side="left", padx=(0, 10))
+        state = self.study_schedule_data.get_user_data(self.current_user) or {}
+        capacity_menu = ctk.CTkOptionMenu(capacity_frame, values=SCHEDULER_CAPACITY_OPTIONS, width=80,
+                                          command=lambda value: self.update_study_schedule(int(value)),
+                                          fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                          text_color=BUTTON_TEXT_COLOR, dropdown_fg_color=BUTTON_HOVER_COLOR)
+        capacity_menu.set(str(state.get("capacity", SCHEDULER_DEFAULT_CAPACITY)))
+        capacity_menu.pack(side="left")
+
+        self.schedule_warning_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL_BOLD,
+                                                   text_color=ACCENT_COLOR_4, wraplength=600)
+        self.schedule_warning_label.pack(pady=5)
+
+        self.schedule_scroll_frame = ctk.CTkScrollableFrame(frame, fg_color=BG_COLOR, corner_radius=10,
+                                                            border_color=SHADOW_COLOR, border_width=1)
+        self.schedule_scroll_frame.pack(fill="both", expand=True, padx=15, pady=(5, 15))
+
+        self.update_study_schedule()
+        self.refresh_study_schedule()
+        self.watch(self.schedule_scroll_frame, ("study_schedule", "plans"), lambda events: self.refresh_study_schedule())
+
+    def refresh_study_schedule(self):
+        for widget in self.schedule_scroll_frame.winfo_children():
+            widget.destroy()
 
-        self.plans_data.set_user_data(self.current_user, plans_to_keep)
-        self.refresh_study_plan_list()
-        messagebox.showinfo("Success", f"{deleted_count} plan(s) deleted successfully!", icon="info")
+        state = self.study_schedule_data.get_user_data(self.current_user) or {}
+        today = datetime.now().date()
+        days = self.scheduled_blocks(today, today + timedelta(days=SCHEDULER_HORIZON_DAYS), state)
+        if not days:
+            ctk.CTkLabel(self.schedule_scroll_frame, text="Nothing to schedule. Add study plans with due dates to get started.",
+                         text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
+
+        plans = {plan.get("id"): plan for plan in self.plans_data.get_user_data(self.current_user, [])}
+        late = [f"{plans[pid]['subject']}: {plans[pid]['topic']}" for pid in StudyScheduler.late_plans(state) if pid in plans]
+        self.schedule_warning_label.configure(
+            text=f"⚠️ Not enough time before the due date for: {', '.join(sorted(late))}" if late else "")
+
+        for day, blocks in sorted(days.items()):
+            ctk.CTkLabel(self.schedule_scroll_frame, text=day.strftime("%A, %Y-%m-%d"), font=FONT_SMALL_BOLD,
+                         text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=(10, 2))
+            for start, plan in blocks:
+                ctk.CTkLabel(self.schedule_scroll_frame, text=f"{start.strftime('%H:%M')}  {plan['subject']}: {plan['topic']}",
+                             font=FONT_SMALL, text_color=TEXT_COLOR).pack(anchor="w", padx=25)
 
     # Doubt Notebook
     def doubt_notebook(self):
@@ -1000,19 +5182,27 @@ class StudentGuideApp:
         
         btn_frame = ctk.CTkFrame(frame, fg_color=BG_COLOR)
         btn_frame.pack(pady=(5, 15), fill="x", padx=15)
-        btn_frame.grid_columnconfigure((0, 1, 2), weight=1) # Added 3rd column
+        btn_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
 
         ctk.CTkButton(btn_frame, text="Update Status", fg_color=ACCENT_COLOR_2, hover_color="#42A5F5", # Reverted hover
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
                                  command=self.update_selected_doubt_status).grid(row=0, column=0, padx=5, sticky="ew")
-        ctk.CTkButton(btn_frame, text="Save Selected to File", fg_color=ACCENT_COLOR_1, hover_color="#5cb85c",
+        ctk.CTkButton(btn_frame, text="Export Doubts", fg_color=ACCENT_COLOR_1, hover_color="#5cb85c",
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
-                                 command=self.save_selected_doubt_to_file).grid(row=0, column=1, padx=5, sticky="ew")
+                                 command=self.export_doubts_window).grid(row=0, column=1, padx=5, sticky="ew")
+        ctk.CTkButton(btn_frame, text="Import Doubts", fg_color=ACCENT_COLOR_5, hover_color=BUTTON_HOVER_COLOR,
+                                 text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                                 command=self.import_doubts_window).grid(row=0, column=2, padx=5, sticky="ew")
         ctk.CTkButton(btn_frame, text="Delete Selected", fg_color=ACCENT_COLOR_4, hover_color="#dc3545", # Reverted hover
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
-                                 command=self.delete_selected_doubts).grid(row=0, column=2, padx=5, sticky="ew")
+                                 command=self.delete_selected_doubts).grid(row=0, column=3, padx=5, sticky="ew")
+        ctk.CTkButton(btn_frame, text="Merge Duplicates", fg_color=ACCENT_COLOR_3, hover_color="#FFB74D",
+                                 text_color=HEADER_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                                 command=self.merge_duplicate_doubts).grid(row=1, column=0, columnspan=4, pady=(8, 0))
 
-        self.refresh_doubt_list()
+        self.externalize_doubt_descriptions()
+        self.bind_record_list(self.doubt_scroll_frame, self.doubts_data, self.build_doubt_row,
+                              "No doubts added yet! Record your questions here.")
 
     def add_doubt(self):
         title = self.doubt_title_entry.get().strip()
@@ -1023,13 +5213,24 @@ class StudentGuideApp:
             messagebox.showerror("Input Error", "Doubt title and description cannot be empty.", icon="error")
             return
 
+        doubt = {"title": title, "description": description, "status": status}
+        signature = ensure_doubt_signature(doubt)
+        matches = self.doubt_duplicate_index().query(signature)
         doubts = self.doubts_data.get_user_data(self.current_user, [])
-        doubts.append({"title": title, "description": description, "status": status})
+        if matches:
+            similarity, record_id = matches[0]
+            existing = next((d for d in doubts if d.get('id') == record_id), None)
+            if existing and not messagebox.askyesno(
+                    "Possible Duplicate",
+                    f"This looks like a doubt you already have ({similarity:.0%} similar):\n\n"
+                    f"'{existing['title']}' ({existing['status']})\n\nAdd it anyway?", icon="warning"):
+                return
+        externalize_doubt(doubt, self.doubt_bodies) # Only once confirmed, so a cancelled add leaves no body behind
+        doubts.append(doubt)
         self.doubts_data.set_user_data(self.current_user, doubts)
         self.doubt_title_entry.delete(0, "end")
         self.doubt_desc_textbox.delete("1.0", "end")
         self.doubt_status_optionmenu.set("Unresolved")
-        self.refresh_doubt_list()
         messagebox.showinfo("Success", "Doubt added successfully!", icon="info")
         
     def load_doubt_from_file(self):
@@ -1042,95 +5243,372 @@ class StudentGuideApp:
             try:
                 with open(file_path, "r", encoding="utf-8") as f:
                     content = f.read()
-                # Assuming the file format is Title\nDescription
-                lines = content.split('\n', 1)
-                title = lines[0].replace("Title: ", "").strip() if lines else ""
-                description = lines[1].replace("Description: ", "").strip() if len(lines) > 1 else ""
+                doubt = parse_doubt_text(content) or {"title": "", "description": content.strip(), "status": "Unresolved"}
 
                 self.doubt_title_entry.delete(0, "end")
-                self.doubt_title_entry.insert(0, title)
+                self.doubt_title_entry.insert(0, doubt["title"])
                 self.doubt_desc_textbox.delete("1.0", "end")
-                self.doubt_desc_textbox.insert("1.0", description)
-                self.doubt_status_optionmenu.set("Unresolved") # Default status on load
+                self.doubt_desc_textbox.insert("1.0", doubt["description"])
+                self.doubt_status_optionmenu.set(doubt["status"])
                 messagebox.showinfo("File Loaded", "Doubt loaded from file. You can now add it.", icon="info")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file: {e}", icon="error")
 
-    def save_selected_doubt_to_file(self):
+    def doubt_text(self, doubt):
+        """The doubt's description, read from the body store if it is out of line."""
+        return doubt_description(doubt, self.doubt_bodies)
+
+    def doubt_signature(self, doubt):
+        if "minhash" in doubt or "description" in doubt:
+            return ensure_doubt_signature(doubt)
+        return ensure_doubt_signature(doubt, self.doubt_text(doubt)) # Only read the body when there is no signature
+
+    def externalize_doubt_descriptions(self):
+        """Moves long descriptions saved inline (older notebooks, imports from a server) out of line."""
+        if self.doubt_bodies is None:
+            return
+        doubts = self.doubts_data.get_user_data(self.current_user, [])
+        long_inline = [doubt for doubt in doubts if len(doubt.get("description") or "") > DOUBT_INLINE_CHARS]
+        for doubt in long_inline:
+            externalize_doubt(doubt, self.doubt_bodies)
+        if long_inline:
+            self.doubts_data.set_user_data(self.current_user, doubts) # One save for the whole notebook
+
+    def collect_doubt_bodies(self):
+        """Deletes description bodies no user's doubt refers to any more."""
+        if self.doubt_bodies is None:
+            return
+        live = {doubt["description_ref"] for doubts in self.doubts_data.data.values() if isinstance(doubts, list)
+                for doubt in doubts if isinstance(doubt, dict) and doubt.get("description_ref")}
+        self.doubt_bodies.collect_garbage(live)
+
+    def doubt_duplicate_index(self):
+        """The MinHash index of the current user's doubts; doubts saved without a signature get one."""
+        if self.doubt_index is None or self.doubt_index_user != self.current_user:
+            doubts = self.ensure_record_ids(self.doubts_data)
+            missing = [doubt for doubt in doubts if "minhash" not in doubt]
+            index = MinHashIndex()
+            for doubt in doubts:
+                index.add(doubt["id"], self.doubt_signature(doubt))
+            if missing:
+                self.doubts_data.set_user_data(self.current_user, doubts) # Store the new signatures once
+            self.doubt_index, self.doubt_index_user = index, self.current_user
+        return self.doubt_index
+
+    def update_doubt_index(self, events):
+        if self.doubt_index is None or self.doubt_index_user != self.current_user:
+            return # Built fresh on next use
+        if any(event.kind == "replaced" for event in events):
+            self.doubt_index = None
+            return
+        by_id = None
+        for event in events:
+            if event.kind == "removed":
+                self.doubt_index.remove(event.record_id)
+            elif event.kind in ("added", "updated"):
+                if by_id is None:
+                    by_id = {doubt.get("id"): doubt for doubt in self.doubts_data.get_user_data(self.current_user, [])}
+                if event.record_id in by_id:
+                    self.doubt_index.add(event.record_id, self.doubt_signature(by_id[event.record_id]))
+
+    def merge_duplicate_doubts(self):
+        groups = self.doubt_duplicate_index().duplicate_groups()
         doubts = self.doubts_data.get_user_data(self.current_user, [])
-        selected_doubts = [d for d in doubts if d.get('selected_for_action', False)]
+        position = {doubt.get("id"): index for index, doubt in enumerate(doubts)}
+        groups = [sorted((record_id for record_id in group if record_id in position), key=position.get) for group in groups]
+        groups = [group for group in groups if len(group) > 1]
+        if not groups:
+            messagebox.showinfo("No Duplicates", "No near-duplicate doubts were found.", icon="info")
+            return
 
-        if not selected_doubts:
-            messagebox.showwarning("No Selection", "Please select at least one doubt to save.", icon="warning")
+        preview = "\n".join(" / ".join(doubts[position[record_id]]["title"] for record_id in group[:3])
+                            + (" / ..." if len(group) > 3 else "") for group in groups[:IMPORT_ERROR_PREVIEW])
+        more = f"\n...and {len(groups) - IMPORT_ERROR_PREVIEW} more" if len(groups) > IMPORT_ERROR_PREVIEW else ""
+        if not messagebox.askyesno("Merge Duplicates",
+                                   f"Found {len(groups)} group(s) of similar doubts:\n\n{preview}{more}\n\n"
+                                   "Merge each group into its oldest doubt? Other descriptions are appended to it.",
+                                   icon="question"):
             return
 
-        for doubt in selected_doubts:
-            # Create a filename from the doubt title, sanitizing it
-            filename_safe_title = "".join([c if c.isalnum() else "_" for c in doubt['title']]).strip("_")
-            if not filename_safe_title:
-                filename_safe_title = f"doubt_{uuid.uuid4().hex[:8]}" # Fallback
-            file_path = os.path.join(self.doubt_folder, f"{filename_safe_title}.txt")
-            
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(f"Title: {doubt['title']}\n")
-                    f.write(f"Description: {doubt['description']}\n")
-                    f.write(f"Status: {doubt['status']}\n")
-                doubt['selected_for_action'] = False # Deselect after saving
-                messagebox.showinfo("Saved", f"Doubt '{doubt['title']}' saved to {file_path}", icon="info")
-            except Exception as e:
-                messagebox.showerror("Save Error", f"Failed to save doubt '{doubt['title']}': {e}", icon="error")
-        self.refresh_doubt_list() # Refresh to clear checkboxes
+        merged, merged_groups, unreadable = set(), 0, 0
+        for group in groups:
+            members = [doubts[position[record_id]] for record_id in group]
+            texts = [inline_doubt(doubt, self.doubt_bodies).get("description") for doubt in members]
+            if None in texts: # A body is missing from this machine; merging would lose it
+                unreadable += 1
+                continue
+            keep, *others = members
+            description = texts[0]
+            for other, other_description in zip(others, texts[1:]):
+                other_description = other_description.strip()
+                if other_description not in description:
+                    description += f"\n\n---\n{other_description}"
+                if other["status"] == "Resolved":
+                    keep["status"] = "Resolved" # Answered in one of its copies
+                merged.add(other["id"])
+            keep.pop("description_ref", None)
+            keep["description"] = description
+            keep.pop("minhash", None) # The text changed
+            ensure_doubt_signature(keep)
+            stamp_record(externalize_doubt(keep, self.doubt_bodies))
+            merged_groups += 1
+        if merged:
+            self.doubts_data.set_user_data(self.current_user, [doubt for doubt in doubts if doubt.get("id") not in merged])
+            self.collect_doubt_bodies()
+        skipped = (f"\n\nSkipped {unreadable} group(s) with a description that is not on this computer."
+                   if unreadable else "")
+        messagebox.showinfo("Success", f"Merged {len(merged)} duplicate doubt(s) into {merged_groups}.{skipped}", icon="info")
+
+    def export_doubts_window(self):
+        doubts = self.doubts_data.get_user_data(self.current_user, [])
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Export Doubts")
+        win.geometry("450x360")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
 
-    def refresh_doubt_list(self):
-        for widget in self.doubt_scroll_frame.winfo_children():
-            widget.destroy()
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
 
-        doubts = self.doubts_data.get_user_data(self.current_user, [])
-        if not doubts:
-            ctk.CTkLabel(self.doubt_scroll_frame, text="No doubts added yet! Record your questions here.", text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
+        ctk.CTkLabel(frame, text="📤 Export Doubts", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
+
+        selected_count = sum(1 for doubt in doubts if doubt.get('selected_for_action', False))
+        scope_menu = ctk.CTkOptionMenu(frame, values=[f"Selected doubts ({selected_count})", f"All doubts ({len(doubts)})"],
+                                       fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                       text_color=BUTTON_TEXT_COLOR, dropdown_fg_color=BUTTON_HOVER_COLOR)
+        scope_menu.set(scope_menu.cget("values")[0 if selected_count else 1])
+        scope_menu.pack(pady=(0, 10))
+        format_menu = ctk.CTkOptionMenu(frame, values=list(DOUBT_ARCHIVE_FORMATS),
+                                        fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                        text_color=BUTTON_TEXT_COLOR, dropdown_fg_color=BUTTON_HOVER_COLOR)
+        format_menu.set("Zip of text files")
+        format_menu.pack(pady=(0, 10))
+
+        progress_bar = ctk.CTkProgressBar(frame, width=300, progress_color=ACCENT_COLOR_1)
+        progress_bar.set(0)
+        progress_bar.pack(pady=(0, 5))
+        status_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        status_label.pack()
+
+        cancel_event = threading.Event()
+        export_button = ctk.CTkButton(frame, text="Export", fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                                      command=lambda: self.start_doubt_export(win, scope_menu.get().startswith("Selected"),
+                                                                              format_menu.get(), progress_bar, status_label,
+                                                                              export_button, cancel_event))
+        export_button.pack(pady=10)
+
+        def close():
+            cancel_event.set() # Stops a running export at the next doubt
+            win.destroy()
+        win.protocol("WM_DELETE_WINDOW", close)
+
+    def start_doubt_export(self, win, selected_only, fmt, progress_bar, status_label, export_button, cancel_event):
+        chosen = [doubt for doubt in self.doubts_data.get_user_data(self.current_user, [])
+                  if doubt.get('selected_for_action', False) or not selected_only]
+        if not chosen:
+            messagebox.showwarning("No Selection", "Please select at least one doubt to export.", icon="warning")
             return
+        extension = DOUBT_ARCHIVE_FORMATS[fmt]
+        path = filedialog.asksaveasfilename(parent=win, title="Export Doubts", initialdir=self.doubt_folder,
+                                            initialfile=f"{self.current_user}_doubts{extension}",
+                                            defaultextension=extension,
+                                            filetypes=((fmt, f"*{extension}"), ("All files", "*.*")))
+        if not path:
+            return
+        # Copies without UI-only fields, so the worker never sees later edits; it loads long descriptions itself
+        records = [{key: value for key, value in doubt.items() if key not in EXPORT_PRIVATE_FIELDS} for doubt in chosen]
+        bodies = self.doubt_bodies
+
+        def show_progress(done, total):
+            if win.winfo_exists():
+                progress_bar.set(done / max(total, 1))
+                status_label.configure(text=f"{done} / {total} doubts")
+
+        skipped = [] # Titles of doubts whose description is not on this machine
+        exported = set() # Ids of the doubts handed to the archive
+
+        def readable():
+            """The doubts with their descriptions inline, one body read at a time."""
+            for doubt in records:
+                doubt = inline_doubt(doubt, bodies)
+                if "description" not in doubt:
+                    skipped.append(doubt["title"]) # Archives are imported again, so a missing body is left out, not replaced
+                    continue
+                exported.add(doubt.get('id'))
+                yield doubt
+
+        def run():
+            try:
+                count = write_doubt_archive(path, readable(), fmt, cancel_event=cancel_event, total=len(records),
+                                            progress_callback=lambda done, total: self.app.after(0, show_progress, done, total))
+                error = None
+            except Exception as e:
+                count, error = 0, e
+            if (cancel_event.is_set() or error) and os.path.exists(path):
+                os.remove(path) # Don't leave a half-written archive behind
+            self.app.after(0, finish, count, error)
+
+        def finish(count, error):
+            if win.winfo_exists():
+                export_button.configure(state="normal")
+            if cancel_event.is_set():
+                return
+            if error:
+                messagebox.showerror("Export Error", f"Failed to export doubts: {error}", icon="error")
+                return
+            if selected_only: # Skipped doubts stay selected
+                current = self.doubts_data.get_user_data(self.current_user, [])
+                for doubt in current:
+                    if doubt.get('id') in exported:
+                        doubt['selected_for_action'] = False # Deselect after saving
+                self.doubts_data.set_user_data(self.current_user, current)
+            if win.winfo_exists():
+                progress_bar.set(1) # Skipped doubts never reach the total
+                status_label.configure(text=f"Exported {count} doubts.")
+            note = ""
+            if skipped:
+                titles = ", ".join(skipped[:IMPORT_ERROR_PREVIEW]) + (", ..." if len(skipped) > IMPORT_ERROR_PREVIEW else "")
+                note = f"\n\nSkipped {len(skipped)} doubt(s) whose description is not on this computer: {titles}"
+            messagebox.showinfo("Export Complete", f"Exported {count} doubt(s) to {path}{note}", icon="info")
+
+        export_button.configure(state="disabled")
+        status_label.configure(text="Exporting...")
+        threading.Thread(target=run, daemon=True).start()
+
+    def import_doubts_window(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Import Doubts")
+        win.geometry("450x340")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
 
-        for i, doubt_data in enumerate(doubts):
-            doubt_frame = ctk.CTkFrame(self.doubt_scroll_frame, fg_color=BG_COLOR, corner_radius=8,
-                                       border_width=1, border_color=SHADOW_COLOR)
-            doubt_frame.pack(fill="x", pady=5, padx=5)
-            doubt_frame.grid_columnconfigure(1, weight=1)
-
-            status_color = ACCENT_COLOR_1 if doubt_data['status'] == "Resolved" else ACCENT_COLOR_4
-
-            checkbox = ctk.CTkCheckBox(doubt_frame, text="", fg_color=BUTTON_BG_COLOR,
-                                         hover_color=BUTTON_HOVER_COLOR,
-                                         checkmark_color=BUTTON_TEXT_COLOR,
-                                         border_color=BUTTON_BG_COLOR, border_width=2,
-                                         command=lambda idx=i: self.toggle_doubt_selection(idx))
-            checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
-            if doubt_data.get('selected_for_action', False):
-                checkbox.select()
-            else:
-                checkbox.deselect()
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
 
-            title_label = ctk.CTkLabel(doubt_frame, text=doubt_data['title'],
-                                       font=FONT_BODY, text_color=TEXT_COLOR)
-            if doubt_data['status'] == "Resolved":
-                title_label.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
+        ctk.CTkLabel(frame, text="📥 Import Doubts", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
+        ctk.CTkLabel(frame, text="A doubts export (.zip or .jsonl), a single .txt doubt,\nor a folder of .txt doubt files.",
+                     font=FONT_SMALL, text_color=TEXT_COLOR).pack(pady=(0, 10))
+
+        progress_bar = ctk.CTkProgressBar(frame, width=300, progress_color=ACCENT_COLOR_1)
+        progress_bar.set(0)
+        status_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        buttons = ctk.CTkFrame(frame, fg_color=CARD_BG_COLOR)
+        buttons.pack(pady=(0, 10))
+
+        def choose(folder):
+            if folder:
+                path = filedialog.askdirectory(parent=win, title="Select Doubt Folder", initialdir=self.doubt_folder)
             else:
-                title_label.configure(text_color=TEXT_COLOR, font=FONT_BODY)
-            title_label.grid(row=0, column=1, sticky="w", padx=(0, 10))
-            
-            status_label = ctk.CTkLabel(doubt_frame, text=doubt_data['status'],
-                                         font=FONT_SMALL_BOLD, text_color=status_color)
-            status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
-            
-            # Add a button to view description
-            view_button = ctk.CTkButton(doubt_frame, text="View", width=60,
-                                        fg_color=ACCENT_COLOR_2, hover_color="#42A5F5", # Reverted hover
-                                        text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=8,
-                                        command=lambda desc=doubt_data['description'], title=doubt_data['title']: self.show_doubt_description(title, desc))
-            view_button.grid(row=0, column=3, padx=(0, 10), sticky="e")
-
+                path = filedialog.askopenfilename(parent=win, title="Select Doubt Archive", initialdir=self.doubt_folder,
+                                                  filetypes=(("Doubt archives", "*.zip *.jsonl *.ndjson *.txt"),
+                                                             ("All files", "*.*")))
+            if path:
+                self.start_doubt_import(win, path, progress_bar, status_label, buttons)
+
+        for text, folder in (("From File...", False), ("From Folder...", True)):
+            ctk.CTkButton(buttons, text=text, fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                          text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10, width=150,
+                          command=lambda folder=folder: choose(folder)).pack(side="left", padx=5)
+        progress_bar.pack(pady=(10, 5))
+        status_label.pack()
+
+    def start_doubt_import(self, win, path, progress_bar, status_label, buttons):
+        def show_progress(done, total):
+            if win.winfo_exists():
+                progress_bar.set(done / max(total, 1))
+                status_label.configure(text=f"Read {done} / {total} files")
+
+        def run():
+            try:
+                doubts, errors, files = read_doubt_files(
+                    path, progress_callback=lambda done, total: self.app.after(0, show_progress, done, total))
+                error = None
+            except Exception as e:
+                doubts, errors, files, error = [], [], 0, e
+            self.app.after(0, finish, doubts, errors, files, error)
+
+        def finish(doubts, errors, files, error):
+            if win.winfo_exists():
+                progress_bar.set(1 if error is None else 0)
+                for button in buttons.winfo_children():
+                    button.configure(state="normal")
+            if error:
+                messagebox.showerror("Import Error", f"Failed to read {path}: {error}", icon="error")
+                return
+            existing = self.doubts_data.get_user_data(self.current_user, [])
+            added, duplicates = merge_doubts(existing, doubts, self.doubt_bodies)
+            if added:
+                self.doubts_data.set_user_data(self.current_user, existing) # One save for the whole import
+            summary = f"Imported {added} doubt(s) from {files} file(s)."
+            if duplicates:
+                summary += f"\n{duplicates} already in your notebook were skipped."
+            if errors:
+                preview = "\n".join(f"{name}: {message}" for name, message in errors[:IMPORT_ERROR_PREVIEW])
+                more = f"\n...and {len(errors) - IMPORT_ERROR_PREVIEW} more" if len(errors) > IMPORT_ERROR_PREVIEW else ""
+                summary += f"\n\n{len(errors)} could not be read:\n{preview}{more}"
+            if win.winfo_exists():
+                status_label.configure(text=f"Imported {added} doubt(s).")
+            messagebox.showinfo("Import Complete", summary, icon="info")
+
+        for button in buttons.winfo_children():
+            button.configure(state="disabled")
+        status_label.configure(text="Reading doubts...")
+        threading.Thread(target=run, daemon=True).start()
+
+    def build_doubt_row(self, parent, doubt_data):
+        doubt_frame = ctk.CTkFrame(parent, fg_color=BG_COLOR, corner_radius=8,
+                                   border_width=1, border_color=SHADOW_COLOR)
+        doubt_frame.grid_columnconfigure(1, weight=1)
+
+        status_color = ACCENT_COLOR_1 if doubt_data['status'] == "Resolved" else ACCENT_COLOR_4
+
+        checkbox = ctk.CTkCheckBox(doubt_frame, text="", fg_color=BUTTON_BG_COLOR,
+                                     hover_color=BUTTON_HOVER_COLOR,
+                                     checkmark_color=BUTTON_TEXT_COLOR,
+                                     border_color=BUTTON_BG_COLOR, border_width=2,
+                                     command=lambda record_id=doubt_data['id']: self.toggle_record_selection(self.doubts_data, record_id))
+        checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
+        if doubt_data.get('selected_for_action', False):
+            checkbox.select()
+        else:
+            checkbox.deselect()
 
-    def show_doubt_description(self, title, description):
+        title_label = ctk.CTkLabel(doubt_frame, text=doubt_data['title'],
+                                   font=FONT_BODY, text_color=TEXT_COLOR)
+        if doubt_data['status'] == "Resolved":
+            title_label.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
+        else:
+            title_label.configure(text_color=TEXT_COLOR, font=FONT_BODY)
+        title_label.grid(row=0, column=1, sticky="w", padx=(0, 10))
+        
+        status_label = ctk.CTkLabel(doubt_frame, text=doubt_data['status'],
+                                     font=FONT_SMALL_BOLD, text_color=status_color)
+        status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+        
+        # Add a button to view description
+        view_button = ctk.CTkButton(doubt_frame, text="View", width=60,
+                                    fg_color=ACCENT_COLOR_2, hover_color="#42A5F5", # Reverted hover
+                                    text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=8,
+                                    command=lambda record_id=doubt_data['id']: self.show_doubt_description(record_id))
+        view_button.grid(row=0, column=3, padx=(0, 10), sticky="e")
+        return doubt_frame
+
+
+    def show_doubt_description(self, record_id):
+        doubt = next((d for d in self.doubts_data.get_user_data(self.current_user, []) if d.get('id') == record_id), None)
+        if doubt is None:
+            return
+        title = doubt['title']
+        description = self.doubt_text(doubt) # Loaded only now, for this one doubt
+        if not description and doubt.get('description_ref'):
+            description = "(This description is not available on this computer.)"
         desc_win = ctk.CTkToplevel(self.dash)
         desc_win.title(f"Doubt: {title}")
         desc_win.geometry("500x300")
@@ -1139,21 +5617,17 @@ class StudentGuideApp:
         desc_win.grab_set()
 
         ctk.CTkLabel(desc_win, text=f"Title: {title}", font=FONT_MEDIUM, text_color=HEADER_TEXT_COLOR).pack(pady=(15, 10))
-        description_label = ctk.CTkLabel(desc_win, text=description, font=FONT_BODY, text_color=TEXT_COLOR, wraplength=450, justify="left")
-        description_label.pack(padx=20, pady=(0, 15))
+        description_box = ctk.CTkTextbox(desc_win, font=FONT_BODY, text_color=TEXT_COLOR, fg_color=CARD_BG_COLOR,
+                                         wrap="word", corner_radius=8)
+        description_box.insert("1.0", description)
+        description_box.configure(state="disabled") # Read-only, but long text scrolls
+        description_box.pack(padx=20, pady=(0, 15), fill="both", expand=True)
         
         ctk.CTkButton(desc_win, text="Close", command=desc_win.destroy,
                       fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
                       text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).pack(pady=10)
 
 
-    def toggle_doubt_selection(self, index):
-        doubts = self.doubts_data.get_user_data(self.current_user, [])
-        if 0 <= index < len(doubts):
-            doubts[index]['selected_for_action'] = not doubts[index].get('selected_for_action', False)
-            self.doubts_data.set_user_data(self.current_user, doubts)
-            self.refresh_doubt_list()
-
     def update_selected_doubt_status(self):
         doubts = self.doubts_data.get_user_data(self.current_user, [])
         updated_count = 0
@@ -1170,7 +5644,6 @@ class StudentGuideApp:
             return
 
         self.doubts_data.set_user_data(self.current_user, doubts)
-        self.refresh_doubt_list()
         messagebox.showinfo("Success", f"{updated_count} doubt(s) status updated!", icon="info")
 
     def delete_selected_doubts(self):
@@ -1188,10 +5661,189 @@ class StudentGuideApp:
             return
 
         self.doubts_data.set_user_data(self.current_user, doubts_to_keep)
-        self.refresh_doubt_list()
+        self.collect_doubt_bodies()
         messagebox.showinfo("Success", f"{deleted_count} doubt(s) deleted successfully!", icon="info")
 
 
+    # Spaced Repetition
+    def review_stores(self):
+        return {"doubts": self.doubts_data, "progress": self.progress_data}
+
+    def spaced_review_queue(self):
+        """The current user's review queue, built on first use and kept in step by update_review_queue."""
+        if self.review_queue is None or self.review_queue_user != self.current_user:
+            items = []
+            for collection, store in self.review_stores().items():
+                records = self.ensure_record_ids(store)
+                self.review_positions[collection] = {record["id"]: position for position, record in enumerate(records)}
+                for record in records:
+                    due = review_due(collection, record)
+                    if due is not None:
+                        items.append((f"{collection}/{record['id']}", due))
+            self.review_queue, self.review_queue_user = ReviewQueue(items), self.current_user
+        return self.review_queue
+
+    def review_record(self, key):
+        """(the user's records, the queued item among them) for a review queue key; the item is None if it is gone.
+
+        Looked up by position; a position the change events have not caught up with costs one scan.
+        """
+        collection, record_id = key.split("/", 1)
+        records = self.review_stores()[collection].get_user_data(self.current_user, [])
+        positions = self.review_positions.setdefault(collection, {})
+        position = positions.get(record_id)
+        if position is None or position >= len(records) or records[position].get("id") != record_id:
+            positions.clear()
+            positions.update((record.get("id"), position) for position, record in enumerate(records))
+            position = positions.get(record_id)
+        return records, None if position is None else records[position]
+
+    def update_review_queue(self, events):
+        if self.review_queue is None or self.review_queue_user != self.current_user:
+            return # Built fresh on next use
+        if any(event.kind == "replaced" for event in events):
+            self.review_queue = None
+        else:
+            records = {}
+            for event in events:
+                key = f"{event.collection}/{event.record_id}"
+                if event.kind in ("added", "updated", "removed") and event.collection not in records:
+                    # Adds and removes shift positions, so the collection's are refreshed once per batch
+                    records[event.collection] = self.review_stores()[event.collection].get_user_data(self.current_user, [])
+                    self.review_positions[event.collection] = {record.get("id"): position for position, record
+                                                               in enumerate(records[event.collection])}
+                if event.kind == "removed":
+                    self.review_queue.remove(key)
+                elif event.kind in ("added", "updated"):
+                    position = self.review_positions[event.collection].get(event.record_id)
+                    record = None if position is None else records[event.collection][position]
+                    due = review_due(event.collection, record) if record else None
+                    if due is None:
+                        self.review_queue.remove(key)
+                    else:
+                        self.review_queue.schedule(key, due)
+        self.sync_review_reminders()
+
+    def sync_review_reminders(self):
+        """Keeps one "review" reminder for today while reviews are due. Saves only if something changed."""
+        if not self.current_user:
+            return
+        now = datetime.now()
+        due_count = self.spaced_review_queue().count_due(now.date())
+        message = f"Time to review: {due_count} doubt(s)/topic(s) due"
+        reminders = self.reminders_data.get_user_data(self.current_user, [])
+        kept, todays, changed = [], None, False
+        for reminder in reminders:
+            if reminder.get("source") != "review":
+                kept.append(reminder)
+            elif reminder["datetime"][:10] == now.date().isoformat():
+                kept.append(reminder) # A dismissed one stays so it does not fire again today
+                todays = reminder
+            else:
+                changed = True # Yesterday's count is stale; today's reminder replaces it
+        if todays is None:
+            if due_count:
+                at = datetime.combine(now.date(), datetime.strptime(REVIEW_REMINDER_TIME, "%H:%M").time())
+                at = max(at, now.replace(second=0, microsecond=0) + timedelta(minutes=1))
+                kept.append(stamp_record({"message": message, "datetime": at.isoformat(), "status": "active",
+                                          "recurrence": None, "source": "review"}))
+                changed = True
+        elif todays["status"] == "active":
+            if not due_count:
+                kept.remove(todays)
+                changed = True
+            elif todays["message"] != message:
+                todays["message"] = message
+                stamp_record(todays)
+                changed = True
+        if changed:
+            self.reminders_data.set_user_data(self.current_user, kept)
+
+    def review_now(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Review Now")
+        win.geometry("600x520")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="🔁 Review Now", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 5))
+        count_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        count_label.pack(pady=(0, 10))
+        kind_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL_BOLD, text_color=ACCENT_COLOR_2)
+        kind_label.pack()
+        title_label = ctk.CTkLabel(frame, text="", font=FONT_MEDIUM, text_color=HEADER_TEXT_COLOR, wraplength=500)
+        title_label.pack(pady=(5, 10))
+        detail_box = ctk.CTkTextbox(frame, font=FONT_BODY, text_color=TEXT_COLOR, fg_color=BG_COLOR,
+                                    wrap="word", corner_radius=8, height=180)
+        detail_box.pack(padx=20, fill="both", expand=True)
+        ctk.CTkLabel(frame, text="How well did you remember it?", font=FONT_SMALL,
+                     text_color=TEXT_COLOR).pack(pady=(10, 5))
+        grade_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        grade_frame.pack(pady=(0, 15))
+
+        current = {"key": None, "reviewed": 0}
+
+        def show_next():
+            queue = self.spaced_review_queue()
+            now = datetime.now()
+            record = None
+            while record is None:
+                key = queue.next_due(now)
+                if key is None:
+                    break
+                collection = key.split("/", 1)[0]
+                _, record = self.review_record(key)
+                if record is None:
+                    queue.remove(key) # Deleted; its change event has not arrived yet
+            current["key"] = key
+            detail_box.configure(state="normal")
+            detail_box.delete("1.0", "end")
+            due_count = queue.count_due(now.date())
+            count_label.configure(text=f"Reviewed {current['reviewed']} this session · {due_count} due today")
+            if record is None:
+                upcoming = queue.peek()
+                kind_label.configure(text="")
+                title_label.configure(text="All caught up! 🎉")
+                if upcoming:
+                    detail_box.insert("1.0", f"Next review: {datetime.fromtimestamp(upcoming[0]).strftime('%Y-%m-%d %H:%M')}")
+                for button in grade_frame.winfo_children():
+                    button.configure(state="disabled")
+            elif collection == "doubts":
+                kind_label.configure(text=f"Doubt · {record['status']}")
+                title_label.configure(text=record['title'])
+                detail_box.insert("1.0", self.doubt_text(record))
+            else:
+                kind_label.configure(text="Study topic")
+                title_label.configure(text=record['topic'])
+                detail_box.insert("1.0", "Recall the key ideas of this topic, then grade yourself.")
+            detail_box.configure(state="disabled")
+
+        def grade(quality):
+            key = current["key"]
+            if key is None:
+                return
+            records, record = self.review_record(key)
+            if record is not None:
+                record["review"] = sm2_review(record.get("review") or {}, quality, datetime.now())
+                stamp_record(record)
+                self.review_stores()[key.split("/", 1)[0]].set_user_data(self.current_user, records)
+                # Reschedule now; the change event arrives after this window has moved on
+                self.spaced_review_queue().schedule(key, datetime.fromisoformat(record["review"]["due"]))
+                current["reviewed"] += 1
+            show_next()
+
+        for name, quality in REVIEW_GRADES.items():
+            ctk.CTkButton(grade_frame, text=name, width=100, fg_color=ACCENT_COLOR_4 if quality < 3 else BUTTON_BG_COLOR,
+                          hover_color=BUTTON_HOVER_COLOR, text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON,
+                          corner_radius=10, command=lambda quality=quality: grade(quality)).pack(side="left", padx=5)
+        show_next()
+
     # Pomodoro Timer
     def pomodoro_timer(self):
         if self._pomodoro_timer_window and self._pomodoro_timer_window.winfo_exists():
@@ -1200,7 +5852,7 @@ class StudentGuideApp:
             
         win = ctk.CTkToplevel(self.dash)
         win.title("Pomodoro Timer")
-        win.geometry("400x650") # *** CHANGED: Increased height for history
+        win.geometry("420x860") # *** CHANGED: Increased height for history and the focus chart
         win.configure(fg_color=BG_COLOR)
         win.transient(self.dash)
         win.grab_set()
@@ -1261,11 +5913,26 @@ class StudentGuideApp:
         self.timer_history_scroll_frame.grid_columnconfigure(0, weight=1)
         # --- END ADDED HISTORY UI ---
 
+        # Focus totals come from the rollups, not from scanning the history
+        self.focus_summary_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR, wraplength=320)
+        self.focus_summary_label.grid(row=6, column=0, pady=(0, 10))
+
+        # Daily focus minutes chart, fed from the daily rollups
+        self.focus_chart = None
+        if np is not None:
+            self.focus_chart = TrendChart(frame, width=340, height=160, line_color=ACCENT_COLOR_1, y_label="min/day")
+            self.focus_chart.grid(row=7, column=0, padx=15, pady=(0, 15), sticky="ew")
+
         win.protocol("WM_DELETE_WINDOW", self.stop_pomodoro_timer) # Ensure thread stops on window close
 
         self._pomodoro_time_left = self._work_minutes * 60
         self.update_pomodoro_timer_display()
-        self.refresh_timer_history() # *** ADDED: Populate history on open
+        self.bind_record_list(self.timer_history_scroll_frame, self.timer_history_data, self.build_timer_history_row,
+                              "No completed timers yet.", limit=20, anchor="w", padx=10, pady=2) # Latest 20 first
+        self.watch_focus_summary(self.focus_summary_label)
+        self.refresh_focus_chart()
+        if self.focus_chart:
+            self.watch(self.focus_chart.canvas, ("timer_rollups",), lambda events: self.refresh_focus_chart())
 
     # *** RENAMED function
     def start_my_timer_countdown(self):
@@ -1302,6 +5969,7 @@ class StudentGuideApp:
         if not self.current_user:
             return # Don't log if no user
             
+        rollups = self.get_timer_rollups() # Validated against the history before appending
         history = self.timer_history_data.get_user_data(self.current_user, [])
         log_entry = {
             "type": timer_type,
@@ -1309,42 +5977,64 @@ class StudentGuideApp:
             "timestamp": datetime.now().isoformat()
         }
         history.append(log_entry)
+        add_session_to_rollups(rollups, log_entry) # O(1) update of the day/week/month totals
         self.timer_history_data.set_user_data(self.current_user, history)
-        
-        # Refresh the list if it's open
-        self.app.after(0, self.refresh_timer_history)
-
-    # *** ADDED: New function to refresh history UI
-    def refresh_timer_history(self):
-        """Refreshes the timer history scrollable frame."""
-        # Check if the frame exists (window is open)
-        if not (self.timer_history_scroll_frame and self.timer_history_scroll_frame.winfo_exists()):
+        self.timer_rollups_data.set_user_data(self.current_user, rollups) # Open views update from the store events
+
+    def get_timer_rollups(self, username=None):
+        """Returns the user's focus rollups, rebuilding them from raw history if missing or corrupted."""
+        username = username or self.current_user
+        history = self.timer_history_data.get_user_data(username, [])
+        rollups = self.timer_rollups_data.get_user_data(username)
+        if not timer_rollups_valid(rollups, history):
+            rollups = build_timer_rollups(history)
+            self.timer_rollups_data.set_user_data(username, rollups)
+        return rollups
+
+    def get_focus_minutes(self, period, key, timer_types=FOCUS_TIMER_TYPES):
+        """Total minutes for one rollup bucket, e.g. get_focus_minutes("weekly", "2025-W25")."""
+        bucket = self.get_timer_rollups()[period].get(key, {})
+        return sum(bucket.get(timer_type, {}).get("minutes", 0) for timer_type in timer_types)
+
+    def focus_summary_text(self):
+        if not self.current_user:
+            return ""
+        day_key, week_key, month_key = rollup_keys(datetime.now())
+        today = self.get_focus_minutes("daily", day_key)
+        week = self.get_focus_minutes("weekly", week_key)
+        month = self.get_focus_minutes("monthly", month_key)
+        return f"Focus time - Today: {today:g} min | This week: {week:g} min | This month: {month:g} min"
+
+    def refresh_focus_chart(self):
+        """Plots daily focus minutes from the rollups in the timer window."""
+        chart = getattr(self, 'focus_chart', None)
+        if not (chart and chart.canvas.winfo_exists()):
             return
-            
-        for widget in self.timer_history_scroll_frame.winfo_children():
-            widget.destroy()
+        daily = self.get_timer_rollups()["daily"]
+        days = sorted(daily)
+        xs = [datetime.strptime(day, "%Y-%m-%d").toordinal() - EPOCH_ORDINAL for day in days]
+        ys = [sum(daily[day].get(t, {}).get("minutes", 0) for t in FOCUS_TIMER_TYPES) for day in days]
+        chart.set_data(xs, ys)
 
-        history = self.timer_history_data.get_user_data(self.current_user, [])
-        if not history:
-            ctk.CTkLabel(self.timer_history_scroll_frame, text="No completed timers yet.",
-                         text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
-            return
+    def watch_focus_summary(self, label):
+        """Shows the focus totals in `label` and keeps them in step with the rollups."""
+        label.configure(text=self.focus_summary_text())
+        self.watch(label, ("timer_rollups",), lambda events: label.configure(text=self.focus_summary_text()))
 
-        # Show latest entries first (up to 20)
-        for entry in reversed(history[-20:]):
-            try:
-                timestamp = datetime.fromisoformat(entry['timestamp'])
-                time_str = timestamp.strftime("%Y-%m-%d %H:%M")
-            except:
-                time_str = "Unknown time"
-                
-            duration = entry.get('duration_minutes', 0)
-            timer_type = entry.get('type', 'Unknown')
-            
-            log_text = f"{time_str} - {timer_type} ({duration} min)"
+    # *** ADDED: New function to refresh history UI
+    def build_timer_history_row(self, parent, entry):
+        try:
+            timestamp = datetime.fromisoformat(entry['timestamp'])
+            time_str = timestamp.strftime("%Y-%m-%d %H:%M")
+        except:
+            time_str = "Unknown time"
             
-            ctk.CTkLabel(self.timer_history_scroll_frame, text=log_text,
-                         font=FONT_SMALL, text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=2)
+        duration = entry.get('duration_minutes', 0)
+        timer_type = entry.get('type', 'Unknown')
+        
+        log_text = f"{time_str} - {timer_type} ({duration} min)"
+        
+        return ctk.CTkLabel(parent, text=log_text, font=FONT_SMALL, text_color=HEADER_TEXT_COLOR)
 
 
     def update_pomodoro_timer_display(self):
@@ -1394,6 +6084,7 @@ class StudentGuideApp:
         
         # *** ADDED: Clear history frame reference on close
         self.timer_history_scroll_frame = None 
+        self.focus_summary_label = None
         
         if self._pomodoro_timer_window and self._pomodoro_timer_window.winfo_exists():
             self._pomodoro_timer_window.destroy()
@@ -1415,7 +6106,7 @@ class StudentGuideApp:
             if self._pomodoro_state == "work":
                 self.log_timer_session("Pomodoro", self._current_timer_duration_minutes) # Log
                 messagebox.showinfo("Pomodoro", "Work session finished! Time for a break.", icon="info")
-                winsound.Beep(2500, 500) # Play a buzzing sound
+                self.sound_player.play() # Play a buzzing sound without blocking
                 self._pomodoro_time_left = self._break_minutes * 60
                 self._pomodoro_state = "break"
                 self.app.after(100, self.start_pomodoro_timer) # Start break timer automatically
@@ -1423,7 +6114,7 @@ class StudentGuideApp:
             elif self._pomodoro_state == "break":
                 self.log_timer_session("Break", self._current_timer_duration_minutes) # Log
                 messagebox.showinfo("Pomodoro", "Break finished! Time to work.", icon="info")
-                winsound.Beep(2500, 500) # Play a buzzing sound
+                self.sound_player.play() # Play a buzzing sound without blocking
                 self._pomodoro_time_left = self._work_minutes * 60
                 self._pomodoro_state = "stopped" # Go to stopped state, user can restart
                 self.app.after(0, self.update_pomodoro_timer_display) # Update to 25:00
@@ -1431,7 +6122,7 @@ class StudentGuideApp:
             elif self._pomodoro_state == "my_timer": # *** CHANGED state name
                 self.log_timer_session("My Timer", self._current_timer_duration_minutes) # Log
                 messagebox.showinfo("Timer Finished", "Your timer is done!", icon="info") # *** CHANGED title
-                winsound.Beep(2500, 500) # Play a buzzing sound
+                self.sound_player.play() # Play a buzzing sound without blocking
                 self._pomodoro_time_left = self._work_minutes * 60 # Reset to default Pomodoro time
                 self._pomodoro_state = "stopped" 
                 self.app.after(0, self.update_pomodoro_timer_display) # Update display to 25:00
@@ -1494,7 +6185,8 @@ class StudentGuideApp:
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
                                  command=self.delete_selected_progress).grid(row=0, column=0, padx=5, sticky="ew")
 
-        self.refresh_progress_list()
+        self.bind_record_list(self.progress_scroll_frame, self.progress_data, self.build_progress_row,
+                              "No progress tracked yet! Add a subject/topic to start.")
 
     def update_progress_label(self, value):
         self.progress_value_label.configure(text=f"{int(value)}%")
@@ -1522,44 +6214,27 @@ class StudentGuideApp:
         self.progress_topic_entry.delete(0, "end")
         self.progress_slider.set(0)
         self.update_progress_label(0)
-        self.refresh_progress_list()
         messagebox.showinfo("Success", "Study progress updated successfully!", icon="info")
 
-    def refresh_progress_list(self):
-        for widget in self.progress_scroll_frame.winfo_children():
-            widget.destroy()
-
-        progress_items = self.progress_data.get_user_data(self.current_user, [])
-        if not progress_items:
-            ctk.CTkLabel(self.progress_scroll_frame, text="No progress tracked yet! Add a subject/topic to start.", text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
-            return
-
-        for i, item in enumerate(progress_items):
-            progress_frame = ctk.CTkFrame(self.progress_scroll_frame, fg_color=BG_COLOR, corner_radius=8,
-                                          border_width=1, border_color=SHADOW_COLOR)
-            progress_frame.pack(fill="x", pady=5, padx=5)
-            progress_frame.grid_columnconfigure(1, weight=1)
-
-            checkbox = ctk.CTkCheckBox(progress_frame, text="", fg_color=BUTTON_BG_COLOR,
-                                         hover_color=BUTTON_HOVER_COLOR,
-                                         checkmark_color=BUTTON_TEXT_COLOR,
-                                         border_color=BUTTON_BG_COLOR, border_width=2,
-                                         command=lambda idx=i: self.toggle_progress_selection(idx))
-            checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
-            if item.get('selected_for_action', False):
-                checkbox.select()
-            else:
-                checkbox.deselect()
-
-            ctk.CTkLabel(progress_frame, text=f"{item['topic']}: {item['progress']}%",
-                                     font=FONT_BODY, text_color=TEXT_COLOR).grid(row=0, column=1, sticky="w", padx=(0, 10))
+    def build_progress_row(self, parent, item):
+        progress_frame = ctk.CTkFrame(parent, fg_color=BG_COLOR, corner_radius=8,
+                                      border_width=1, border_color=SHADOW_COLOR)
+        progress_frame.grid_columnconfigure(1, weight=1)
+
+        checkbox = ctk.CTkCheckBox(progress_frame, text="", fg_color=BUTTON_BG_COLOR,
+                                     hover_color=BUTTON_HOVER_COLOR,
+                                     checkmark_color=BUTTON_TEXT_COLOR,
+                                     border_color=BUTTON_BG_COLOR, border_width=2,
+                                     command=lambda record_id=item['id']: self.toggle_record_selection(self.progress_data, record_id))
+        checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
+        if item.get('selected_for_action', False):
+            checkbox.select()
+        else:
+            checkbox.deselect()
 
-    def toggle_progress_selection(self, index):
-        progress_items = self.progress_data.get_user_data(self.current_user, [])
-        if 0 <= index < len(progress_items):
-            progress_items[index]['selected_for_action'] = not progress_items[index].get('selected_for_action', False)
-            self.progress_data.set_user_data(self.current_user, progress_items)
-            self.refresh_progress_list()
+        ctk.CTkLabel(progress_frame, text=f"{item['topic']}: {item['progress']}%",
+                                 font=FONT_BODY, text_color=TEXT_COLOR).grid(row=0, column=1, sticky="w", padx=(0, 10))
+        return progress_frame
 
     def delete_selected_progress(self):
         progress_items = self.progress_data.get_user_data(self.current_user, [])
@@ -1576,7 +6251,6 @@ class StudentGuideApp:
             return
 
         self.progress_data.set_user_data(self.current_user, items_to_keep)
-        self.refresh_progress_list()
         messagebox.showinfo("Success", f"{deleted_count} progress item(s) deleted successfully!", icon="info")
 
     def start_breathing_exercise(self):
@@ -1612,7 +6286,7 @@ class StudentGuideApp:
     def wellness_panel(self):
         win = ctk.CTkToplevel(self.dash)
         win.title("Wellness Panel")
-        win.geometry("500x550")  # Adjust size
+        win.geometry("760x1000")  # Adjust size
         win.configure(fg_color=BG_COLOR)
         win.transient(self.dash)
         win.grab_set()
@@ -1641,7 +6315,7 @@ class StudentGuideApp:
 
         # Mood input section
         ctk.CTkLabel(frame, text="How are you feeling today?", text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=(0, 5))
-        self.mood_optionmenu = ctk.CTkOptionMenu(frame, values=["Good 😊", "Okay 😐", "Stressed 😟", "Happy 😄", "Sad 😢"],
+        self.mood_optionmenu = ctk.CTkOptionMenu(frame, values=MOOD_OPTIONS,
                                              fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
                                              text_color=BUTTON_TEXT_COLOR,
                                              dropdown_fg_color=BUTTON_HOVER_COLOR,
@@ -1659,7 +6333,18 @@ class StudentGuideApp:
         ctk.CTkButton(frame, text="Log Mood", command=self.log_mood,
                   fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
                   text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
-                  width=150, height=40).pack(pady=(0, 30))
+                  width=150, height=40).pack(pady=(0, 20))
+
+        # Mood trend chart (scroll to zoom, drag to pan)
+        self.mood_chart = None
+        if np is not None:
+            ctk.CTkLabel(frame, text="Mood Trend:", font=("Inter", 18, "bold"), text_color=HEADER_TEXT_COLOR).pack(pady=(0, 5))
+            self.mood_chart = TrendChart(frame, width=400, height=160, line_color=ACCENT_COLOR_5, y_label="mood (1-5)")
+            self.mood_chart.pack(padx=15, pady=(0, 20), fill="x")
+
+        # Year at a glance
+        self.wellness_heatmap = self.build_heatmap_section(frame, default_mode="Mood")
+        self.wellness_heatmap.pack(padx=15, pady=(0, 20))
 
         # Mood History section
         ctk.CTkLabel(frame, text="Your Mood History:", font=("Inter", 18, "bold"), text_color=HEADER_TEXT_COLOR).pack(pady=(0, 10))
@@ -1673,7 +6358,11 @@ class StudentGuideApp:
         self.mood_history_scroll_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         self.mood_history_scroll_frame.grid_columnconfigure(0, weight=1)
 
-        self.refresh_mood_history()
+        self.bind_record_list(self.mood_history_scroll_frame, self.moods_data, self.build_mood_row,
+                              "No mood entries yet! Log your first mood above.", limit=10) # Last 10, latest first
+        self.refresh_mood_chart()
+        if self.mood_chart:
+            self.watch(self.mood_chart.canvas, ("moods",), lambda events: self.refresh_mood_chart())
 
     def log_mood(self):
         mood = self.mood_optionmenu.get()
@@ -1688,40 +6377,169 @@ class StudentGuideApp:
         self.moods_data.set_user_data(self.current_user, moods)
         
         self.mood_notes_textbox.delete("1.0", "end")
-        self.refresh_mood_history()
         messagebox.showinfo("Success", "Mood logged successfully!", icon="info")
 
-    def refresh_mood_history(self):
-        for widget in self.mood_history_scroll_frame.winfo_children():
-            widget.destroy()
+    def build_mood_row(self, parent, mood_data):
+        try:
+            timestamp = datetime.fromisoformat(mood_data['timestamp'])
+            time_str = timestamp.strftime("%Y-%m-%d %H:%M")
+        except:
+            time_str = "Unknown time"
+            
+        mood_frame = ctk.CTkFrame(parent, 
+                                fg_color=BG_COLOR, corner_radius=8,
+                                border_width=1, border_color=SHADOW_COLOR)
+        
+        ctk.CTkLabel(mood_frame, text=f"{time_str}: {mood_data['mood']}", 
+                    font=FONT_SMALL_BOLD, text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=5)
+        
+        if mood_data.get('notes'):
+            ctk.CTkLabel(mood_frame, text=mood_data['notes'], 
+                        font=FONT_SMALL, text_color=TEXT_COLOR, 
+                        wraplength=400, justify="left").pack(anchor="w", padx=10, pady=(0,5))
+        return mood_frame
+
+    # Progress Insights
+    def get_progress_insights(self):
+        """Returns the cached insights for the current user, or None when NumPy is missing."""
+        if np is None:
+            return None
+        return self.insights.get(self.current_user,
+                                 self.timer_history_data.get_user_data(self.current_user, []),
+                                 self.moods_data.get_user_data(self.current_user, []))
+
+    def progress_insights(self):
+        insights = self.get_progress_insights()
+        if insights is None:
+            messagebox.showerror("Missing Library", "Progress Insights need NumPy. Install it with 'pip install numpy'.", icon="error")
+            return
 
-        moods = self.moods_data.get_user_data(self.current_user, [])
-        if not moods:
-            ctk.CTkLabel(self.mood_history_scroll_frame, 
-                        text="No mood entries yet! Log your first mood above.",
-                        text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Progress Insights")
+        win.geometry("700x700")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+
+        frame = ctk.CTkScrollableFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                                       border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="📊 Progress Insights", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 15))
+
+        def section(title, lines):
+            section_frame = ctk.CTkFrame(frame, fg_color=BG_COLOR, corner_radius=8,
+                                         border_width=1, border_color=SHADOW_COLOR)
+            section_frame.pack(fill="x", padx=10, pady=5)
+            ctk.CTkLabel(section_frame, text=title, font=FONT_SMALL_BOLD,
+                         text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=(8, 2))
+            ctk.CTkLabel(section_frame, text="\n".join(lines), font=FONT_SMALL, text_color=TEXT_COLOR,
+                         justify="left").pack(anchor="w", padx=20, pady=(0, 8))
+
+        section("🔥 Study Streaks", [
+            f"Current streak: {insights['current_streak']} day(s)",
+            f"Longest streak: {insights['longest_streak']} day(s)"])
+
+        section("⏱️ Focus Time", [
+            f"Last 7 days: {insights['focus_last_7']:g} min",
+            f"Last 30 days: {insights['focus_last_30']:g} min"])
+
+        best_hours = [f"{hour:02d}:00 - {hour:02d}:59 ({minutes:g} min)" for hour, minutes in insights["best_hours"]]
+        section("🌟 Best Focus Hours", best_hours or ["Complete a Pomodoro or My Timer session to see your best hours."])
+
+        def mood_lines(matrix, row_names):
+            lines = []
+            for row_name, counts in zip(row_names, matrix):
+                total = int(counts.sum())
+                if total:
+                    top = MOOD_OPTIONS[int(counts.argmax())]
+                    lines.append(f"{row_name}: mostly {top} ({total} entries)")
+            return lines or ["Log your mood in the Wellness Panel to see trends."]
+
+        section("📅 Mood by Weekday", mood_lines(insights["mood_by_weekday"], WEEKDAY_NAMES))
+        section("🕒 Mood by Time of Day", mood_lines(insights["mood_by_time_of_day"], TIME_OF_DAY_NAMES))
+
+    def refresh_mood_chart(self):
+        """Plots mood scores over time using the arrays cached by Progress Insights."""
+        chart = getattr(self, 'mood_chart', None)
+        if not (chart and chart.canvas.winfo_exists()):
             return
+        insights = self.get_progress_insights()
+        mood_times = insights["mood_times"]
+        order = np.argsort(mood_times, kind="stable")
+        xs = mood_times[order].astype(np.int64) / (24 * 60) # Minutes to days since epoch
+        chart.set_data(xs, insights["mood_scores"][order])
+
+    # Cohort Report (admin only, read-only)
+    def cohort_report(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Cohort Report")
+        win.geometry("800x650")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="🏫 Cohort Report", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 5))
+        status_label = ctk.CTkLabel(frame, text="Loading...", font=FONT_SMALL, text_color=TEXT_COLOR)
+        status_label.pack(pady=(0, 10))
 
-        # Show latest entries first
-        for mood_data in reversed(moods[-10:]):  # Show last 10 entries
+        report_box = ctk.CTkTextbox(frame, font=("Courier New", 12), fg_color=BG_COLOR, text_color=TEXT_COLOR,
+                                    border_width=1, border_color=SHADOW_COLOR, wrap="none")
+        report_box.pack(fill="both", expand=True, padx=15, pady=5)
+        report_box.configure(state="disabled")
+
+        def show_report(report):
+            if not win.winfo_exists():
+                return
+            report_box.configure(state="normal")
+            report_box.delete("1.0", "end")
+            report_box.insert("1.0", format_cohort_report(report))
+            report_box.configure(state="disabled")
+            generated = datetime.fromisoformat(report["generated_at"]).strftime("%Y-%m-%d %H:%M")
+            status_label.configure(text=f"Data as of {generated}")
+            refresh_btn.configure(state="normal")
+
+        def show_error(error):
+            if win.winfo_exists():
+                status_label.configure(text=f"Could not build report: {error}")
+                refresh_btn.configure(state="normal")
+
+        def load(force=False):
+            refresh_btn.configure(state="disabled")
+            status_label.configure(text="Building report...")
+            stores = (self.users_data, self.tasks_data, self.timer_history_data, self.moods_data)
+            sources = cohort_source_stamps(stores) # Before the snapshot; see cohort_source_stamps
             try:
-                timestamp = datetime.fromisoformat(mood_data['timestamp'])
-                time_str = timestamp.strftime("%Y-%m-%d %H:%M")
-            except:
-                time_str = "Unknown time"
-                
-            mood_frame = ctk.CTkFrame(self.mood_history_scroll_frame, 
-                                    fg_color=BG_COLOR, corner_radius=8,
-                                    border_width=1, border_color=SHADOW_COLOR)
-            mood_frame.pack(fill="x", pady=5, padx=5)
-            
-            ctk.CTkLabel(mood_frame, text=f"{time_str}: {mood_data['mood']}", 
-                        font=FONT_SMALL_BOLD, text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=5)
-            
-            if mood_data.get('notes'):
-                ctk.CTkLabel(mood_frame, text=mood_data['notes'], 
-                            font=FONT_SMALL, text_color=TEXT_COLOR, 
-                            wraplength=400, justify="left").pack(anchor="w", padx=10, pady=(0,5))
+                # A store server only hands out profiles without credentials, and only to admins
+                users = self.users_data.data if self.store_client is None else self.store_client.request("profiles")
+                snapshot = (dict(users),) + tuple(dict(store.data) for store in stores[1:])
+            except (StoreError, OSError, TimeoutError) as e:
+                show_error(e)
+                return
+
+            def worker():
+                try:
+                    report = None if force else load_cached_cohort_report(sources)
+                    if report is None:
+                        report = build_cohort_report(*snapshot)
+                        save_cohort_report(report, sources)
+                    self.app.after(0, lambda: show_report(report))
+                except Exception as e:
+                    self.app.after(0, lambda e=e: show_error(e))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        refresh_btn = ctk.CTkButton(frame, text="Refresh", command=lambda: load(force=True),
+                                    fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                                    text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=8)
+        refresh_btn.pack(pady=(10, 15))
+        load()
 
     #Syllabus Manager Feature ---
     def syllabus_manager(self):
@@ -1743,20 +6561,7 @@ class StudentGuideApp:
         ctk.CTkLabel(frame, text="Upload syllabus files for your subjects:",
                      font=FONT_BODY, text_color=TEXT_COLOR).pack(pady=(0, 15))
 
-        subjects = [
-            "ENGINEERING WORKSHOP",
-            "ENGINEERING CHEMISTRY",
-            "ENGLISH",
-            "MATHS",
-            "ENVIRONMENTAL SCIENCE",
-            "EITK",
-            "PPS"
-        ]
-
-        self.syllabus_folder = "syllabus_files"
-        os.makedirs(self.syllabus_folder, exist_ok=True)
-
-        for sub in subjects:
+        for sub in SYLLABUS_SUBJECTS:
             sub_frame = ctk.CTkFrame(frame, fg_color=BG_COLOR, corner_radius=8,
                                      border_width=1, border_color=SHADOW_COLOR)
             sub_frame.pack(fill="x", padx=10, pady=5)
@@ -1770,9 +6575,62 @@ class StudentGuideApp:
                           corner_radius=8,
                           command=lambda s=sub: self.upload_syllabus_file(s)).pack(side="right", padx=10, pady=8)
 
-        ctk.CTkLabel(frame, text="\nUploaded files are saved locally in 'syllabus_files' folder.",
+        user_data = self.users_data.get_user_data(self.current_user, {})
+        self.share_syllabus_checkbox = ctk.CTkCheckBox(frame, text="Share uploads with my course section",
+                                                       font=FONT_SMALL, text_color=TEXT_COLOR,
+                                                       fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR)
+        if user_data.get("course") and user_data.get("section"):
+            self.share_syllabus_checkbox.pack(pady=(10, 0))
+
+        ctk.CTkButton(frame, text="📋 Generate Study Plans", fg_color=ACCENT_COLOR_5, hover_color=BUTTON_HOVER_COLOR,
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                      command=self.generate_study_plans).pack(pady=(15, 0))
+
+        ctk.CTkLabel(frame, text=f"\nUploaded files are saved locally in the '{SYLLABUS_FOLDER}' folder.\n"
+                                 "Identical files are stored only once.",
                      font=FONT_SMALL, text_color=TEXT_COLOR).pack(pady=(10, 0))
 
+    def migrate_legacy_syllabi(self):
+        """Moves files from the old flat syllabus layout into the blob area: hashing on a worker, the move on the Tk thread."""
+        if self.syllabus_store.legacy_migrated():
+            return
+
+        def run():
+            try:
+                files, error = self.syllabus_store.scan_legacy(), None
+            except OSError as e:
+                files, error = [], e
+            self.app.after(0, finish, files, error)
+
+        def finish(files, error):
+            try:
+                if error:
+                    raise error
+                self.syllabus_store.migrate_legacy(files, self.legacy_syllabus_owner())
+            except OSError as e:
+                print(f"Error migrating old syllabus files: {e}") # Not marked done, so tried again next start
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def legacy_syllabus_owner(self):
+        """Whose the old flat-layout files were: the install's only account, not counting the old demo one.
+
+        The flat layout recorded no uploader, so with several accounts the files are kept but listed to no one.
+        """
+        if self.store_client is not None:
+            return LEGACY_SYLLABUS_OWNER # Accounts live on the server, not on the disk with the files
+        accounts = [name for name in self.users_data.data if name != LEGACY_DEFAULT_USER] or list(self.users_data.data)
+        return accounts[0] if len(accounts) == 1 else LEGACY_SYLLABUS_OWNER
+
+    def syllabus_owners(self):
+        """Manifest owners whose files the current user can see: self, their section, legacy uploads."""
+        user_data = self.users_data.get_user_data(self.current_user, {})
+        owners = [self.current_user]
+        if user_data.get("course") and user_data.get("section"):
+            owners.append(section_owner(user_data["course"], user_data["section"]))
+        owners.append(SHARED_SYLLABUS_OWNER)
+        return owners
+
     def upload_syllabus_file(self, subject):
         """Lets user pick a syllabus file and saves it with subject name."""
         file_path = filedialog.askopenfilename(
@@ -1782,15 +6640,75 @@ class StudentGuideApp:
                        ("Text files", "*.txt"),
                        ("All files", "*.*"))
         )
-        if file_path:
+        if not file_path:
+            return
+        ext = os.path.splitext(file_path)[1].lower()
+        dest_path = self.syllabus_store.incoming_path(ext)
+        owners = self.syllabus_owners()
+        owner = owners[1] if self.share_syllabus_checkbox.get() and len(owners) > 2 else self.current_user
+
+        # Progress window; the copy itself runs on a worker thread
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Uploading Syllabus")
+        win.geometry("420x200")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+
+        ctk.CTkLabel(win, text=f"Uploading {os.path.basename(file_path)}", font=FONT_SMALL_BOLD,
+                     text_color=HEADER_TEXT_COLOR, wraplength=380).pack(pady=(20, 10))
+        progress_bar = ctk.CTkProgressBar(win, width=340, progress_color=ACCENT_COLOR_1)
+        progress_bar.set(0)
+        progress_bar.pack(pady=(0, 5))
+        status_label = ctk.CTkLabel(win, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        status_label.pack()
+
+        cancel_event = threading.Event()
+        ctk.CTkButton(win, text="Cancel", fg_color=ACCENT_COLOR_4, hover_color="#dc3545",
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                      command=cancel_event.set).pack(pady=10)
+        win.protocol("WM_DELETE_WINDOW", cancel_event.set) # Closes once the worker has stopped
+
+        def show_progress(copied, total):
+            if win.winfo_exists():
+                progress_bar.set(copied / max(total, 1))
+                status_label.configure(text=f"{copied / 1048576:.1f} / {total / 1048576:.1f} MB")
+
+        def run():
             try:
-                ext = os.path.splitext(file_path)[1]
-                dest_path = os.path.join(self.syllabus_folder, f"{subject}{ext}")
-                with open(file_path, "rb") as src, open(dest_path, "wb") as dst:
-                    dst.write(src.read())
-                messagebox.showinfo("Success", f"Syllabus for {subject} uploaded successfully!", icon="info")
+                digest = copy_file_hashed(file_path, dest_path, cancel_event=cancel_event,
+                                          progress_callback=lambda copied, total: self.app.after(0, show_progress, copied, total))
+                error = None
+            except CopyCancelled:
+                digest, error = None, None
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to upload file: {e}", icon="error")
+                digest, error = None, e
+            self.app.after(0, finish, digest, error)
+
+        def finish(digest, error):
+            if win.winfo_exists():
+                win.destroy()
+            if error:
+                messagebox.showerror("Error", f"Failed to upload file: {error}", icon="error")
+                return
+            if not digest:
+                return # Cancelled
+            try:
+                new_content = self.syllabus_store.ingest(dest_path, digest, ext)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to store file: {e}", icon="error")
+                return
+            replaced = self.syllabus_store.add_entry(owner, {
+                "subject": subject, "name": os.path.basename(file_path), "ext": ext,
+                "size": os.path.getsize(self.syllabus_store.blob_path(digest, ext)), "sha256": digest,
+                "uploaded_at": datetime.now().isoformat(), "uploaded_by": self.current_user})
+            if replaced:
+                self.syllabus_store.collect_garbage() # The replaced file may have been its blob's last reference
+            if new_content:
+                self.index_syllabus_files() # Make the new syllabus searchable in the background
+            note = "" if new_content else "\n(An identical file was already stored, so no extra space is used.)"
+            messagebox.showinfo("Success", f"Syllabus for {subject} uploaded successfully!{note}", icon="info")
+
+        threading.Thread(target=run, daemon=True).start()
         # --- 📗 View Uploaded Syllabus Files ---
     def view_uploaded_syllabus(self):
         win = ctk.CTkToplevel(self.dash)
@@ -1808,31 +6726,329 @@ class StudentGuideApp:
                      font=("Inter", 26, "bold"),
                      text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
 
-        syllabus_folder = "syllabus_files"
-        os.makedirs(syllabus_folder, exist_ok=True)
-        files = os.listdir(syllabus_folder)
+        self.syllabus_catalog.refresh()
+        rows = self.syllabus_catalog.rows(self.syllabus_owners())
 
-        if not files:
+        if not rows:
             ctk.CTkLabel(frame, text="No syllabus files uploaded yet.",
                          font=FONT_BODY, text_color=TEXT_COLOR).pack(pady=20)
             return
 
-        for f in files:
-            file_path = os.path.join(syllabus_folder, f)
-            sub_frame = ctk.CTkFrame(frame, fg_color=BG_COLOR,
-                                     corner_radius=8, border_width=1,
-                                     border_color=SHADOW_COLOR)
-            sub_frame.pack(fill="x", padx=10, pady=5)
+        for index, row in enumerate(rows):
+            row["iid"] = str(index) # Treeview item id, maps a selection back to its row
+            row["owner_label"] = "You" if row["owner"] == self.current_user else \
+                "Everyone" if row["owner"] == SHARED_SYLLABUS_OWNER else "Section"
+            row["search_text"] = " ".join((row["subject"], row["name"], row["type"], row["owner_label"],
+                                           row["uploaded_by"], row["sha256"])).lower()
+
+        filter_entry = ctk.CTkEntry(frame, placeholder_text="Filter by subject, name, type or owner...",
+                                    font=FONT_SMALL, fg_color="#f3f4f6", text_color=TEXT_COLOR,
+                                    border_color=SHADOW_COLOR, corner_radius=8)
+        filter_entry.pack(fill="x", padx=15, pady=(0, 10))
+
+        columns = [("subject", "Subject", 180), ("name", "File", 200), ("type", "Type", 60),
+                   ("size", "Size", 80), ("uploaded_at", "Uploaded", 140), ("owner_label", "Owner", 80),
+                   ("sha256", "SHA-256", 110)]
+        tree = self.build_syllabus_table(win, frame, columns)
+
+        count_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        count_label.pack(pady=(5, 0))
+
+        sort_state = {"key": "subject", "reverse": False}
+        sort_keys = {"size": lambda row: row["size"] if row["size"] is not None else -1}
+
+        def cell(row, key):
+            if key == "size":
+                return f"{row['size'] / 1024:,.0f} KB" if row["size"] is not None else "missing"
+            if key == "uploaded_at":
+                return row["uploaded_at"][:16].replace("T", " ")
+            if key == "sha256":
+                return row["sha256"][:12]
+            return row[key]
+
+        def render(event=None):
+            needle = filter_entry.get().strip().lower()
+            shown = [row for row in rows if needle in row["search_text"]]
+            key = sort_state["key"]
+            shown.sort(key=sort_keys.get(key, lambda row: str(row[key]).lower()), reverse=sort_state["reverse"])
+            tree.delete(*tree.get_children())
+            for row in shown:
+                tree.insert("", "end", iid=row["iid"], values=[cell(row, column) for column, _, _ in columns])
+            count_label.configure(text=f"Showing {len(shown)} of {len(rows)} files. Double-click a row to open it.")
+
+        def sort_by(key):
+            sort_state["reverse"] = not sort_state["reverse"] if sort_state["key"] == key else False
+            sort_state["key"] = key
+            render()
+
+        for key, _, _ in columns:
+            tree.heading(key, command=lambda k=key: sort_by(k))
+            tree.column(key, anchor="e" if key == "size" else "w")
+
+        def open_selected(event=None):
+            selection = tree.selection()
+            if selection:
+                self.open_file(rows[int(selection[0])]["path"])
+
+        tree.bind("<Double-1>", open_selected)
+        tree.bind("<Return>", open_selected)
+        filter_entry.bind("<KeyRelease>", render)
+        render()
+
+    def build_syllabus_table(self, win, parent, columns, selectmode="browse"):
+        """A scrollable ttk.Treeview for file listings; it draws only the visible rows, so thousands open instantly."""
+        style = ttk.Style(win)
+        style.configure("Syllabus.Treeview", background=CARD_BG_COLOR, fieldbackground=CARD_BG_COLOR,
+                        foreground=TEXT_COLOR, font=FONT_SMALL, rowheight=28)
+        style.configure("Syllabus.Treeview.Heading", font=FONT_SMALL_BOLD)
+        table = ctk.CTkFrame(parent, fg_color=CARD_BG_COLOR)
+        table.pack(fill="both", expand=True, padx=15)
+        tree = ttk.Treeview(table, columns=[key for key, _, _ in columns], show="headings",
+                            style="Syllabus.Treeview", selectmode=selectmode)
+        for key, heading, width in columns:
+            tree.heading(key, text=heading)
+            tree.column(key, width=width)
+        scrollbar = ctk.CTkScrollbar(table, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        tree.pack(side="left", fill="both", expand=True)
+        return tree
+
+    def index_syllabus_files(self, progress_callback=None, on_done=None):
+        """Extracts text from uploads not indexed yet, on a worker thread that feeds a process pool.
+
+        Everything on this machine is indexed, whoever uploaded it; searches only show the
+        current user's files. `on_done(extracted, error)` runs on the Tk thread. Returns
+        False if an indexing run is already going.
+        """
+        if self.syllabus_indexer and self.syllabus_indexer.is_alive():
+            return False
+        self.syllabus_catalog.refresh()
+        rows = self.syllabus_catalog.rows(list(self.syllabus_data.data))
+        live_digests = {row["sha256"] for row in rows}
+
+        def run():
+            try:
+                extracted, error = self.syllabus_search.update(rows, live_digests, progress_callback), None
+            except Exception as e:
+                extracted, error = 0, e
+            if on_done:
+                self.app.after(0, on_done, extracted, error)
 
-            ctk.CTkLabel(sub_frame, text=f, font=FONT_SMALL_BOLD,
-                         text_color=HEADER_TEXT_COLOR).pack(side="left", padx=15, pady=10)
+        self.syllabus_indexer = threading.Thread(target=run, daemon=True)
+        self.syllabus_indexer.start()
+        return True
 
-            ctk.CTkButton(sub_frame, text="Open File",
-                          fg_color=ACCENT_COLOR_2, hover_color="#42A5F5",
-                          text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON,
-                          corner_radius=8,
-                          command=lambda path=file_path: self.open_file(path)
-                          ).pack(side="right", padx=10, pady=8)
+    def search_syllabi(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Search Syllabi")
+        win.geometry("900x600")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="🔎 Search Syllabi", font=("Inter", 26, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
+
+        search_row = ctk.CTkFrame(frame, fg_color=CARD_BG_COLOR)
+        search_row.pack(fill="x", padx=15, pady=(0, 10))
+        query_entry = ctk.CTkEntry(search_row, placeholder_text="Search for a topic, e.g. thermodynamics",
+                                   font=FONT_SMALL, fg_color="#f3f4f6", text_color=TEXT_COLOR,
+                                   border_color=SHADOW_COLOR, corner_radius=8)
+        query_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+
+        status_label = ctk.CTkLabel(frame, text="", font=FONT_SMALL, text_color=TEXT_COLOR)
+        columns = [("subject", "Subject", 160), ("name", "File", 180), ("score", "Matches", 70),
+                   ("snippet", "Context", 420)]
+        tree = self.build_syllabus_table(win, frame, columns)
+        tree.column("score", anchor="e")
+        status_label.pack(pady=(5, 10))
+        paths = {}
+
+        def run_search(event=None):
+            query = query_entry.get().strip()
+            tree.delete(*tree.get_children())
+            paths.clear()
+            if not query:
+                return
+            by_digest = {}
+            for row in self.syllabus_catalog.rows(self.syllabus_owners()):
+                by_digest.setdefault(row["sha256"], []).append(row)
+            results = self.syllabus_search.search(query, by_digest)
+            for digest, score in results:
+                snippet = self.syllabus_search.snippet(digest, query)
+                for row in by_digest[digest]:
+                    paths[tree.insert("", "end", values=(row["subject"], row["name"], score, snippet))] = row["path"]
+            status_label.configure(text=f"{len(results)} matching file(s). Double-click a result to open it."
+                                   if results else f"No syllabus mentions '{query}'.")
+
+        def open_selected(event=None):
+            selection = tree.selection()
+            if selection:
+                self.open_file(paths[selection[0]])
+
+        def show_progress(done, total):
+            if win.winfo_exists():
+                status_label.configure(text=f"Indexing new uploads... {done} / {total}")
+
+        def indexed(extracted, error):
+            if not win.winfo_exists():
+                return
+            if error:
+                status_label.configure(text=f"Indexing failed: {error}")
+            elif extracted:
+                status_label.configure(text=f"Indexed {extracted} new file(s).")
+                run_search()
+
+        ctk.CTkButton(search_row, text="Search", command=run_search, width=110,
+                      fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=8).pack(side="right")
+        query_entry.bind("<Return>", run_search)
+        tree.bind("<Double-1>", open_selected)
+        tree.bind("<Return>", open_selected)
+        query_entry.focus_set()
+        self.index_syllabus_files(lambda done, total: self.app.after(0, show_progress, done, total), indexed)
+
+    def syllabus_outlines(self):
+        """{subject: parsed units} from the text the search indexer extracted from the user's syllabi.
+
+        Per subject, the user's own uploads win over their section's, which win over shared ones.
+        """
+        outlines, owner_of = {}, {}
+        for owner, entry in self.syllabus_store.entries_for(self.syllabus_owners()):
+            subject = entry["subject"]
+            if owner_of.get(subject, owner) != owner:
+                continue
+            try:
+                with open(self.syllabus_search.text_path(entry["sha256"]), "r", encoding="utf-8") as f:
+                    text = f.read()
+            except OSError:
+                continue # Not extracted (unsupported type or a damaged file)
+            owner_of[subject] = owner
+            outlines.setdefault(subject, []).extend(parse_syllabus_outline(text))
+        return outlines
+
+    def generate_study_plans(self):
+        win = ctk.CTkToplevel(self.dash)
+        win.title("Study Plans from Syllabus")
+        win.geometry("900x650")
+        win.configure(fg_color=BG_COLOR)
+        win.transient(self.dash)
+        win.grab_set()
+
+        frame = ctk.CTkFrame(win, fg_color=CARD_BG_COLOR, corner_radius=12,
+                             border_width=1, border_color=SHADOW_COLOR)
+        frame.pack(padx=25, pady=25, fill="both", expand=True)
+
+        ctk.CTkLabel(frame, text="📋 Study Plans from Syllabus", font=("Inter", 24, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
+
+        term_frame = ctk.CTkFrame(frame, fg_color=CARD_BG_COLOR)
+        term_frame.pack(pady=(0, 10))
+        ctk.CTkLabel(term_frame, text="Term from", font=FONT_SMALL, text_color=TEXT_COLOR).pack(side="left", padx=(0, 5))
+        start_entry = ctk.CTkEntry(term_frame, width=120, fg_color="#f3f4f6", text_color=TEXT_COLOR, font=FONT_SMALL,
+                                   corner_radius=8, border_color=SHADOW_COLOR, border_width=1)
+        start_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        start_entry.pack(side="left")
+        ctk.CTkLabel(term_frame, text="to", font=FONT_SMALL, text_color=TEXT_COLOR).pack(side="left", padx=5)
+        end_entry = ctk.CTkEntry(term_frame, width=120, fg_color="#f3f4f6", text_color=TEXT_COLOR, font=FONT_SMALL,
+                                 corner_radius=8, border_color=SHADOW_COLOR, border_width=1)
+        end_entry.insert(0, (datetime.now() + timedelta(days=TERM_LENGTH_DAYS)).strftime("%Y-%m-%d"))
+        end_entry.pack(side="left")
+        dates_checkbox = ctk.CTkCheckBox(term_frame, text="Spread due dates across the term", font=FONT_SMALL,
+                                         text_color=TEXT_COLOR, fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR)
+        dates_checkbox.select()
+        dates_checkbox.pack(side="left", padx=(15, 0))
+
+        status_label = ctk.CTkLabel(frame, text="Reading your syllabi...", font=FONT_SMALL, text_color=TEXT_COLOR)
+        status_label.pack(pady=(0, 5))
+        columns = [("subject", "Subject", 170), ("topic", "Topic", 480), ("due_date", "Due", 110)]
+        tree = self.build_syllabus_table(win, frame, columns, selectmode="extended")
+        proposals = []
+
+        def due_dates():
+            """Due date per proposal (each subject spread over the whole term), or None if the term is invalid."""
+            if not dates_checkbox.get():
+                return [""] * len(proposals)
+            try:
+                start = datetime.strptime(start_entry.get().strip(), "%Y-%m-%d")
+                end = datetime.strptime(end_entry.get().strip(), "%Y-%m-%d")
+            except ValueError:
+                return None
+            if end <= start:
+                return None
+            by_subject = {}
+            for index, proposal in enumerate(proposals):
+                by_subject.setdefault(proposal["subject"], []).append(index)
+            dates = [""] * len(proposals)
+            for indexes in by_subject.values():
+                for index, due_date in zip(indexes, spread_due_dates(len(indexes), start, end)):
+                    dates[index] = due_date
+            return dates
+
+        def render(event=None):
+            dates = due_dates() or [""] * len(proposals)
+            selected = set(tree.selection()) if tree.get_children() else {str(i) for i in range(len(proposals))}
+            tree.delete(*tree.get_children())
+            for index, (proposal, due_date) in enumerate(zip(proposals, dates)):
+                tree.insert("", "end", iid=str(index), values=(proposal["subject"], proposal["topic"], due_date))
+            tree.selection_set([iid for iid in tree.get_children() if iid in selected])
+
+        def add_selected():
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("No Selection", "Please select the plans to add.", icon="warning")
+                return
+            dates = due_dates()
+            if dates is None:
+                messagebox.showerror("Input Error", "The term must run from an earlier YYYY-MM-DD date to a later one.", icon="error")
+                return
+            plans = self.plans_data.get_user_data(self.current_user, [])
+            for iid in selection:
+                proposal = proposals[int(iid)]
+                plans.append(stamp_record({"subject": proposal["subject"], "topic": proposal["topic"],
+                                           "due_date": dates[int(iid)], "status": "Planned"}))
+            self.plans_data.set_user_data(self.current_user, plans) # One write for the whole batch
+            win.destroy()
+            messagebox.showinfo("Success", f"{len(selection)} study plan(s) added!", icon="info")
+
+        def load(extracted=0, error=None):
+            if not win.winfo_exists():
+                return
+            if error:
+                status_label.configure(text=f"Could not read your syllabi: {error}")
+                return
+            proposals[:] = propose_study_plans(self.syllabus_outlines(), self.plans_data.get_user_data(self.current_user, []))
+            if proposals:
+                subjects = len({proposal["subject"] for proposal in proposals})
+                status_label.configure(text=f"{len(proposals)} new topic(s) found across {subjects} subject(s). "
+                                            "Ctrl/Shift-click to change the selection.")
+            else:
+                status_label.configure(text="No new units or topics were found. Upload .txt, .docx or text-based "
+                                            ".pdf syllabi in the Syllabus Manager.")
+            render()
+
+        def start():
+            if win.winfo_exists() and not self.index_syllabus_files(on_done=load):
+                win.after(500, start) # Another indexing run is finishing first
+
+        btn_frame = ctk.CTkFrame(frame, fg_color=CARD_BG_COLOR)
+        btn_frame.pack(pady=(10, 15))
+        ctk.CTkButton(btn_frame, text="Select All", fg_color=ACCENT_COLOR_2, hover_color="#42A5F5",
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                      command=lambda: tree.selection_set(tree.get_children())).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Add Selected Plans", fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
+                      command=add_selected).pack(side="left", padx=5)
+        dates_checkbox.configure(command=render)
+        start_entry.bind("<Return>", render)
+        end_entry.bind("<Return>", render)
+        start_entry.bind("<FocusOut>", render)
+        end_entry.bind("<FocusOut>", render)
+        start()
 
     def open_file(self, path):
         """Open the selected file using default system viewer."""
@@ -1850,7 +7066,7 @@ class StudentGuideApp:
     def calendar_view(self):
         win = ctk.CTkToplevel(self.dash)
         win.title("Calendar View")
-        win.geometry("800x700") # Increased size for better calendar display
+        win.geometry("800x950") # Increased size for the calendar and the year heatmap
         win.configure(fg_color=BG_COLOR)
         win.transient(self.dash)
         win.grab_set()
@@ -1889,6 +7105,52 @@ class StudentGuideApp:
         self.current_month = datetime.now().month
 
         self.draw_calendar()
+        self.watch(self.calendar_display_frame, ("tasks", "reminders", "plans", "study_schedule"),
+                   lambda events: self.draw_calendar())
+
+        self.calendar_heatmap = self.build_heatmap_section(frame, default_mode="Focus minutes")
+        self.calendar_heatmap.grid(row=3, column=0, pady=(0, 15), padx=15)
+
+    def heatmap_day_values(self):
+        """Per-day focus minutes (from the daily rollups) and the last mood logged each day."""
+        rollups = self.get_timer_rollups()
+        moods = self.moods_data.get_user_data(self.current_user, [])
+        key = (rollups["entries"], len(moods)) # Both histories are append-only
+        cached = self._heatmap_values.get(self.current_user)
+        if cached and cached[0] == key:
+            return cached[1]
+        daily = rollups["daily"]
+        focus_by_day = {day: sum(types.get(t, {}).get("minutes", 0) for t in FOCUS_TIMER_TYPES)
+                        for day, types in daily.items()}
+        mood_by_day = {}
+        for mood_data in moods:
+            timestamp = mood_data.get('timestamp', '')
+            if len(timestamp) >= 10:
+                mood_by_day[timestamp[:10]] = mood_data.get('mood') # Later entries win
+        self._heatmap_values[self.current_user] = (key, (focus_by_day, mood_by_day))
+        return focus_by_day, mood_by_day
+
+    def build_heatmap_section(self, parent, default_mode):
+        """Creates a titled year heatmap with a Focus/Mood switch. Returns the container frame."""
+        section = ctk.CTkFrame(parent, fg_color="transparent")
+        header = ctk.CTkFrame(section, fg_color="transparent")
+        header.pack(fill="x", pady=(0, 5))
+        ctk.CTkLabel(header, text="Year at a Glance", font=("Inter", 18, "bold"),
+                     text_color=HEADER_TEXT_COLOR).pack(side="left")
+
+        heatmap = StudyHeatmap(section)
+        heatmap.mode = default_mode
+        heatmap.set_data(*self.heatmap_day_values())
+        heatmap.pack()
+        self.watch(section, ("timer_rollups", "moods"), lambda events: heatmap.set_data(*self.heatmap_day_values()))
+
+        mode_menu = ctk.CTkOptionMenu(header, values=HEATMAP_MODES, width=150, command=heatmap.set_mode,
+                                      fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                      text_color=BUTTON_TEXT_COLOR, dropdown_fg_color=BUTTON_HOVER_COLOR)
+        mode_menu.set(default_mode)
+        mode_menu.pack(side="right")
+        section.heatmap = heatmap
+        return section
 
     def draw_calendar(self):
         # Clear existing widgets in the calendar grid
@@ -1906,6 +7168,8 @@ class StudentGuideApp:
         month_days = cal_obj.monthdayscalendar(self.current_year, self.current_month)
         today = datetime.now().day if self.current_year == datetime.now().year and self.current_month == datetime.now().month else -1
 
+        month_events = self.get_month_events(self.current_year, self.current_month)
+
         row_offset = 1 # Start drawing days from the second row (after day names)
         for week in month_days:
             for col, day_num in enumerate(week):
@@ -1926,44 +7190,74 @@ class StudentGuideApp:
                                              font=FONT_BODY, text_color=day_text_color, fg_color=day_bg_color)
                     day_label.pack(side="top", anchor="ne", padx=5, pady=2) # Align day number to top-right
 
-                    # Check for tasks and reminders on this specific day
-                    tasks_on_day = []
-                    reminders_on_day = []
-
-                    all_tasks = self.tasks_data.get_user_data(self.current_user, [])
-                    for task_data in all_tasks:
-                        if task_data['due_date'] != "No Due Date":
-                            try:
-                                due_date_dt = datetime.strptime(task_data['due_date'], "%Y-%m-%d")
-                                if due_date_dt.year == self.current_year and due_date_dt.month == self.current_month and due_date_dt.day == day_num:
-                                    tasks_on_day.append(task_data)
-                            except ValueError:
-                                pass # Skip malformed dates
-
-                    all_reminders = self.reminders_data.get_user_data(self.current_user, [])
-                    for reminder_data in all_reminders:
-                        try:
-                            reminder_dt = datetime.fromisoformat(reminder_data['datetime'])
-                            if reminder_dt.year == self.current_year and reminder_dt.month == self.current_month and reminder_dt.day == day_num and reminder_data['status'] == 'active':
-                                reminders_on_day.append(reminder_data)
-                        except ValueError:
-                            pass # Skip malformed dates
+                    # Events were bucketed once for the whole visible month
+                    tasks_on_day = month_events.get(day_num, {}).get("tasks", [])
+                    reminders_on_day = month_events.get(day_num, {}).get("reminders", [])
+                    study_on_day = month_events.get(day_num, {}).get("study", [])
+                    reviews_on_day = month_events.get(day_num, {}).get("reviews", 0)
 
                     has_events = False
                     if tasks_on_day or reminders_on_day:
                         has_events = True
                         event_indicator = ctk.CTkLabel(day_frame, text="•", font=("Inter", 20, "bold"), text_color=ACCENT_COLOR_4)
                         event_indicator.pack(side="bottom", pady=(0, 2))
+                    if study_on_day:
+                        ctk.CTkLabel(day_frame, text=f"📖 {len(study_on_day)}", font=FONT_SMALL,
+                                     text_color=ACCENT_COLOR_5).pack(side="bottom")
+                    if reviews_on_day:
+                        ctk.CTkLabel(day_frame, text=f"🔁 {reviews_on_day}", font=FONT_SMALL,
+                                     text_color=ACCENT_COLOR_2).pack(side="bottom")
                     
                     # Make the day clickable to show details
-                    day_frame.bind("<Button-1>", lambda event, day=day_num, tasks=tasks_on_day, reminders=reminders_on_day: self.show_day_details_popup(day, tasks, reminders))
+                    day_frame.bind("<Button-1>", lambda event, day=day_num, tasks=tasks_on_day, reminders=reminders_on_day, study=study_on_day, reviews=reviews_on_day: self.show_day_details_popup(day, tasks, reminders, study, reviews))
 
                 else: # Empty day (from previous/next month)
                     day_frame.configure(fg_color=SHADOW_COLOR) # Differentiate empty cells
                     ctk.CTkLabel(day_frame, text="", fg_color=SHADOW_COLOR).pack(fill="both", expand=True) # Empty label to fill space
             row_offset += 1
 
-    def show_day_details_popup(self, day, tasks, reminders):
+    def get_month_events(self, year, month):
+        """Buckets tasks and reminder occurrences by day for one month.
+
+        Recurring reminders are expanded lazily for just this month.
+        """
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        events = {}
+
+        for day, blocks in self.scheduled_blocks(month_start.date(), month_end.date()).items():
+            events.setdefault(day.day, {"tasks": [], "reminders": []})["study"] = blocks
+
+        # Reviews by due date; overdue ones are shown on today
+        queue = self.spaced_review_queue()
+        today = datetime.now().date()
+        for offset in range((month_end - month_start).days):
+            day = month_start.date() + timedelta(days=offset)
+            count = queue.count_due(day) if day == today else queue.count_on(day) if day > today else 0
+            if count:
+                events.setdefault(day.day, {"tasks": [], "reminders": []})["reviews"] = count
+
+        for task_data in self.tasks_data.get_user_data(self.current_user, []):
+            if task_data['due_date'] != "No Due Date":
+                try:
+                    due_date_dt = datetime.strptime(task_data['due_date'], "%Y-%m-%d")
+                except ValueError:
+                    continue # Skip malformed dates
+                if month_start <= due_date_dt < month_end:
+                    events.setdefault(due_date_dt.day, {"tasks": [], "reminders": []})["tasks"].append(task_data)
+
+        for reminder_data in self.reminders_data.get_user_data(self.current_user, []):
+            if reminder_data['status'] != 'active':
+                continue
+            try:
+                for occurrence in expand_occurrences(reminder_data, month_start, month_end):
+                    occurrence_data = dict(reminder_data, datetime=occurrence.isoformat())
+                    events.setdefault(occurrence.day, {"tasks": [], "reminders": []})["reminders"].append(occurrence_data)
+            except (KeyError, ValueError):
+                pass # Skip malformed dates
+        return events
+
+    def show_day_details_popup(self, day, tasks, reminders, study=(), reviews=0):
         popup_window = ctk.CTkToplevel(self.app)
         popup_window.title(f"Events on {self.current_month_year_label.cget('text')} - Day {day}")
         popup_window.geometry("500x400")
@@ -1978,7 +7272,7 @@ class StudentGuideApp:
         content_frame.pack(padx=20, pady=(0, 15), fill="both", expand=True)
         content_frame.grid_columnconfigure(0, weight=1)
 
-        if not tasks and not reminders:
+        if not tasks and not reminders and not study and not reviews:
             ctk.CTkLabel(content_frame, text="No events scheduled for this day.",
                                      font=FONT_BODY, text_color=TEXT_COLOR).pack(pady=20)
         else:
@@ -1999,6 +7293,20 @@ class StudentGuideApp:
                         reminder_text = f"• {reminder['message']} (Invalid Time)"
                     ctk.CTkLabel(content_frame, text=reminder_text, font=FONT_SMALL, text_color=TEXT_COLOR, wraplength=400, justify="left").pack(anchor="w", padx=20, pady=2)
 
+            if study:
+                ctk.CTkLabel(content_frame, text="Study Blocks:", font=FONT_SMALL_BOLD, text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=(10, 5))
+                for start, plan in study:
+                    study_text = f"• {start.strftime('%H:%M')} {plan['subject']}: {plan['topic']}"
+                    ctk.CTkLabel(content_frame, text=study_text, font=FONT_SMALL, text_color=TEXT_COLOR, wraplength=400, justify="left").pack(anchor="w", padx=20, pady=2)
+
+            if reviews:
+                ctk.CTkLabel(content_frame, text="Reviews:", font=FONT_SMALL_BOLD, text_color=HEADER_TEXT_COLOR).pack(anchor="w", padx=10, pady=(10, 5))
+                ctk.CTkLabel(content_frame, text=f"• {reviews} doubt(s)/topic(s) due for review", font=FONT_SMALL,
+                             text_color=TEXT_COLOR).pack(anchor="w", padx=20, pady=2)
+                ctk.CTkButton(content_frame, text="Review Now", command=lambda: (popup_window.destroy(), self.review_now()),
+                              fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR, text_color=BUTTON_TEXT_COLOR,
+                              font=FONT_BUTTON, corner_radius=10).pack(anchor="w", padx=20, pady=5)
+
         ctk.CTkButton(popup_window, text="Close", command=popup_window.destroy,
                       fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
                       text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).pack(pady=10)
@@ -2022,7 +7330,7 @@ class StudentGuideApp:
     def reminder_system(self):
         win = ctk.CTkToplevel(self.dash)
         win.title("Reminder System")
-        win.geometry("600x600")
+        win.geometry("600x750")
         win.configure(fg_color=BG_COLOR)
         win.transient(self.dash)
         win.grab_set()
@@ -2057,9 +7365,31 @@ class StudentGuideApp:
                                                  corner_radius=8, border_color=SHADOW_COLOR, border_width=1)
         self.reminder_time_entry.grid(row=3, column=1, sticky="ew", padx=(10,0), pady=(0, 10))
 
+        # Recurrence options
+        ctk.CTkLabel(input_frame, text="Repeat:", text_color=TEXT_COLOR, font=FONT_BODY).grid(row=4, column=0, sticky="w", pady=(0, 5))
+        self.reminder_repeat_optionmenu = ctk.CTkOptionMenu(input_frame, values=REMINDER_REPEAT_OPTIONS,
+                                                             fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                                             text_color=BUTTON_TEXT_COLOR,
+                                                             dropdown_fg_color=BUTTON_HOVER_COLOR,
+                                                             dropdown_hover_color=SHADOW_COLOR)
+        self.reminder_repeat_optionmenu.set("Once")
+        self.reminder_repeat_optionmenu.grid(row=5, column=0, sticky="ew", pady=(0, 10))
+
+        ctk.CTkLabel(input_frame, text="Until (YYYY-MM-DD, Optional):", text_color=TEXT_COLOR, font=FONT_BODY).grid(row=4, column=1, sticky="w", padx=(10,0), pady=(0, 5))
+        self.reminder_until_entry = ctk.CTkEntry(input_frame, placeholder_text="e.g., 2025-12-31",
+                                                  fg_color="#f3f4f6", text_color=TEXT_COLOR, font=FONT_BODY,
+                                                  corner_radius=8, border_color=SHADOW_COLOR, border_width=1)
+        self.reminder_until_entry.grid(row=5, column=1, sticky="ew", padx=(10,0), pady=(0, 10))
+
+        ctk.CTkLabel(input_frame, text="Weekly on (e.g., Mon, Wed):", text_color=TEXT_COLOR, font=FONT_BODY).grid(row=6, column=0, columnspan=2, sticky="w", pady=(0, 5))
+        self.reminder_days_entry = ctk.CTkEntry(input_frame, placeholder_text="Leave empty to repeat on the start day",
+                                                 fg_color="#f3f4f6", text_color=TEXT_COLOR, font=FONT_BODY,
+                                                 corner_radius=8, border_color=SHADOW_COLOR, border_width=1)
+        self.reminder_days_entry.grid(row=7, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+
         ctk.CTkButton(input_frame, text="Set Reminder", fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
-                                 command=self.add_reminder).grid(row=4, column=0, columnspan=2, pady=5, sticky="w")
+                                 command=self.add_reminder).grid(row=8, column=0, columnspan=2, pady=5, sticky="w")
 
         ctk.CTkLabel(frame, text="Your Reminders:", font=("Inter", 18, "bold"), text_color=HEADER_TEXT_COLOR).pack(pady=(20, 10))
 
@@ -2080,7 +7410,8 @@ class StudentGuideApp:
                                  text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10,
                                  command=self.delete_selected_reminders).grid(row=0, column=0, padx=5, sticky="ew")
 
-        self.refresh_reminder_list()
+        self.bind_record_list(self.reminder_scroll_frame, self.reminders_data, self.build_reminder_row,
+                              "No reminders set yet! Add a new reminder.")
 
     def add_reminder(self):
         message = self.reminder_message_entry.get().strip()
@@ -2099,82 +7430,102 @@ class StudentGuideApp:
             messagebox.showerror("Input Error", "Date must be in YYYY-MM-DD and Time HH:MM (24-hour format).", icon="error")
             return
 
+        # Optional recurrence rule
+        repeat = self.reminder_repeat_optionmenu.get()
+        until_str = self.reminder_until_entry.get().strip()
+        recurrence = None
+        if repeat != "Once":
+            if until_str:
+                try:
+                    datetime.strptime(until_str, "%Y-%m-%d")
+                except ValueError:
+                    messagebox.showerror("Input Error", "Until date must be in YYYY-MM-DD format.", icon="error")
+                    return
+            recurrence = {"freq": repeat.lower(), "until": until_str}
+            if repeat == "Weekly":
+                try:
+                    days = parse_weekdays(self.reminder_days_entry.get())
+                except ValueError as e:
+                    messagebox.showerror("Input Error", f"{e}. Use day names like Mon, Wed, Fri.", icon="error")
+                    return
+                recurrence["days"] = days or [reminder_datetime.weekday()]
+
         # Generate a unique ID for the reminder
         reminder_id = str(uuid.uuid4())
 
-        reminders = self.reminders_data.get_user_data(self.current_user, [])
-        reminders.append({
+        reminder = {
             "id": reminder_id,
             "message": message,
             "datetime": reminder_datetime.isoformat(), # Store as ISO format string
-            "status": "active" # New status: 'active' or 'dismissed'
-        })
+            "status": "active", # New status: 'active' or 'dismissed'
+            "recurrence": recurrence,
+            "modified_at": datetime.now().isoformat()
+        }
+        if recurrence:
+            # Materialize only the first real occurrence of the series
+            first = next_occurrence(reminder, reminder_datetime - timedelta(microseconds=1))
+            if first is None:
+                messagebox.showerror("Input Error", "This repeat rule has no occurrences before the until date.", icon="error")
+                return
+            reminder["datetime"] = first.isoformat()
+
+        reminders = self.reminders_data.get_user_data(self.current_user, [])
+        reminders.append(reminder)
         self.reminders_data.set_user_data(self.current_user, reminders)
 
         self.reminder_message_entry.delete(0, "end")
         self.reminder_date_entry.delete(0, "end")
         self.reminder_time_entry.delete(0, "end")
-        self.refresh_reminder_list()
+        self.reminder_until_entry.delete(0, "end")
+        self.reminder_days_entry.delete(0, "end")
+        self.reminder_repeat_optionmenu.set("Once")
         messagebox.showinfo("Success", "Reminder set successfully!", icon="info")
 
-    def refresh_reminder_list(self):
-        for widget in self.reminder_scroll_frame.winfo_children():
-            widget.destroy()
-
-        reminders = self.reminders_data.get_user_data(self.current_user, [])
-        if not reminders:
-            ctk.CTkLabel(self.reminder_scroll_frame, text="No reminders set yet! Add a new reminder.", text_color=TEXT_COLOR, font=FONT_BODY).pack(pady=20)
-            return
-
-        for i, reminder_data in enumerate(reminders):
-            reminder_frame = ctk.CTkFrame(self.reminder_scroll_frame, fg_color=BG_COLOR, corner_radius=8,
-                                          border_width=1, border_color=SHADOW_COLOR)
-            reminder_frame.pack(fill="x", pady=5, padx=5)
-            reminder_frame.grid_columnconfigure(1, weight=1)
-
-            checkbox = ctk.CTkCheckBox(reminder_frame, text="", fg_color=BUTTON_BG_COLOR,
-                                         hover_color=BUTTON_HOVER_COLOR,
-                                         checkmark_color=BUTTON_TEXT_COLOR,
-                                         border_color=BUTTON_BG_COLOR, border_width=2,
-                                         command=lambda idx=i: self.toggle_reminder_selection(idx))
-            checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
-            if reminder_data.get('selected_for_action', False):
-                checkbox.select()
-            else:
-                checkbox.deselect()
-            
-            # Display time in a readable format
-            try:
-                dt_obj = datetime.fromisoformat(reminder_data['datetime'])
-                display_time = dt_obj.strftime("%Y-%m-%d %H:%M")
-            except ValueError:
-                display_time = "Invalid Date/Time"
-
-            status_color = ACCENT_COLOR_1 if reminder_data['status'] == "dismissed" else ACCENT_COLOR_3
-            if reminder_data['status'] == "dismissed":
-                text_content = f"<s>[{display_time}] {reminder_data['message']}</s>"
-            else:
-                text_content = f"[{display_time}] {reminder_data['message']}"
-
-            reminder_text_label = ctk.CTkLabel(reminder_frame, text=text_content,
-                                               font=FONT_BODY, text_color=TEXT_COLOR)
-            if reminder_data['status'] == "dismissed":
-                reminder_text_label.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
-            else:
-                reminder_text_label.configure(text_color=TEXT_COLOR, font=FONT_BODY)
-            reminder_text_label.grid(row=0, column=1, sticky="w", padx=(0, 10))
-
-            status_label = ctk.CTkLabel(reminder_frame, text=reminder_data['status'].capitalize(),
-                                         font=FONT_SMALL_BOLD, text_color=status_color)
-            status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+    def build_reminder_row(self, parent, reminder_data):
+        reminder_frame = ctk.CTkFrame(parent, fg_color=BG_COLOR, corner_radius=8,
+                                      border_width=1, border_color=SHADOW_COLOR)
+        reminder_frame.grid_columnconfigure(1, weight=1)
+
+        checkbox = ctk.CTkCheckBox(reminder_frame, text="", fg_color=BUTTON_BG_COLOR,
+                                     hover_color=BUTTON_HOVER_COLOR,
+                                     checkmark_color=BUTTON_TEXT_COLOR,
+                                     border_color=BUTTON_BG_COLOR, border_width=2,
+                                     command=lambda record_id=reminder_data['id']: self.toggle_record_selection(self.reminders_data, record_id))
+        checkbox.grid(row=0, column=0, padx=(10, 5), pady=10, sticky="w")
+        if reminder_data.get('selected_for_action', False):
+            checkbox.select()
+        else:
+            checkbox.deselect()
+        
+        # Display time in a readable format
+        try:
+            dt_obj = datetime.fromisoformat(reminder_data['datetime'])
+            display_time = dt_obj.strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            display_time = "Invalid Date/Time"
 
+        status_color = ACCENT_COLOR_1 if reminder_data['status'] == "dismissed" else ACCENT_COLOR_3
+        if reminder_data['status'] == "dismissed":
+            text_content = f"<s>[{display_time}] {reminder_data['message']}</s>"
+        else:
+            text_content = f"[{display_time}] {reminder_data['message']}"
+        if reminder_data.get('recurrence'):
+            text_content += f" (repeats {describe_recurrence(reminder_data['recurrence'])})"
+        if reminder_data.get('snoozed_until') and reminder_data['status'] == "active":
+            text_content += f" - snoozed until {reminder_due_time(reminder_data).strftime('%H:%M')}"
+
+        reminder_text_label = ctk.CTkLabel(reminder_frame, text=text_content,
+                                           font=FONT_BODY, text_color=TEXT_COLOR)
+        if reminder_data['status'] == "dismissed":
+            reminder_text_label.configure(text_color="gray", font=(FONT_BODY[0], FONT_BODY[1], "overstrike"))
+        else:
+            reminder_text_label.configure(text_color=TEXT_COLOR, font=FONT_BODY)
+        reminder_text_label.grid(row=0, column=1, sticky="w", padx=(0, 10))
 
-    def toggle_reminder_selection(self, index):
-        reminders = self.reminders_data.get_user_data(self.current_user, [])
-        if 0 <= index < len(reminders):
-            reminders[index]['selected_for_action'] = not reminders[index].get('selected_for_action', False)
-            self.reminders_data.set_user_data(self.current_user, reminders)
-            self.refresh_reminder_list()
+        status_label = ctk.CTkLabel(reminder_frame, text=reminder_data['status'].capitalize(),
+                                     font=FONT_SMALL_BOLD, text_color=status_color)
+        status_label.grid(row=0, column=2, padx=(0, 10), sticky="e")
+        return reminder_frame
 
     def delete_selected_reminders(self):
         reminders = self.reminders_data.get_user_data(self.current_user, [])
@@ -2191,7 +7542,6 @@ class StudentGuideApp:
             return
 
         self.reminders_data.set_user_data(self.current_user, reminders_to_keep)
-        self.refresh_reminder_list()
         messagebox.showinfo("Success", f"{deleted_count} reminder(s) deleted successfully!", icon="info")
         
         # Also remove from active_reminders if deleted
@@ -2226,7 +7576,7 @@ class StudentGuideApp:
             if reminder['status'] == 'active':
                 reminder_id = reminder['id']
                 try:
-                    reminder_time = datetime.fromisoformat(reminder['datetime'])
+                    reminder_time = reminder_due_time(reminder) # Honors snoozes
                     # Check if reminder time is in the past or now
                     if reminder_time <= now and reminder_id not in self.active_reminders:
                         self.active_reminders[reminder_id] = reminder # Add to active
@@ -2236,10 +7586,10 @@ class StudentGuideApp:
                     # Optionally, mark this reminder as invalid or dismissed if parsing fails
 
     def show_reminder_popup(self, reminder_data):
-        winsound.Beep(2500, 500) # Play a buzzing sound
+        self.sound_player.play() # Play a buzzing sound without blocking
         popup_window = ctk.CTkToplevel(self.app)
         popup_window.title("Reminder!")
-        popup_window.geometry("400x180")
+        popup_window.geometry("400x260")
         popup_window.configure(fg_color=ACCENT_COLOR_4)
         popup_window.transient(self.app)
         popup_window.grab_set()
@@ -2253,19 +7603,95 @@ class StudentGuideApp:
                 current_reminders = self.reminders_data.get_user_data(self.current_user, [])
                 for r in current_reminders:
                     if r['id'] == reminder_data['id']:
-                        r['status'] = 'dismissed'
+                        self.advance_reminder(r)
                         break
                 self.reminders_data.set_user_data(self.current_user, current_reminders)
                 del self.active_reminders[reminder_data['id']]
             popup_window.destroy()
-            self.refresh_reminder_list() # Refresh the list to show dismissed status
 
-        ctk.CTkButton(popup_window, text="Dismiss", command=dismiss_reminder,
+        def snooze_reminder():
+            minutes = int(snooze_optionmenu.get().split()[0])
+            if reminder_data['id'] in self.active_reminders:
+                current_reminders = self.reminders_data.get_user_data(self.current_user, [])
+                for r in current_reminders:
+                    if r['id'] == reminder_data['id']:
+                        r['snoozed_until'] = (datetime.now() + timedelta(minutes=minutes)).isoformat()
+                        stamp_record(r)
+                        break
+                self.reminders_data.set_user_data(self.current_user, current_reminders)
+                del self.active_reminders[reminder_data['id']] # Let the checker fire it again
+            popup_window.destroy()
+
+        action_frame = ctk.CTkFrame(popup_window, fg_color="transparent")
+        action_frame.pack(pady=10)
+
+        ctk.CTkButton(action_frame, text="Dismiss", command=dismiss_reminder,
                          fg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
-                          text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).pack(pady=10)
+                          text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).grid(row=0, column=0, columnspan=2, pady=(0, 10))
+
+        snooze_optionmenu = ctk.CTkOptionMenu(action_frame, values=SNOOZE_OPTIONS, width=100,
+                                              fg_color=BUTTON_BG_COLOR, button_color=BUTTON_BG_COLOR,
+                                              text_color=BUTTON_TEXT_COLOR,
+                                              dropdown_fg_color=BUTTON_HOVER_COLOR)
+        snooze_optionmenu.set(SNOOZE_OPTIONS[0])
+        snooze_optionmenu.grid(row=1, column=0, padx=5)
+        ctk.CTkButton(action_frame, text="Snooze", command=snooze_reminder, width=100,
+                      fg_color=ACCENT_COLOR_3, hover_color="#f0ad4e",
+                      text_color=BUTTON_TEXT_COLOR, font=FONT_BUTTON, corner_radius=10).grid(row=1, column=1, padx=5)
         
         popup_window.protocol("WM_DELETE_WINDOW", dismiss_reminder) # Dismiss reminder if window is closed by user
 
+    def advance_reminder(self, reminder):
+        """Dismisses a one-shot reminder, or moves a recurring one to its next occurrence."""
+        reminder.pop('snoozed_until', None)
+        stamp_record(reminder)
+        try:
+            current = datetime.fromisoformat(reminder['datetime'])
+            # Occurrences missed while the app was closed are skipped, not replayed
+            upcoming = next_occurrence(reminder, max(current, datetime.now())) if reminder.get('recurrence') else None
+        except ValueError:
+            upcoming = None
+        if upcoming:
+            reminder['datetime'] = upcoming.isoformat()
+            reminder['status'] = 'active'
+        else:
+            reminder['status'] = 'dismissed'
+
 if __name__ == "__main__":
-    app = StudentGuideApp()
+    parser = argparse.ArgumentParser(description="EduMind - Digital Guardian for Students")
+    parser.add_argument("--cohort-report", action="store_true",
+                        help="print per-course and per-section aggregates instead of starting the app")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached cohort report")
+    parser.add_argument("--max-age", type=int, default=COHORT_REPORT_MAX_AGE_MINUTES,
+                        help="minutes a cached cohort report stays fresh")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for the cohort report")
+    parser.add_argument("--json", action="store_true", help="print the cohort report as JSON")
+    parser.add_argument("--benchmark-kdf", nargs="?", type=int, const=KDF_BENCHMARK_TARGET_MS, metavar="TARGET_MS",
+                        help="time password hashing on this machine and suggest PASSWORD_ITERATIONS")
+    parser.add_argument("--server", action="store_true", help="run the shared store server instead of the app")
+    parser.add_argument("--host", default=SERVER_DEFAULT_HOST, help="address the store server listens on")
+    parser.add_argument("--port", type=int, default=SERVER_DEFAULT_PORT, help="port the store server listens on")
+    parser.add_argument("--data-dir", default=".", help="folder with the JSON files the store server owns")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="use a store server instead of local JSON files")
+    parser.add_argument("--promote-admin", metavar="USER",
+                        help="let USER open the Cohort Report (edits users.json in --data-dir; stop the store server first)")
+    args = parser.parse_args()
+
+    if args.benchmark_kdf:
+        benchmark_kdf(args.benchmark_kdf)
+    elif args.promote_admin:
+        promote_admin(args.promote_admin, args.data_dir)
+    elif args.cohort_report:
+        run_cohort_report_cli(args)
+    elif args.server:
+        run_store_server(args)
+    elif args.connect:
+        host, _, port = args.connect.rpartition(":")
+        try:
+            client = StoreClient(host or SERVER_DEFAULT_HOST, int(port))
+        except (OSError, ValueError) as e:
+            sys.exit(f"Could not connect to the store server at {args.connect}: {e}")
+        app = StudentGuideApp(store_client=client)
+    else:
+        app = StudentGuideApp()
 
@@ -0,0 +1,170 @@
+"""Load test for the EduMind store server (python final.py --server).
+
+Opens many concurrent client connections, each pipelining a mix of get, set and batch
+requests, and reports throughput and latency percentiles. With --spawn a throwaway server
+is started on a temporary data folder and stopped again afterwards. Each load user is
+registered and logged in once before the clock starts; its connections join that session.
+
+    python load_test.py --spawn --clients 300 --seconds 10
+    python load_test.py --host 10.0.0.5 --port 8765 --clients 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+COLLECTIONS = ["tasks", "reminders", "moods", "timer_history", "plans"]
+PASSWORD = "load-test-password"
+
+
+def sample_value(collection, size):
+    """A list of records roughly shaped like the app's own data for one user."""
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+    if collection == "moods":
+        return [{"mood": "Happy", "notes": "", "timestamp": now} for _ in range(size)]
+    if collection == "timer_history":
+        return [{"type": "Pomodoro", "duration_minutes": 25, "timestamp": now} for _ in range(size)]
+    return [{"id": f"{collection}-{i}", "task": f"Item {i}", "due_date": "2025-06-20", "status": "Pending"}
+            for i in range(size)]
+
+
+async def call(reader, writer, request):
+    writer.write((json.dumps(request) + "\n").encode("utf-8"))
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def log_in(args, user):
+    """Registers `user` if needed and returns a session token."""
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        await call(reader, writer, {"op": "register", "user": user, "password": PASSWORD}) # Fails harmlessly if it exists
+        response = await call(reader, writer, {"op": "login", "user": user, "password": PASSWORD})
+        if not response.get("ok"):
+            raise RuntimeError(f"Login failed for {user}: {response.get('error')}")
+        return response["value"]["token"]
+    finally:
+        writer.close()
+
+
+async def run_client(index, args, deadline, latencies, errors, tokens):
+    reader, writer = await asyncio.open_connection(args.host, args.port, limit=64 * 1024 * 1024)
+    user = f"load_user_{index % args.users}"
+    response = await call(reader, writer, {"op": "resume", "token": tokens[user]})
+    if not response.get("ok"):
+        raise RuntimeError(f"Could not join the session of {user}: {response.get('error')}")
+    rng = random.Random(index)
+    in_flight = asyncio.Semaphore(args.pipeline)
+    sent_at = asyncio.Queue()
+    next_id = 0
+
+    async def read_responses():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            started = await sent_at.get()
+            latencies.append(time.perf_counter() - started)
+            if not json.loads(line).get("ok"):
+                errors.append(line)
+            in_flight.release()
+
+    reader_task = asyncio.create_task(read_responses())
+    while time.perf_counter() < deadline:
+        await in_flight.acquire()
+        collection = rng.choice(COLLECTIONS)
+        roll = rng.random()
+        if roll < args.write_ratio:
+            request = {"op": "set", "collection": collection, "user": user,
+                       "value": sample_value(collection, args.records)}
+        elif roll < args.write_ratio + args.batch_ratio:
+            request = {"op": "batch", "ops": [{"op": "get", "collection": name, "user": user} for name in COLLECTIONS]}
+        else:
+            request = {"op": "get", "collection": collection, "user": user}
+        next_id += 1
+        request["id"] = next_id
+        await sent_at.put(time.perf_counter())
+        writer.write((json.dumps(request) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    for _ in range(args.pipeline): # Wait for the last responses
+        await in_flight.acquire()
+    reader_task.cancel()
+    writer.close()
+
+
+async def run_load(args):
+    users = [f"load_user_{i}" for i in range(min(args.users, args.clients))]
+    tokens = dict(zip(users, await asyncio.gather(*(log_in(args, user) for user in users))))
+    deadline = time.perf_counter() + args.seconds
+    latencies, errors = [], []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_client(i, args, deadline, latencies, errors, tokens) for i in range(args.clients)),
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    failed = [result for result in results if isinstance(result, Exception)]
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    print(f"clients: {args.clients}  pipeline depth: {args.pipeline}  duration: {elapsed:.1f} s")
+    print(f"requests: {len(latencies)}  throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency ms  p50: {percentile(0.50):.2f}  p95: {percentile(0.95):.2f}  p99: {percentile(0.99):.2f}  "
+          f"max: {percentile(1.0):.2f}")
+    print(f"error responses: {len(errors)}  failed clients: {len(failed)}")
+    for failure in failed[:3]:
+        print(f"  {type(failure).__name__}: {failure}")
+    return 1 if errors or failed else 0
+
+
+def wait_for_port(host, port, timeout=10):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=200, help="concurrent connections")
+    parser.add_argument("--users", type=int, default=50, help="distinct users the clients act as")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--pipeline", type=int, default=4, help="requests in flight per connection")
+    parser.add_argument("--records", type=int, default=20, help="records per value written")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--batch-ratio", type=float, default=0.1)
+    parser.add_argument("--spawn", action="store_true", help="start a server on a temporary data folder")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        data_dir = tempfile.mkdtemp(prefix="edumind_load_")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "final.py")
+        server = subprocess.Popen([sys.executable, script, "--server", "--host", args.host,
+                                   "--port", str(args.port), "--data-dir", data_dir])
+        if not wait_for_port(args.host, args.port):
+            server.kill()
+            sys.exit("The store server did not start.")
+    try:
+        sys.exit(asyncio.run(run_load(args)))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
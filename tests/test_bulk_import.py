@@ -0,0 +1,60 @@
+"""Bulk import of tasks, plans and reminders from CSV and iCalendar files."""
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8", newline="")
+    return str(path)
+
+
+def test_csv_rows_become_records_and_bad_rows_keep_their_line(tmp_path):
+    path = write(tmp_path, "plan.csv",
+                 "Kind,Title,Subject,Topic,Date,Time,Status\n"
+                 "task,Essay draft,,,2025-06-20,,completed\n"
+                 "plan,,Math,Integrals,2025-06-22,,in progress\n"
+                 "reminder,Exam,,,2025-06-25,08:30,\n"
+                 "task,Broken date,,,2025-13-01,,\n"
+                 "reminder,No time,,,2025-06-25,,\n"
+                 "homework,Unknown,,,,,\n")
+    importer = final.BulkImporter()
+    importer.import_file(path)
+
+    assert [(t["task"], t["due_date"], t["status"]) for t in importer.tasks] == [("Essay draft", "2025-06-20", "Completed")]
+    assert [(p["subject"], p["topic"], p["status"]) for p in importer.plans] == [("Math", "Integrals", "In Progress")]
+    assert [(r["message"], r["datetime"]) for r in importer.reminders] == [("Exam", "2025-06-25T08:30:00")]
+    assert [line for line, _ in importer.errors] == [5, 6, 7]
+    assert importer.count == 3
+    assert all("id" in record and "modified_at" in record for record in importer.tasks + importer.plans)
+
+
+def test_csv_without_kind_column_is_rejected(tmp_path):
+    importer = final.BulkImporter()
+    importer.import_file(write(tmp_path, "bad.csv", "title,date\nEssay,2025-06-20\n"))
+    assert importer.count == 0 and importer.errors == [(1, "CSV header must contain a 'kind' column")]
+
+
+def test_ics_components_map_to_kinds(tmp_path):
+    path = write(tmp_path, "cal.ics", "\r\n".join([
+        "BEGIN:VCALENDAR",
+        "BEGIN:VTODO", "SUMMARY:Read chapter 4\\, carefully", "DUE;VALUE=DATE:20250620", "STATUS:COMPLETED", "END:VTODO",
+        "BEGIN:VEVENT", "SUMMARY:Integrals", "CATEGORIES:Math", "DTSTART;VALUE=DATE:20250622", "END:VEVENT",
+        "BEGIN:VEVENT", "SUMMARY:Lab report with a very long title that the calendar app folded onto a se",
+        " cond line", "DTSTART;VALUE=DATE:20250623", "END:VEVENT",
+        "BEGIN:VEVENT", "SUMMARY:Seminar", "DTSTART:20250624T141500", "END:VEVENT",
+        "BEGIN:VEVENT", "SUMMARY:Broken", "DTSTART:2025XX24", "END:VEVENT",
+        "END:VCALENDAR", ""]))
+    importer = final.BulkImporter()
+    importer.import_file(path)
+
+    assert [(t["task"], t["status"]) for t in importer.tasks] == [("Read chapter 4, carefully", "Completed")]
+    assert [(p["subject"], p["topic"], p["due_date"]) for p in importer.plans] == [("Math", "Integrals", "2025-06-22")]
+    assert [(r["message"], r["datetime"]) for r in importer.reminders] == [
+        ("Lab report with a very long title that the calendar app folded onto a second line",
+         f"2025-06-23T{final.DEFAULT_REMINDER_TIME}:00"),
+        ("Seminar", "2025-06-24T14:15:00")]
+    assert importer.errors == [(21, "Invalid date '2025XX24'")]
+
@@ -0,0 +1,82 @@
+"""Streaming data export (DataExporter) and doubt archives."""
+import csv
+import json
+import threading
+import zipfile
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def collections(log=None):
+    """(name, count, iterator) triples; `log` records when each task is produced."""
+    profile = [{"name": "Alice", "email": "a@example.com", "password_hash": "secret"}]
+    tasks = [{"task": f"Task {i}", "status": "Pending", "selected_for_action": True} for i in range(3)]
+
+    def produce():
+        for task in tasks:
+            if log is not None:
+                log.append(task["task"])
+            yield task
+    return [("profile", 1, iter(profile)), ("tasks", len(tasks), produce())]
+
+
+def test_ndjson_drops_private_fields(tmp_path):
+    path = tmp_path / "out.ndjson"
+    assert final.DataExporter(collections()).export(str(path), "NDJSON") == 4
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines[0] == {"collection": "profile", "record": {"name": "Alice", "email": "a@example.com"}}
+    assert [line["record"] for line in lines[1:]] == [{"task": f"Task {i}", "status": "Pending"} for i in range(3)]
+
+
+def test_zip_has_one_csv_per_collection_and_written_counts(tmp_path):
+    path = tmp_path / "out.zip"
+    final.DataExporter(collections()).export(str(path), "Zip bundle")
+    with zipfile.ZipFile(path) as bundle:
+        assert json.loads(bundle.read("manifest.json"))["counts"] == {"profile": 1, "tasks": 3}
+        rows = list(csv.DictReader(bundle.read("tasks.csv").decode("utf-8").splitlines()))
+    assert [row["task"] for row in rows] == ["Task 0", "Task 1", "Task 2"]
+
+
+def test_records_are_produced_only_as_they_are_written(tmp_path):
+    log, seen = [], []
+    exporter = final.DataExporter(collections(log))
+    assert exporter.total == 4 and log == [] # Counts come without touching the records
+    real_tick = exporter._tick
+    def tick():
+        seen.append(len(log))
+        real_tick()
+    exporter._tick = tick
+    exporter.export(str(tmp_path / "out.csv"), "CSV")
+    assert seen == [0, 1, 2, 3] # The n-th task is produced right before it is written
+
+
+def test_progress_and_cancel(tmp_path, monkeypatch):
+    monkeypatch.setattr(final, "EXPORT_PROGRESS_EVERY", 2)
+    cancel, progress = threading.Event(), []
+    def on_progress(done, total):
+        progress.append((done, total))
+        cancel.set()
+    exporter = final.DataExporter(collections(), progress_callback=on_progress, cancel_event=cancel)
+    assert exporter.export(str(tmp_path / "out.ndjson"), "NDJSON") == 2
+    assert progress == [(2, 4)]
+
+
+def test_doubt_archive_takes_doubts_one_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(final, "EXPORT_PROGRESS_EVERY", 2)
+    drawn = []
+    def doubts():
+        for i, title in enumerate(("Entropy?", "Entropy?", "Limits")):
+            drawn.append(i)
+            yield {"id": str(i), "title": title, "description": f"Question {i}", "status": "Unresolved"}
+    progress = []
+    path = str(tmp_path / "doubts.zip")
+    assert final.write_doubt_archive(path, doubts(), "ZIP", total=5,
+                                     progress_callback=lambda done, total: progress.append((done, total))) == 3
+    assert drawn == [0, 1, 2] and progress == [(2, 5)]
+    with zipfile.ZipFile(path) as archive:
+        assert sorted(archive.namelist()) == ["doubts/Entropy.txt", "doubts/Entropy_2.txt", "doubts/Limits.txt"]
+        assert final.parse_doubt_text(archive.read("doubts/Limits.txt").decode()) == \
+            {"title": "Limits", "description": "Question 2", "status": "Unresolved"}
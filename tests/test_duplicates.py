@@ -0,0 +1,79 @@
+"""Near-duplicate doubts: MinHash signatures and the LSH index that finds them."""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def signature(title, description=""):
+    return final.ensure_doubt_signature({"title": title, "description": description})
+
+
+def test_rewordings_are_similar_and_unrelated_questions_are_not():
+    entropy = signature("Why does entropy increase?", "In an isolated system entropy always increases")
+    reworded = signature("why is entropy always increasing", "entropy increases in isolated systems")
+    unrelated = signature("How do I invert a matrix?", "Gaussian elimination steps for a 3x3 matrix")
+    assert final.signature_similarity(entropy, reworded) >= final.DUPLICATE_SIMILARITY
+    assert final.signature_similarity(entropy, unrelated) < final.DUPLICATE_SIMILARITY
+    assert final.signature_similarity(entropy, entropy) == 1
+
+
+def test_signature_is_stored_once_and_empty_text_has_none():
+    doubt = {"title": "Why does entropy increase?", "description": ""}
+    first = final.ensure_doubt_signature(doubt)
+    stored = doubt["minhash"]
+    doubt["title"] = "Something else entirely" # A stored signature is reused as is
+    assert final.ensure_doubt_signature(doubt) == first and doubt["minhash"] == stored
+    assert final.ensure_doubt_signature({"title": "", "description": "  "}) is None
+    # Only stop words: the words themselves are used rather than nothing
+    assert final.ensure_doubt_signature({"title": "Why is it?", "description": ""}) is not None
+
+
+def test_index_finds_the_near_duplicate_but_not_distinct_text():
+    index = final.MinHashIndex()
+    index.add("entropy", signature("Why does entropy increase?", "In an isolated system entropy always increases"))
+    index.add("matrix", signature("How do I invert a matrix?", "Gaussian elimination steps for a 3x3 matrix"))
+    index.add("empty", None)
+
+    matches = index.query(signature("why is entropy always increasing", "entropy increases in isolated systems"))
+    assert [record_id for _, record_id in matches] == ["entropy"]
+    assert index.query(signature("What is a linked list?", "Pointers from node to node")) == []
+    assert index.query(None) == []
+
+    index.remove("entropy")
+    assert index.query(signature("Why does entropy increase?", "In an isolated system entropy always increases")) == []
+    assert all("entropy" not in bucket for buckets in index.bands for bucket in buckets.values())
+
+
+def test_duplicate_groups_link_similar_doubts():
+    index = final.MinHashIndex()
+    for record_id, title in (("a", "Why does entropy increase in an isolated system"),
+                             ("b", "why does entropy increase in isolated systems"),
+                             ("c", "How do I invert a 3x3 matrix by hand")):
+        index.add(record_id, signature(title))
+    assert [sorted(group) for group in index.duplicate_groups()] == [["a", "b"]]
+
+
+def test_cancelled_duplicate_leaves_no_description_body(tmp_path, monkeypatch):
+    bodies = final.TextBlobStore(str(tmp_path / "bodies"))
+    existing = {"id": "1", "title": "Why does entropy increase?", "status": "Unresolved",
+                "description": "entropy " * 60}
+    index = final.MinHashIndex()
+    index.add("1", final.ensure_doubt_signature(existing))
+    saved = []
+    app = SimpleNamespace(
+        current_user="alice", doubt_bodies=bodies, doubt_duplicate_index=lambda: index,
+        doubt_title_entry=SimpleNamespace(get=lambda: existing["title"]),
+        doubt_desc_textbox=SimpleNamespace(get=lambda start, end: existing["description"]),
+        doubt_status_optionmenu=SimpleNamespace(get=lambda: "Unresolved"),
+        doubts_data=SimpleNamespace(get_user_data=lambda user, default: [existing],
+                                    set_user_data=lambda user, value: saved.append(value)))
+    monkeypatch.setattr(final.messagebox, "askyesno", lambda *args, **kwargs: False)
+    monkeypatch.setattr(final.messagebox, "showerror", lambda *args, **kwargs: pytest.fail("unexpected error"))
+
+    final.StudentGuideApp.add_doubt(app)
+    assert saved == []
+    assert not os.path.exists(bodies.folder)
@@ -0,0 +1,72 @@
+"""Heatmap day values and cell colors."""
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+class Moods:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get_user_data(self, username, default=None):
+        return self.entries
+
+
+def app_with(history, moods):
+    """Just the attributes StudentGuideApp.heatmap_day_values reads."""
+    rollups = final.build_timer_rollups(history)
+    return SimpleNamespace(get_timer_rollups=lambda: rollups, moods_data=Moods(moods),
+                           current_user="alice", _heatmap_values={})
+
+
+def test_day_values_sum_focus_types_and_keep_the_last_mood():
+    history = [{"type": "Pomodoro", "duration_minutes": 25, "timestamp": "2025-06-20T09:00:00"},
+               {"type": "My Timer", "duration_minutes": 40, "timestamp": "2025-06-20T14:00:00"},
+               {"type": "Break", "duration_minutes": 5, "timestamp": "2025-06-20T09:25:00"},
+               {"type": "Break", "duration_minutes": 5, "timestamp": "2025-06-21T09:25:00"}]
+    moods = [{"mood": "Okay 😐", "timestamp": "2025-06-20T08:00:00"},
+             {"mood": "Happy 😄", "timestamp": "2025-06-20T21:00:00"},
+             {"mood": "Good 😊", "timestamp": ""}]
+    focus, mood = final.StudentGuideApp.heatmap_day_values(app_with(history, moods))
+    assert focus == {"2025-06-20": 65, "2025-06-21": 0}
+    assert mood == {"2025-06-20": "Happy 😄"}
+
+
+def test_day_values_are_cached_until_a_history_grows():
+    app = app_with([], [])
+    focus, _ = final.StudentGuideApp.heatmap_day_values(app)
+    assert final.StudentGuideApp.heatmap_day_values(app)[0] is focus
+    app.moods_data.entries = [{"mood": "Good 😊", "timestamp": "2025-06-22T10:00:00"}]
+    assert final.StudentGuideApp.heatmap_day_values(app)[1] == {"2025-06-22": "Good 😊"}
+
+
+def heatmap(mode, focus=None, moods=None):
+    chart = object.__new__(final.StudyHeatmap) # No canvas needed for colors
+    chart.mode, chart.focus_by_day, chart.mood_by_day = mode, focus or {}, moods or {}
+    return chart
+
+
+def test_focus_colors_step_at_the_thresholds():
+    chart = heatmap("Focus minutes", {"a": 10, "b": 25, "c": 99, "d": 100, "e": 0})
+    assert [chart.cell_color(day) for day in "abcd"] == final.FOCUS_HEAT_COLORS
+    assert chart.cell_color("e") == chart.cell_color("missing") == final.HEATMAP_EMPTY_COLOR
+    assert chart.cell_color(None) == final.BG_COLOR # Future days
+
+
+def test_mood_colors_and_unknown_moods():
+    chart = heatmap("Mood", moods={"a": "Happy 😄", "b": "Mystery"})
+    assert chart.cell_color("a") == final.MOOD_COLORS["Happy 😄"]
+    assert chart.cell_color("b") == final.HEATMAP_EMPTY_COLOR
+
+
+def test_days_run_monday_first_and_stop_today():
+    chart = heatmap("Mood")
+    chart.render = lambda: None
+    chart.set_data({}, {}, today=date(2025, 6, 18)) # A Wednesday
+    assert len(chart.days) == final.HEATMAP_WEEKS * 7
+    assert chart.days[-5] == "2025-06-18" and chart.days[-4:] == [None] * 4
+    assert date.fromisoformat(chart.days[0]).weekday() == 0
@@ -0,0 +1,71 @@
+"""Incremental iCalendar feed (IcsFeedExporter)."""
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def feed_records():
+    return [("task", {"id": "t1", "task": "Essay; final, v2", "due_date": "2025-06-20", "status": "Pending"}),
+            ("task", {"id": "t2", "task": "Someday", "due_date": "No Due Date", "status": "Pending"}),
+            ("plan", {"id": "p1", "subject": "Physics", "topic": "Optics", "due_date": "2025-06-21", "status": "Planned"}),
+            ("reminder", {"id": "r1", "message": "Exam", "datetime": "2025-06-25T08:30:00", "status": "active",
+                          "recurrence": {"freq": "weekly", "days": [0, 3], "until": "2025-07-31"}}),
+            ("reminder", {"id": "r2", "message": "Done", "datetime": "2025-06-01T08:00:00", "status": "dismissed"})]
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    cache = final.PersistentData(str(tmp_path / "ics_feed.json"))
+    return final.IcsFeedExporter(cache)
+
+
+def test_feed_contains_dated_records_only(exporter, tmp_path):
+    path = str(tmp_path / "feed.ics")
+    assert exporter.export("alice", path, feed_records()) == (5, 3)
+    text = open(path, encoding="utf-8", newline="").read()
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    assert "SUMMARY:Essay\\; final\\, v2\r\n" in text
+    assert "DTSTART;VALUE=DATE:20250621\r\nDTEND;VALUE=DATE:20250622\r\n" in text
+    assert "RRULE:FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20250731T235959\r\n" in text
+    assert "Someday" not in text and "Done" not in text
+
+
+def test_unchanged_records_are_not_reserialized_or_rewritten(exporter, tmp_path):
+    path = str(tmp_path / "feed.ics")
+    exporter.export("alice", path, feed_records())
+    before = (tmp_path / "feed.ics").stat().st_mtime_ns
+    assert exporter.export("alice", path, feed_records()) == (0, 3)
+    assert (tmp_path / "feed.ics").stat().st_mtime_ns == before
+
+    records = feed_records()
+    records[0][1]["modified_at"] = "2025-06-19T10:00:00"
+    records[0][1]["task"] = "Essay"
+    assert exporter.export("alice", path, records) == (1, 3)
+    assert "SUMMARY:Essay\r\n" in open(path, encoding="utf-8", newline="").read()
+
+
+def test_malformed_records_are_left_out(exporter, tmp_path):
+    path = str(tmp_path / "feed.ics")
+    records = [("plan", {"id": "p1", "subject": "Math", "topic": "Limits", "due_date": "someday"})]
+    assert exporter.export("alice", path, records) == (1, 0)
+
+
+def test_long_lines_fold_without_splitting_characters():
+    line = "SUMMARY:" + "é" * 80
+    folded = final.ics_fold(line)
+    parts = folded.split("\r\n ")
+    assert "".join(parts) == line
+    assert all(len(part.encode("utf-8")) <= final.ICS_LINE_LIMIT for part in parts)
+    assert final.ics_fold("SUMMARY:short") == "SUMMARY:short"
+
+
+def test_feed_round_trips_through_the_importer(exporter, tmp_path):
+    path = str(tmp_path / "feed.ics")
+    exporter.export("alice", path, feed_records())
+    importer = final.BulkImporter()
+    importer.import_file(path)
+    assert importer.errors == []
+    assert [(t["task"], t["due_date"]) for t in importer.tasks] == [("Essay; final, v2", "2025-06-20")]
+    assert [(p["subject"], p["topic"]) for p in importer.plans] == [("Physics", "Optics")]
+    assert [r["datetime"] for r in importer.reminders] == ["2025-06-25T08:30:00"]
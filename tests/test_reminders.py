@@ -0,0 +1,57 @@
+"""Recurring reminders: weekday parsing and lazy expansion of occurrences."""
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def reminder(start, **rule):
+    return {"datetime": start, "recurrence": rule or None}
+
+
+def test_parse_weekdays():
+    assert final.parse_weekdays("Wed, mon; friday") == [0, 2, 4]
+    assert final.parse_weekdays("") == []
+    with pytest.raises(ValueError):
+        final.parse_weekdays("Mon, Funday")
+
+
+def test_one_off_reminder_fires_once():
+    once = reminder("2025-06-20T09:00:00")
+    assert final.next_occurrence(once, datetime(2025, 6, 19)) == datetime(2025, 6, 20, 9)
+    assert final.next_occurrence(once, datetime(2025, 6, 20, 9)) is None
+
+
+def test_daily_expansion_stops_at_until_inclusive():
+    daily = reminder("2025-06-20T09:00:00", freq="daily", until="2025-06-23")
+    occurrences = list(final.expand_occurrences(daily, datetime(2025, 6, 1), datetime(2025, 7, 1)))
+    assert occurrences == [datetime(2025, 6, day, 9) for day in (20, 21, 22, 23)]
+
+
+def test_daily_next_occurrence_skips_to_the_following_day():
+    daily = reminder("2025-06-20T09:00:00", freq="daily")
+    assert final.next_occurrence(daily, datetime(2025, 8, 1, 9)) == datetime(2025, 8, 2, 9)
+    assert final.next_occurrence(daily, datetime(2025, 8, 1, 8)) == datetime(2025, 8, 1, 9)
+
+
+def test_weekly_expansion_only_on_chosen_days_and_not_before_start():
+    # 2025-06-18 is a Wednesday; the series runs on Mondays and Wednesdays
+    weekly = reminder("2025-06-18T18:30:00", freq="weekly", days=[0, 2])
+    occurrences = list(final.expand_occurrences(weekly, datetime(2025, 6, 1), datetime(2025, 7, 1)))
+    assert occurrences == [datetime(2025, 6, 18, 18, 30), datetime(2025, 6, 23, 18, 30),
+                           datetime(2025, 6, 25, 18, 30), datetime(2025, 6, 30, 18, 30)]
+
+
+def test_expansion_range_is_half_open():
+    daily = reminder("2025-06-20T09:00:00", freq="daily")
+    occurrences = list(final.expand_occurrences(daily, datetime(2025, 6, 21, 9), datetime(2025, 6, 23, 9)))
+    assert occurrences == [datetime(2025, 6, 21, 9), datetime(2025, 6, 22, 9)]
+
+
+def test_snooze_overrides_the_due_time():
+    snoozed = dict(reminder("2025-06-20T09:00:00"), snoozed_until="2025-06-20T09:10:00")
+    assert final.reminder_due_time(snoozed) == datetime(2025, 6, 20, 9, 10)
+    assert final.describe_recurrence({"freq": "weekly", "days": [0, 4], "until": "2025-07-01"}) == \
+        "weekly on Mon, Fri until 2025-07-01"
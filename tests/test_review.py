@@ -0,0 +1,109 @@
+"""Spaced repetition: SM-2 intervals and the review queue."""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+NOW = datetime(2025, 6, 20, 9, 0)
+
+
+def review_series(*qualities):
+    state, intervals = {}, []
+    for quality in qualities:
+        state = final.sm2_review(state, quality, NOW)
+        intervals.append(state["interval"])
+    return state, intervals
+
+
+def test_intervals_grow_by_the_ease_factor():
+    state, intervals = review_series(4, 4, 4, 4)
+    assert intervals == [1, 6, 15, 38] # 6 * 2.5, then 15 * 2.5 rounded
+    assert state["ease"] == 2.5 and state["reps"] == 4
+    assert state["due"] == (NOW + timedelta(days=38)).isoformat(timespec="minutes")
+
+
+def test_easy_and_hard_grades_move_the_ease():
+    assert review_series(5)[0]["ease"] == 2.6
+    assert review_series(3)[0]["ease"] == 2.36
+    assert review_series(*[3] * 20)[0]["ease"] == final.REVIEW_MIN_EASE
+
+
+def test_a_failed_review_starts_over_but_keeps_the_ease():
+    state, intervals = review_series(5, 5, 1, 4)
+    assert intervals == [1, 6, 1, 1]
+    assert state["reps"] == 1 and state["ease"] == 2.7
+
+
+def test_queue_hands_out_the_most_overdue_item_first():
+    queue = final.ReviewQueue([("doubts/a", NOW - timedelta(hours=1)), ("doubts/b", NOW - timedelta(days=2)),
+                               ("progress/c", NOW + timedelta(days=1))])
+    assert queue.next_due(NOW) == "doubts/b"
+    queue.schedule("doubts/b", NOW + timedelta(days=6))
+    assert queue.next_due(NOW) == "doubts/a"
+    queue.remove("doubts/a")
+    assert queue.next_due(NOW) is None # c is not due yet
+    assert queue.peek() == ((NOW + timedelta(days=1)).timestamp(), "progress/c")
+    assert queue.next_due(NOW + timedelta(days=7)) == "progress/c"
+
+
+def test_queue_counts_items_per_day():
+    queue = final.ReviewQueue([("doubts/a", NOW - timedelta(days=1)), ("doubts/b", NOW),
+                               ("doubts/c", NOW + timedelta(days=3))])
+    assert queue.count_due(NOW.date()) == 2
+    queue.schedule("doubts/a", NOW + timedelta(days=3))
+    queue.schedule("doubts/a", NOW + timedelta(days=3)) # Same time again: counted once
+    queue.remove("doubts/b")
+    queue.remove("doubts/missing")
+    assert queue.count_due(NOW.date()) == 0
+    assert queue.count_on((NOW + timedelta(days=3)).date()) == 2
+
+
+def test_rescheduling_keeps_the_heap_bounded():
+    queue = final.ReviewQueue([("doubts/a", NOW)])
+    for hours in range(200):
+        queue.schedule("doubts/a", NOW + timedelta(hours=hours + 1))
+    assert len(queue.heap) <= 2 * len(queue.due) + 64
+    assert queue.peek() == ((NOW + timedelta(hours=200)).timestamp(), "doubts/a")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(final.PersistentData, "headless", True)
+    app = object.__new__(final.StudentGuideApp)
+    app.current_user = "alice"
+    app.doubts_data = final.PersistentData(str(tmp_path / "doubts.json"))
+    app.progress_data = final.PersistentData(str(tmp_path / "progress.json"))
+    app.review_queue = app.review_queue_user = None
+    app.review_positions = {}
+    app.sync_review_reminders = lambda: None
+    app.doubts_data.set_user_data("alice", [
+        {"id": f"d{i}", "title": f"Doubt {i}", "status": "Unresolved", "modified_at": "2025-06-01T09:00:00"}
+        for i in range(3)])
+    return app
+
+
+def test_queued_records_are_found_by_position(app):
+    app.spaced_review_queue()
+    records, record = app.review_record("doubts/d2")
+    assert record is records[2]
+    assert app.review_record("doubts/gone") == (records, None)
+
+
+def test_positions_follow_the_store_change_events(app):
+    queue = app.spaced_review_queue()
+    doubts = app.doubts_data.get_user_data("alice")
+    del doubts[0]
+    app.doubts_data.set_user_data("alice", doubts)
+    app.update_review_queue([final.StoreChange("doubts", "alice", "d0", "removed")])
+    assert app.review_positions["doubts"] == {"d1": 0, "d2": 1}
+    assert "doubts/d0" not in queue.due
+    assert app.review_record("doubts/d2")[1]["title"] == "Doubt 2"
+
+
+def test_a_position_missed_by_the_events_is_looked_up_again(app):
+    app.spaced_review_queue()
+    app.doubts_data.get_user_data("alice").reverse() # Changed without an event
+    records, record = app.review_record("doubts/d0")
+    assert record is records[2] and app.review_positions["doubts"]["d0"] == 2
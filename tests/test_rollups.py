@@ -0,0 +1,53 @@
+"""Daily, weekly and monthly focus-time rollups of the timer history."""
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def session(timestamp, minutes, timer_type="Pomodoro"):
+    return {"type": timer_type, "duration_minutes": minutes, "timestamp": timestamp}
+
+
+def test_rollup_keys_use_iso_weeks():
+    # 2024-12-30 is a Monday that belongs to ISO week 1 of 2025
+    assert final.rollup_keys(datetime(2024, 12, 30, 9)) == ("2024-12-30", "2025-W01", "2024-12")
+    assert final.rollup_keys(datetime(2025, 6, 20, 23, 59)) == ("2025-06-20", "2025-W25", "2025-06")
+
+
+def test_sessions_add_up_per_period_and_type():
+    history = [session("2025-06-16T09:00:00", 25), session("2025-06-16T10:00:00", 25),
+               session("2025-06-20T09:00:00", 50, "My Timer"), session("2025-07-01T09:00:00", 5, "Break")]
+    rollups = final.build_timer_rollups(history)
+
+    assert rollups["entries"] == 4
+    assert rollups["daily"]["2025-06-16"] == {"Pomodoro": {"minutes": 50, "sessions": 2}}
+    assert rollups["weekly"]["2025-W25"] == {"Pomodoro": {"minutes": 50, "sessions": 2},
+                                             "My Timer": {"minutes": 50, "sessions": 1}}
+    assert rollups["monthly"]["2025-07"] == {"Break": {"minutes": 5, "sessions": 1}}
+
+
+def test_incremental_add_matches_rebuild():
+    history = [session(f"2025-06-{day:02d}T08:30:00", day) for day in range(1, 29)]
+    rollups = final.empty_timer_rollups()
+    for entry in history:
+        final.add_session_to_rollups(rollups, entry)
+    assert rollups == final.build_timer_rollups(history)
+
+
+def test_malformed_entries_are_counted_but_not_aggregated():
+    rollups = final.build_timer_rollups([{"type": "Pomodoro"}, session("not a date", 25),
+                                         session("2025-06-20T09:00:00", "25")])
+    assert rollups["entries"] == 3
+    assert rollups["daily"] == {"2025-06-20": {"Pomodoro": {"minutes": 25.0, "sessions": 1}}}
+
+
+def test_rollups_are_invalid_once_the_history_grows():
+    history = [session("2025-06-20T09:00:00", 25)]
+    rollups = final.build_timer_rollups(history)
+    assert final.timer_rollups_valid(rollups, history)
+    assert not final.timer_rollups_valid(rollups, history + [session("2025-06-21T09:00:00", 25)])
+    assert not final.timer_rollups_valid({"entries": 1}, history)
+    assert not final.timer_rollups_valid(None, history)
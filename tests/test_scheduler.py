@@ -0,0 +1,66 @@
+"""Earliest-deadline-first Pomodoro scheduling (StudyScheduler)."""
+import random
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+TODAY = date(2025, 6, 16)
+DAY = TODAY.toordinal()
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return final.StudyScheduler(final.PersistentData(str(tmp_path / "study_schedule.json")))
+
+
+def test_earliest_deadline_goes_first():
+    days = final.StudyScheduler.allocate({"late": [DAY + 9, 3], "soon": [DAY + 2, 3]}, capacity=2, days=[])
+    assert [blocks for blocks, _ in days] == [["soon", "soon"], ["soon", "late"], ["late", "late"]]
+
+
+def test_shared_deadline_interleaves_with_the_one_furthest_behind_first():
+    days = final.StudyScheduler.allocate({"a": [DAY + 5, 2], "b": [DAY + 5, 4]}, capacity=3, days=[])
+    assert [blocks for blocks, _ in days] == [["b", "b", "a"], ["b", "a", "b"]]
+
+
+def test_cutoff_is_kept_only_for_full_days():
+    days = final.StudyScheduler.allocate({"a": [DAY + 1, 3]}, capacity=2, days=[])
+    assert days[0][1] == [DAY + 1, -2, "a"] # Largest key that still got a block
+    assert days[1] == [["a"], None] # Capacity left over
+
+
+def test_incremental_replan_matches_a_full_replan(scheduler, tmp_path):
+    rng = random.Random(7)
+    inputs = {f"p{i}": [DAY + rng.randint(1, 30), rng.randint(1, 8)] for i in range(40)}
+    scheduler.update("alice", inputs, TODAY, capacity=4)
+    for _ in range(20):
+        pid = rng.choice(sorted(inputs))
+        if rng.random() < 0.2:
+            inputs.pop(pid)
+        else:
+            inputs[pid] = [DAY + rng.randint(1, 30), rng.randint(1, 8)]
+        state, _ = scheduler.update("alice", dict(inputs), TODAY, capacity=4)
+        fresh = final.StudyScheduler(final.PersistentData(str(tmp_path / "fresh.json")))
+        assert state["days"] == fresh.update("alice", dict(inputs), TODAY, capacity=4)[0]["days"]
+
+
+def test_late_change_keeps_earlier_days(scheduler):
+    inputs = {"soon": [DAY + 1, 4], "later": [DAY + 20, 4]}
+    scheduler.update("alice", inputs, TODAY, capacity=2)
+    state, first_day = scheduler.update("alice", dict(inputs, later=[DAY + 20, 6]), TODAY, capacity=2)
+    assert first_day == 2 # The first two days only hold "soon"
+    assert scheduler.update("alice", dict(inputs, later=[DAY + 20, 6]), TODAY, capacity=2) == (state, None)
+
+
+def test_undated_plans_go_last_and_late_plans_are_reported(scheduler):
+    state, _ = scheduler.update("alice", {"undated": [None, 1], "tight": [DAY, 3]}, TODAY, capacity=2)
+    assert [blocks for blocks, _ in state["days"]] == [["tight", "tight"], ["tight", "undated"]]
+    assert final.StudyScheduler.late_plans(state) == {"tight"}
+
+
+def test_block_times_are_back_to_back_from_the_day_start():
+    times = final.StudyScheduler.block_times(3, TODAY)
+    assert times == [datetime(2025, 6, 16, 17, 0), datetime(2025, 6, 16, 17, 30), datetime(2025, 6, 16, 18, 0)]
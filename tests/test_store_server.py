@@ -0,0 +1,185 @@
+"""Store server sessions: login, per-user scoping and the collection allowlist."""
+import asyncio
+import functools
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+NODE = "0" * 32
+
+
+class Connection:
+    """Drives StoreServer.respond like one client connection, without a socket."""
+    def __init__(self, server):
+        self.server = server
+        self.session = {"token": None}
+
+    def __call__(self, op, **fields):
+        line = json.dumps(dict(fields, op=op))
+        return json.loads(asyncio.run(self.server.respond(line, self.session)))
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(final.PersistentData, "headless", True)
+    monkeypatch.setattr(final, "PASSWORD_ITERATIONS", 1_000) # Keep the tests fast
+    monkeypatch.setattr(final, "hash_password", functools.partial(final.hash_password, iterations=1_000))
+    server = final.StoreServer(str(tmp_path))
+    for user, password in (("alice", "alice-pw"), ("bob", "bob-pw")):
+        assert Connection(server)("register", user=user, password=password, details={"course": "CSE"})["ok"]
+    return server
+
+
+def logged_in(server, user):
+    connection = Connection(server)
+    assert connection("login", user=user, password=f"{user}-pw")["ok"]
+    return connection
+
+
+def test_everything_but_ping_needs_a_login(server):
+    anonymous = Connection(server)
+    assert anonymous("ping")["ok"]
+    for op, fields in (("get", {"collection": "tasks", "user": "alice"}),
+                       ("set", {"collection": "tasks", "user": "alice", "value": []}),
+                       ("version", {"collection": "tasks"}), ("profiles", {}),
+                       ("log_heads", {"user": "alice"}),
+                       ("log_append", {"user": "alice", "node": NODE, "frames": ["AA"]})):
+        response = anonymous(op, **fields)
+        assert not response["ok"] and "Log in first" in response["error"], op
+
+
+def test_wrong_password_and_unknown_user_fail_the_same_way(server):
+    assert Connection(server)("login", user="alice", password="nope")["error"] == \
+        Connection(server)("login", user="mallory", password="nope")["error"]
+
+
+def test_login_returns_the_profile_without_credentials(server):
+    response = Connection(server)("login", user="alice", password="alice-pw")
+    assert response["value"]["profile"] == {"course": "CSE"} and response["value"]["token"]
+
+
+def test_users_only_reach_their_own_data(server):
+    alice = logged_in(server, "alice")
+    assert alice("set", collection="tasks", user="alice", value=[{"task": "Essay"}])["ok"]
+    assert alice("get", collection="tasks", user="alice")["value"] == [{"task": "Essay"}]
+    for op, fields in (("get", {"collection": "tasks", "user": "bob"}),
+                       ("set", {"collection": "tasks", "user": "bob", "value": []}),
+                       ("log_append", {"user": "bob", "node": NODE, "frames": ["AA"]}),
+                       ("log_read", {"user": "bob", "node": NODE, "since": 0})):
+        assert not alice(op, **fields)["ok"], op
+    assert not alice("get", collection="tasks")["ok"] # Whole collections are for admins
+    assert not alice("profiles")["ok"]
+
+
+def test_profile_updates_keep_the_password_hash_and_role(server):
+    alice = logged_in(server, "alice")
+    stored = dict(server.collection("users").data["alice"])
+    assert alice("set", collection="users", user="alice",
+                 value={"course": "ECE", "role": "admin", "password_hash": "forged"})["ok"]
+    assert server.collection("users").data["alice"] == dict(stored, course="ECE")
+    assert alice("get", collection="users", user="alice")["value"] == {"course": "ECE"}
+
+
+def test_admins_read_profiles_but_never_the_whole_users_collection(server):
+    server.collection("users").data["alice"]["role"] = "admin"
+    alice = logged_in(server, "alice")
+    profiles = alice("profiles")["value"]
+    assert set(profiles) == {"alice", "bob"} and all("password_hash" not in p for p in profiles.values())
+    assert alice("get", collection="tasks")["ok"]
+    assert not alice("get", collection="users")["ok"]
+
+
+def test_unknown_collections_are_refused(server, tmp_path):
+    alice = logged_in(server, "alice")
+    for name in ("notes", "syllabus", "../users", ["tasks"]):
+        response = alice("set", collection=name, user="alice", value=[])
+        assert not response["ok"], name
+    assert not alice("version", collection="anything")["ok"]
+    assert sorted(path.name for path in tmp_path.iterdir() if path.suffix == ".json") == []
+
+
+def test_resume_joins_a_session_and_logout_ends_it_everywhere(server):
+    alice = logged_in(server, "alice")
+    other = Connection(server)
+    assert not other("resume", token="made-up")["ok"]
+    assert other("resume", token=alice.session["token"])["ok"]
+    assert other("get", collection="tasks", user="alice")["ok"]
+    assert other("logout")["ok"]
+    assert not alice("get", collection="tasks", user="alice")["ok"]
+
+
+def test_login_and_register_cannot_be_batched(server):
+    response = Connection(server)("batch", ops=[{"op": "login", "user": "alice", "password": "alice-pw"}])
+    assert not response["ok"]
+
+
+@pytest.fixture
+def address(server):
+    """Serves `server` on a free local port from a background event loop."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    async def start():
+        return await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    listener = asyncio.run_coroutine_threadsafe(start(), loop).result(5)
+    yield "127.0.0.1", listener.sockets[0].getsockname()[1]
+    deadline = time.monotonic() + 5
+    while server.connections and time.monotonic() < deadline: # Let handlers see their clients leave
+        time.sleep(0.01)
+    loop.call_soon_threadsafe(listener.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def test_client_pool_shares_one_login(address):
+    client = final.StoreClient(*address, pool_size=3)
+    try:
+        with pytest.raises(final.StoreError):
+            client.request("get", collection="tasks", user="alice")
+        assert client.login("alice", "alice-pw") == {"course": "CSE"}
+        for i in range(6): # Spread over every pooled connection
+            client.request("set", collection="moods", user="alice", value=[i])
+        assert client.batch([{"op": "get", "collection": "moods", "user": "alice"}]) == [[5]]
+        client.logout()
+        with pytest.raises(final.StoreError):
+            client.request("get", collection="moods", user="alice")
+    finally:
+        client.close()
+
+
+def wait_for_no_connections(server):
+    deadline = time.monotonic() + 5
+    while server.connections and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return server.connections
+
+
+def test_failed_sync_login_closes_the_client(server, address, monkeypatch):
+    clients = []
+    class RecordingClient(final.StoreClient):
+        def __init__(self, *args, **kwargs):
+            clients.append(self)
+            super().__init__(*args, **kwargs)
+    monkeypatch.setattr(final, "StoreClient", RecordingClient)
+    app = object.__new__(final.StudentGuideApp)
+    app.current_user = "alice"
+    app.sync_journal = SimpleNamespace(state={})
+    app.ask_server_login = lambda previous: ("%s:%d" % address, "wrong-pw")
+    attempts = []
+    app.run_sync = attempts.append
+    app.sync_with_server()
+
+    with pytest.raises(final.StoreError):
+        attempts[0]()
+    assert wait_for_no_connections(server) == 0
+    deadline = time.monotonic() + 5
+    while clients[0].loop.is_running() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not clients[0].loop.is_running() # Its event-loop thread stopped too
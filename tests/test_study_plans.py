@@ -0,0 +1,61 @@
+"""Turning syllabus outlines into study plan proposals with due dates."""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+SYLLABUS = """COURSE: Engineering Thermodynamics (4 credits)
+
+UNIT I: Basic Concepts (9 hours)
+Systems and surroundings, properties, zeroth law; temperature scales.
+
+UNIT - II
+FIRST LAW: Energy balance
+- Closed systems
+- Steady flow devices
+- Closed systems
+
+Module 3. Entropy
+1. Clausius inequality
+2. Entropy generation
+
+Text Books
+1. Cengel, Thermodynamics: An Engineering Approach
+"""
+
+
+def test_units_and_topics_come_from_headings_bullets_and_paragraphs():
+    assert final.parse_syllabus_outline(SYLLABUS) == [
+        {"unit": "Unit I", "title": "Basic Concepts",
+         "topics": ["Systems and surroundings", "properties", "zeroth law", "temperature scales"]},
+        {"unit": "Unit II", "title": "First Law",
+         "topics": ["Closed systems", "Steady flow devices"]}, # Bullets win over the text after the title
+        {"unit": "Module 3", "title": "Entropy", "topics": ["Clausius inequality", "Entropy generation"]},
+    ]
+
+
+def test_outline_without_units_is_one_untitled_unit():
+    outline = final.parse_syllabus_outline("Topics covered\n* Sorting\n* Hashing\n\nReferences\n* Knuth")
+    assert outline == [{"unit": "", "title": "", "topics": ["Sorting", "Hashing"]}]
+    assert final.parse_syllabus_outline("Nothing that looks like a syllabus.") == []
+
+
+def test_proposals_skip_existing_plans_and_repeats():
+    outlines = {"Physics": [{"unit": "Unit I", "title": "Optics", "topics": ["Lenses", "Mirrors"]},
+                            {"unit": "Unit II", "title": "Waves", "topics": []}],
+                "Maths": [{"unit": "", "title": "", "topics": ["Limits", "Limits"]}]}
+    existing = [{"subject": "physics", "topic": "UNIT I: OPTICS - LENSES"}]
+    assert final.propose_study_plans(outlines, existing) == [
+        {"subject": "Physics", "unit": "Unit I: Optics", "topic": "Unit I: Optics - Mirrors"},
+        {"subject": "Physics", "unit": "Unit II: Waves", "topic": "Unit II: Waves"},
+        {"subject": "Maths", "unit": "", "topic": "Limits"},
+    ]
+
+
+def test_due_dates_are_spread_evenly_and_end_on_the_deadline():
+    assert final.spread_due_dates(4, date(2025, 6, 1), date(2025, 6, 9)) == \
+        ["2025-06-03", "2025-06-05", "2025-06-07", "2025-06-09"]
+    assert final.spread_due_dates(2, date(2025, 6, 9), date(2025, 6, 1)) == ["2025-06-09", "2025-06-09"]
+    assert final.spread_due_dates(0, date(2025, 6, 1), date(2025, 6, 9)) == []
@@ -0,0 +1,85 @@
+"""Syllabus text extraction and the inverted index behind Search Syllabi."""
+import zlib
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+def test_search_terms_fold_case_and_skip_short_tokens():
+    assert final.search_terms("Unit-1: THERMO_dynamics, a Straße") == \
+        ["unit", "thermo", "dynamics", "strasse"]
+
+
+def test_txt_falls_back_to_cp1252(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes("Café – résumé".encode("cp1252"))
+    assert final.extract_txt_text(str(path)) == "Café – résumé"
+
+
+def test_pdf_literal_decodes_escapes_and_octal_codes():
+    assert final.pdf_literal(rb"(a\(b\)\n\101\\c\
+d)") == b"a(b)\nA\\cd"
+
+
+def test_pdf_text_comes_from_compressed_content_streams(tmp_path):
+    content = b"BT /F1 12 Tf (Unit I: Thermodynamics) Tj T* [(Heat)-300(engines)] TJ ET"
+    stream = zlib.compress(content)
+    path = tmp_path / "syllabus.pdf"
+    path.write_bytes(b"%%PDF-1.4\n1 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+                     + stream + b"\nendstream\nendobj\n%%EOF")
+    assert final.extract_pdf_text(str(path)).split("\n") == ["Unit I: Thermodynamics", "Heat engines", ""]
+
+
+@pytest.fixture
+def index(tmp_path):
+    texts = {"a" * 64: "Unit I: Thermodynamics\nHeat engines and entropy. Entropy again.",
+             "b" * 64: "Unit I: Thermal physics\nEntropy of gases",
+             "c" * 64: "Unit I: Algebra\nGroups and rings"}
+    rows = []
+    for digest, text in texts.items():
+        path = tmp_path / f"{digest}.txt"
+        path.write_text(text, encoding="utf-8")
+        rows.append({"sha256": digest, "path": str(path), "ext": ".txt", "size": len(text)})
+    index = final.SyllabusSearchIndex(str(tmp_path / "index.json"), str(tmp_path / "text"))
+    assert index.update(rows, texts, workers=1) == 3
+    return index
+
+
+def test_every_query_word_must_match_as_a_prefix(index):
+    assert index.search("thermo") == [("a" * 64, 1)]
+    assert sorted(index.search("therm")) == [("a" * 64, 1), ("b" * 64, 1)]
+    assert index.search("THERM entropy") == [("a" * 64, 3), ("b" * 64, 2)] # Ranked by occurrences
+    assert index.search("thermo groups") == []
+    assert index.search("unit", digests={"c" * 64}) == [("c" * 64, 1)]
+    assert index.search("- ,") == []
+
+
+def test_snippet_is_the_first_matching_line(index):
+    assert index.snippet("a" * 64, "entropy") == "Heat engines and entropy. Entropy again."
+    assert index.snippet("c" * 64, "entropy") == ""
+    assert index.snippet("d" * 64, "entropy") == "" # Never extracted
+
+
+def test_index_survives_a_restart_and_only_extracts_new_content(index, tmp_path):
+    reloaded = final.SyllabusSearchIndex(index.filepath, index.text_folder)
+    assert reloaded.docs == index.docs and reloaded.postings == index.postings
+    rows = [{"sha256": "a" * 64, "path": str(tmp_path / "gone.txt"), "ext": ".txt", "size": 1}]
+    assert reloaded.update(rows, {"a" * 64, "b" * 64, "c" * 64}, workers=1) == 0
+
+
+def test_unreferenced_content_is_pruned(index):
+    assert index.update([], {"a" * 64}, workers=1) == 0
+    assert set(index.docs) == {"a" * 64}
+    assert "algebra" not in index.postings and index.search("entropy") == [("a" * 64, 2)]
+    assert index.snippet("b" * 64, "entropy") == ""
+
+
+def test_extraction_errors_are_recorded_not_raised(tmp_path):
+    index = final.SyllabusSearchIndex(str(tmp_path / "index.json"), str(tmp_path / "text"))
+    rows = [{"sha256": "e" * 64, "path": str(tmp_path / "missing.docx"), "ext": ".docx", "size": 1},
+            {"sha256": "f" * 64, "path": str(tmp_path / "slides.pptx"), "ext": ".pptx", "size": 1}]
+    assert index.update(rows, {"e" * 64, "f" * 64}, workers=1) == 2
+    assert index.docs["e" * 64]["error"].startswith("FileNotFoundError")
+    assert index.docs["f" * 64] == {"terms": 0, "error": "no text extractor for .pptx"}
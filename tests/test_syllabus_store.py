@@ -0,0 +1,52 @@
+"""Moving syllabus files from the old flat layout into the content-addressed store."""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(final.PersistentData, "headless", True)
+    root = tmp_path / "syllabus_files"
+    root.mkdir()
+    (root / "Maths.pdf").write_bytes(b"%PDF maths")
+    (root / "Physics.txt").write_bytes(b"physics")
+    (root / "half-copied.tmp").write_bytes(b"partial")
+    return final.SyllabusStore(final.PersistentData(str(tmp_path / "syllabus.json")), root=str(root))
+
+
+def test_legacy_files_move_to_their_owner_once(store):
+    assert not store.legacy_migrated()
+    files = store.scan_legacy()
+    assert sorted(entry["name"] for _, entry in files) == ["Maths.pdf", "Physics.txt"]
+    store.migrate_legacy(files, "alice")
+
+    assert store.legacy_migrated()
+    assert sorted((owner, entry["subject"], entry["uploaded_by"]) for owner, entry in store.entries_for(["alice"])) == \
+        [("alice", "Maths", "alice"), ("alice", "Physics", "alice")]
+    assert store.entries_for([final.SHARED_SYLLABUS_OWNER]) == []
+    for _, entry in files:
+        with open(store.blob_path(entry["sha256"], entry["ext"]), "rb") as f:
+            assert f.read() in (b"%PDF maths", b"physics")
+    assert store.scan_legacy() == [] # Only the upload temp file is left, and the marker is skipped
+    assert store.collect_garbage() == (0, 0)
+
+
+def legacy_owner(accounts, store_client=None):
+    app = SimpleNamespace(store_client=store_client, users_data=SimpleNamespace(data=dict.fromkeys(accounts, {})))
+    return final.StudentGuideApp.legacy_syllabus_owner(app)
+
+
+def test_legacy_files_belong_to_the_only_account():
+    assert legacy_owner(["alice"]) == "alice"
+    assert legacy_owner([final.LEGACY_DEFAULT_USER, "alice"]) == "alice"
+    assert legacy_owner([final.LEGACY_DEFAULT_USER]) == final.LEGACY_DEFAULT_USER
+
+
+def test_legacy_files_stay_unlisted_when_the_uploader_is_unknown():
+    assert legacy_owner(["alice", "bob"]) == final.LEGACY_SYLLABUS_OWNER
+    assert legacy_owner([]) == final.LEGACY_SYLLABUS_OWNER
+    assert legacy_owner(["alice"], store_client=object()) == final.LEGACY_SYLLABUS_OWNER
@@ -0,0 +1,193 @@
+"""Delta sync between two machines sharing a folder (SyncJournal, SyncEngine, DirectoryRemote)."""
+import os
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+import final
+
+USER = "alice"
+NODE_A = "a" * 32
+NODE_B = "b" * 32
+
+
+class Node:
+    """One machine: its own data folder, tasks store and sync journal."""
+    def __init__(self, folder, node_id):
+        os.makedirs(folder)
+        self.journal = final.SyncJournal(os.path.join(folder, "sync_journal.json"))
+        self.journal.state["node"] = node_id
+        self.tasks = final.PersistentData(os.path.join(folder, "tasks.json"))
+        self.tasks.headless = True
+        self.journal.attach(self.tasks)
+        self.engine = final.SyncEngine(self.journal, {"tasks": self.tasks})
+
+    def sync(self, remote):
+        """One full pull and push, in the order StudentGuideApp.run_sync runs the steps."""
+        positions = self.journal.remote_state(remote.key, USER)["positions"]
+        changes, positions = self.engine.fetch(remote, USER, positions)
+        received = self.engine.apply(USER, changes)
+        self.engine.commit(remote.key, USER, positions=positions)
+        frames, seq = self.engine.outgoing(remote.key, USER)
+        self.engine.push(remote, USER, frames)
+        self.engine.commit(remote.key, USER, pushed=seq)
+        return received, len(frames)
+
+    def records(self):
+        return {record["id"]: record for record in self.tasks.get_user_data(USER, [])}
+
+    def add(self, record_id, task):
+        records = self.tasks.get_user_data(USER, [])
+        records.append(final.stamp_record({"id": record_id, "task": task}))
+        self.tasks.set_user_data(USER, records)
+
+    def edit(self, record_id, task):
+        records = self.tasks.get_user_data(USER, [])
+        next(record for record in records if record["id"] == record_id)["task"] = task
+        self.tasks.set_user_data(USER, records)
+
+    def delete(self, record_id):
+        records = self.tasks.get_user_data(USER, [])
+        self.tasks.set_user_data(USER, [record for record in records if record["id"] != record_id])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Sets the time the journal stamps changes with: clock("2025-06-20T10:00:00")."""
+    now = [datetime(2025, 6, 20, 9, 0)]
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now[0]
+
+    monkeypatch.setattr(final, "datetime", FrozenDatetime)
+    def set_time(text):
+        now[0] = datetime.fromisoformat(text)
+    return set_time
+
+
+@pytest.fixture
+def remote(tmp_path):
+    return final.DirectoryRemote(str(tmp_path / "shared"))
+
+
+@pytest.fixture
+def nodes(tmp_path, remote, clock):
+    """Two machines that both have task "t1" after one sync each."""
+    a = Node(str(tmp_path / "a"), NODE_A)
+    b = Node(str(tmp_path / "b"), NODE_B)
+    a.add("t1", "Read chapter 1")
+    a.sync(remote)
+    assert b.sync(remote) == (1, 0)
+    return a, b
+
+
+def test_new_record_reaches_other_node(nodes, remote):
+    a, b = nodes
+    assert b.records()["t1"]["task"] == "Read chapter 1"
+    assert b.records()["t1"]["modified_by"] == NODE_A
+    assert set(remote.heads(USER)) == {NODE_A} # b pulled, but had nothing of its own to push
+
+
+def test_concurrent_updates_last_writer_wins(nodes, remote, clock):
+    a, b = nodes
+    clock("2025-06-20T10:00:00")
+    a.edit("t1", "Edited on a")
+    clock("2025-06-20T11:00:00")
+    b.edit("t1", "Edited on b")
+
+    assert a.sync(remote) == (0, 1)
+    assert b.sync(remote) == (0, 1) # a's edit is older, so b keeps its own and pushes it
+    assert a.sync(remote) == (1, 0)
+    assert a.records()["t1"]["task"] == b.records()["t1"]["task"] == "Edited on b"
+
+
+def test_tie_breaks_on_modified_by(nodes, remote, clock):
+    a, b = nodes
+    clock("2025-06-20T10:00:00")
+    a.edit("t1", "Edited on a")
+    b.edit("t1", "Edited on b")
+    assert final.record_stamp(a.records()["t1"])[0] == final.record_stamp(b.records()["t1"])[0]
+
+    b.sync(remote)
+    a.sync(remote)
+    b.sync(remote)
+    # Same modified_at, so the higher node id wins on both machines
+    assert a.records()["t1"]["task"] == b.records()["t1"]["task"] == "Edited on b"
+    assert a.records()["t1"]["modified_by"] == NODE_B
+
+
+def test_edit_after_delete_wins(nodes, remote, clock):
+    a, b = nodes
+    clock("2025-06-20T10:00:00")
+    a.delete("t1")
+    clock("2025-06-20T11:00:00")
+    b.edit("t1", "Still needed")
+
+    a.sync(remote)
+    b.sync(remote)
+    a.sync(remote)
+    assert a.records()["t1"]["task"] == b.records()["t1"]["task"] == "Still needed"
+    assert "tasks/t1" not in a.journal.state["tombstones"][USER] # The edit brought the record back
+
+
+def test_delete_after_edit_wins(nodes, remote, clock):
+    a, b = nodes
+    clock("2025-06-20T10:00:00")
+    b.edit("t1", "Edited on b")
+    clock("2025-06-20T11:00:00")
+    a.delete("t1")
+
+    b.sync(remote)
+    assert a.sync(remote) == (0, 1) # The tombstone is newer than b's edit
+    assert b.sync(remote) == (1, 0)
+    assert a.records() == b.records() == {}
+    assert b.journal.state["tombstones"][USER]["tasks/t1"] == ["2025-06-20T11:00:00", NODE_A]
+
+
+def test_sync_without_changes_transfers_nothing(nodes, remote):
+    a, b = nodes
+    a.sync(remote)
+    sizes = remote.heads(USER)
+    journals = [os.stat(node.journal.filepath).st_mtime_ns for node in (a, b)]
+
+    assert a.sync(remote) == (0, 0)
+    assert b.sync(remote) == (0, 0)
+    assert remote.heads(USER) == sizes
+    assert [os.stat(node.journal.filepath).st_mtime_ns for node in (a, b)] == journals
+
+
+class ClosingRemote(final.DirectoryRemote):
+    """A DirectoryRemote that records when run_sync releases it."""
+    def __init__(self, folder):
+        super().__init__(folder)
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+
+@pytest.mark.parametrize("failing_step", ["fetch", "push"])
+def test_run_sync_closes_the_remote_when_a_step_fails(nodes, tmp_path, monkeypatch, failing_step):
+    a, _ = nodes
+    a.edit("t1", "Something to push")
+    remote = ClosingRemote(str(tmp_path / "shared"))
+    def broken(*args):
+        raise OSError("connection reset")
+    monkeypatch.setattr(a.engine, failing_step, broken)
+    errors = []
+    monkeypatch.setattr(final.messagebox, "showerror", lambda title, message, **kw: errors.append(message))
+
+    app = SimpleNamespace(current_user=USER, sync_engine=a.engine,
+                          app=SimpleNamespace(after=lambda ms, callback: callback()))
+    final.StudentGuideApp.run_sync(app, lambda: remote)
+    assert remote.closed.wait(5)
+    deadline = time.monotonic() + 5
+    while not errors and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert errors == ["Sync failed: connection reset"]
@@ -0,0 +1,42 @@
+"""LTTB downsampling used by the trend charts."""
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+np = pytest.importorskip("numpy")
+import final
+
+
+def series(n):
+    xs = np.arange(n, dtype=float)
+    return xs, np.sin(xs / 25.0)
+
+
+def test_short_series_and_tiny_thresholds_are_returned_unchanged():
+    xs, ys = series(50)
+    for threshold in (50, 80, 2):
+        out_x, out_y = final.lttb_downsample(xs, ys, threshold)
+        assert out_x is xs and out_y is ys
+
+
+def test_output_has_threshold_points_from_the_input_in_order():
+    xs, ys = series(10_000)
+    out_x, out_y = final.lttb_downsample(xs, ys, 300)
+    assert len(out_x) == len(out_y) == 300
+    assert out_x[0] == xs[0] and out_x[-1] == xs[-1]
+    assert np.all(np.diff(out_x) > 0)
+    assert np.array_equal(out_y, ys[out_x.astype(int)]) # Points are picked, never interpolated
+
+
+def test_a_single_spike_survives_downsampling():
+    xs = np.arange(5_000, dtype=float)
+    ys = np.zeros(5_000)
+    ys[3_217] = 90.0
+    out_x, out_y = final.lttb_downsample(xs, ys, 40)
+    assert 3_217.0 in out_x
+    assert out_y.max() == 90.0
+
+
+def test_uneven_bucket_sizes_still_cover_the_range():
+    xs, ys = series(101)
+    out_x, _ = final.lttb_downsample(xs, ys, 97) # Buckets of one and two points
+    assert len(out_x) == 97 and len(set(out_x)) == 97
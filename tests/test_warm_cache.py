@@ -0,0 +1,99 @@
+"""Warm-start snapshots (WarmCache): round trip and validation of untrusted files."""
+import json
+import os
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("customtkinter") # final.py imports it at module level
+np = pytest.importorskip("numpy")
+import final
+
+STAMPS = [[1, 2], None, [3, 4]]
+
+
+class Planted:
+    """Runs code if it is ever unpickled."""
+    def __reduce__(self):
+        return (os.mkdir, (os.path.join(os.environ["WARM_CACHE_TEST_DIR"], "unpickled"),))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("WARM_CACHE_TEST_DIR", str(tmp_path))
+    return final.WarmCache(str(tmp_path / "cache"))
+
+
+def payload():
+    now = datetime(2025, 6, 20, 12)
+    timer = [{"type": "Pomodoro", "duration_minutes": 25, "timestamp": (now - timedelta(hours=7 * i)).isoformat()}
+             for i in range(200)]
+    moods = [{"mood": final.MOOD_OPTIONS[i % len(final.MOOD_OPTIONS)], "timestamp": (now - timedelta(hours=5 * i)).isoformat()}
+             for i in range(100)]
+    insights = final.ProgressInsights()
+    insights.get("alice", timer, moods, today=now.date())
+    return {"insights": insights.snapshot("alice"), "heatmap": ((200, 100), ({"2025-06-20": 50.0}, {"2025-06-20": None}))}
+
+
+def write_npz(cache, meta, **arrays):
+    os.makedirs(cache.folder, exist_ok=True)
+    with open(cache.path("alice"), "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(dict({"format": final.WARM_CACHE_FORMAT, "username": "alice",
+                                                     "stamps": STAMPS}, **meta))), **arrays)
+
+
+def test_round_trip_restores_insights_and_heatmap(cache):
+    saved = payload()
+    cache.save("alice", STAMPS, saved)
+    loaded = cache.load("alice", STAMPS)
+    (key, result), (saved_key, saved_result) = loaded["insights"], saved["insights"]
+    assert key == saved_key and set(result) == set(saved_result)
+    for name, value in saved_result.items():
+        assert np.array_equal(result[name], value) if isinstance(value, np.ndarray) else result[name] == value
+    assert loaded["heatmap"] == saved["heatmap"]
+
+
+def test_changed_stamps_or_user_mean_a_cold_start(cache):
+    cache.save("alice", STAMPS, payload())
+    assert cache.load("alice", [[1, 2], None, [3, 5]]) is None
+    os.replace(cache.path("alice"), cache.path("bob"))
+    assert cache.load("bob", STAMPS) is None
+
+
+def test_planted_pickle_is_never_unpickled(cache, tmp_path):
+    os.makedirs(cache.folder)
+    with open(cache.path("alice"), "wb") as f:
+        pickle.dump(Planted(), f)
+    assert cache.load("alice", STAMPS) is None
+    assert not (tmp_path / "unpickled").exists()
+
+
+def test_object_arrays_are_rejected(cache, tmp_path):
+    write_npz(cache, {}, daily_days=np.array([Planted()], dtype=object))
+    assert cache.load("alice", STAMPS) is None
+    assert not (tmp_path / "unpickled").exists()
+
+
+def test_arrays_of_the_wrong_kind_or_shape_are_rejected(cache):
+    cache.save("alice", STAMPS, payload())
+    with np.load(cache.path("alice")) as snapshot:
+        meta = json.loads(str(snapshot["meta"][()]))
+        arrays = {name: snapshot[name] for name in snapshot.files if name != "meta"}
+    write_npz(cache, meta, **dict(arrays, daily_minutes=np.array(["x"])))
+    assert cache.load("alice", STAMPS) is None
+    write_npz(cache, meta, **dict(arrays, mood_by_weekday=np.zeros((7, 2), dtype=np.int64)))
+    assert cache.load("alice", STAMPS) is None
+
+
+def test_malformed_heatmap_is_rejected(cache):
+    write_npz(cache, {"heatmap": {"key": [1], "focus": {"2025-06-20": "lots"}, "moods": {}}})
+    assert cache.load("alice", STAMPS) is None
+
+
+def test_saving_removes_an_old_pickle_snapshot(cache):
+    os.makedirs(cache.folder)
+    old = cache.path("alice")[:-4] + ".pickle"
+    open(old, "wb").close()
+    cache.save("alice", STAMPS, payload())
+    assert not os.path.exists(old)